@@ -5,6 +5,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 
 from binance_price_candle import previous_hours_to_interval, get_recent_24h_klines
+from resample import rolling_ohlc
 
 def gk_ewma_sigma(df, lambda_=0.94):
     h_l = np.log(df['high'] / df['low'])
@@ -18,15 +19,6 @@ def gk_ewma_sigma(df, lambda_=0.94):
     ewma_var = gk.ewm(alpha=1-lambda_, adjust=False).mean()
     return np.sqrt(ewma_var)
 
-def rolling_ohlc(df: pd.DataFrame, window: int) -> pd.DataFrame:
-    return pd.DataFrame({
-        'timestamp_ms':   df['timestamp_ms'].shift(1).rolling(window).min(),
-        'open':  df['open'].shift(1).rolling(window).apply(lambda x: x[0], raw=True),
-        'high':  df['high'].shift(1).rolling(window).max(),
-        'low':   df['low'].shift(1).rolling(window).min(),
-        'close': df['close'].shift(1).rolling(window).apply(lambda x: x[-1], raw=True),
-    }).dropna()
-
 def z_score(series, window):
     mean = series.shift(1).rolling(window).mean()
     std  = series.shift(1).rolling(window).std()
@@ -37,10 +29,10 @@ def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12
 
     one_window_sigma = gk_ewma_sigma(df, lambda_ = decay)
 
-    six_window_df = rolling_ohlc(df, 6)
+    six_window_df = rolling_ohlc(df, 6, shift=1)
     six_window_sigma = gk_ewma_sigma(six_window_df, lambda_ = decay)
 
-    twelve_window_df = rolling_ohlc(df, 12)
+    twelve_window_df = rolling_ohlc(df, 12, shift=1)
     twelve_window_sigma = gk_ewma_sigma(twelve_window_df, lambda_ = decay)
 
     gks = pd.concat([one_window_sigma, six_window_sigma, twelve_window_sigma, df['close']], axis=1)
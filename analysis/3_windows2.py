@@ -1,10 +1,16 @@
 import time
+from collections import deque
+from statistics import NormalDist
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from binance_price_candle import previous_hours_to_interval, get_recent_24h_klines
+from binance_price_candle import INTERVAL_MS, get_klines_dataframe
+from candle_cache import next_candle_close, now_ms
+from gk_estimator import GK_CLOSE_WEIGHT, OnlineGKEWMA
+from range_simulation import simulate_ranges
+from resample import rolling_ohlc
+from variance_ratio import variance_ratios, z_score
 
 Z_SCORES = {
     0.65: 0.93,
@@ -19,7 +25,7 @@ Z_SCORES = {
 def get_z_score(conf: float) -> float:
     z = Z_SCORES.get(conf)
     if z is None:
-        raise KeyError(f"Missing z-score for confidence level {conf}")
+        z = NormalDist().inv_cdf((1 + conf) / 2)
     return z
 
 def gk_variance(df):
@@ -43,34 +49,80 @@ def gk_ewma_volatility(df, lambda_=0.94, conf_level=0.8):
     z_score = get_z_score(conf_level)
     return np.exp(z_score * vol)
 
-def rolling_ohlc(df: pd.DataFrame, window: int) -> pd.DataFrame:
-    return pd.DataFrame({
-        'timestamp_ms':   df['timestamp_ms'].rolling(window).min(),
-        'open':  df['open'].rolling(window).apply(lambda x: x[0], raw=True),
-        'high':  df['high'].rolling(window).max(),
-        'low':   df['low'].rolling(window).min(),
-        'close': df['close'].rolling(window).apply(lambda x: x[-1], raw=True),
-    }).dropna()
-
-def z_score(series, window):
-    mean = series.shift(1).rolling(window).mean()
-    std  = series.shift(1).rolling(window).std()
-    return (series - mean) / std
-
-def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12: float):
+# name -> (window, offset): sum of gk_1 over `window` bars ending `offset` bars back
+VAR_WINDOWS = {
+    "var_5": (5, 0),
+    "var_30": (30, 5),
+    "var_60": (60, 35),
+}
+
+class IncrementalWindows:
+    """
+    The latest var_5 / var_30 / var_60 and vol_5 of `run`, kept up to date
+    one closed candle at a time instead of recomputing the whole history.
+
+    Only the last 95 GK values, the last 5 candles (for the rolled 5-bar
+    OHLC) and the EWMA variance are needed per update; `df` still grows so
+    `run` can be called on it without refetching.
+    """
+
+    def __init__(self, history: pd.DataFrame, lambda_=0.94, conf_level=0.8, time_col="timestamp_ms"):
+        self.time_col = time_col
+        self.z_score = get_z_score(conf_level)
+        self.df = history.reset_index(drop=True)
+        self.gk = deque(gk_variance(self.df).to_numpy()[-self.span:], maxlen=self.span)
+        self.recent = deque(self.df[[time_col, "open", "high", "low", "close"]].tail(5).itertuples(index=False), maxlen=5)
+        self.vol = OnlineGKEWMA.from_frame(rolling_ohlc(self.df, 5, time_col=time_col), lambda_=lambda_, negative="abs", time_col=time_col)
+
+    @property
+    def span(self) -> int:
+        return max(window + offset for window, offset in VAR_WINDOWS.values())
+
+    @property
+    def last_timestamp(self):
+        return int(self.df[self.time_col].iloc[-1]) if len(self.df) else None
+
+    def append(self, candles: pd.DataFrame) -> int:
+        """Adds closed candles newer than the last one held; returns how many were new."""
+        if self.last_timestamp is not None:
+            candles = candles[candles[self.time_col] > self.last_timestamp]
+        if candles.empty:
+            return 0
+
+        for bar in candles[[self.time_col, "open", "high", "low", "close"]].itertuples(index=False):
+            bar = type(bar)(int(bar[0]), *(float(value) for value in bar[1:]))
+            self.gk.append(0.5 * np.log(bar.high / bar.low) ** 2 - GK_CLOSE_WEIGHT * np.log(bar.close / bar.open) ** 2)
+            self.recent.append(bar)
+            if len(self.recent) == 5:
+                self.vol.update(
+                    self.recent[0][0],
+                    self.recent[0].open,
+                    max(b.high for b in self.recent),
+                    min(b.low for b in self.recent),
+                    self.recent[-1].close,
+                )
+        self.df = pd.concat([self.df, candles], ignore_index=True)
+        return len(candles)
+
+    def latest(self) -> dict:
+        gk = list(self.gk)
+        values = {"timestamp": self.last_timestamp, "close": float(self.df["close"].iloc[-1])}
+        for name, (window, offset) in VAR_WINDOWS.items():
+            values[name] = float(sum(gk[len(gk) - offset - window:len(gk) - offset])) if len(gk) >= window + offset else float("nan")
+        values["ratio_5v30"] = values["var_5"] / values["var_30"]
+        values["ratio_5v60"] = values["var_5"] / values["var_60"]
+        values["vol_5"] = float(np.exp(self.z_score * self.vol.sigma) - 1)
+        values["lower"] = values["close"] * (1 - values["vol_5"])
+        values["upper"] = values["close"] * (1 + values["vol_5"])
+        return values
+
+def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12: float, multipliers=(1.0,), plot=True):
     decay = 0.94
 
     df['gk_1'] = gk_variance(df)
 
-    df_2 = df.copy()
-    df_2['var_5']  = df_2['gk_1'].rolling(5).sum()
-    df_2['var_30'] = df_2['gk_1'].shift(5).rolling(30).sum()
-    df_2['var_60'] = df_2['gk_1'].shift(35).rolling(60).sum()
-    df_2 = df_2.dropna()
-
-    df_2['ratio_5v30'] = df_2['var_5'] / df_2['var_30']
-    df_2['ratio_5v60'] = df_2['var_5'] / df_2['var_60']
-
+    df_2 = variance_ratios(df['gk_1'], VAR_WINDOWS)
+    df_2 = df_2[df.notna().all(axis=1)].dropna()
     df_2 = df_2[['ratio_5v30', 'ratio_5v60']]
     ohlc_5 = rolling_ohlc(df, 5)
     vol_5 = gk_ewma_volatility(ohlc_5) - 1
@@ -80,40 +132,19 @@ def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12
     df = df.dropna().iloc[4:]
     df['vol_5'] = vol_5.iloc[:len(df)]
 
-    has_opened_pos = False
-    predicted_lower_range = 0
-    predicted_upper_range = 0
-    in_range_slots = []
-    in_range_slot = 0
-    result = []
-
     ratio = max(1, float(df_2['ratio_5v30'].iloc[-1] / df_2['ratio_5v60'].iloc[-1]))
-    for idx, row in df.iterrows():
-        if not has_opened_pos:
-            open_price = row['close']
-            predicted_lower_range = open_price * (1 - row['vol_5'])
-            predicted_upper_range = open_price * (1 + row['vol_5'])
-
-            in_range_slot = 0
-            has_opened_pos = True
-            result.append(0)
-            continue
-
-        # print(predicted_lower_range, row['close'], predicted_upper_range)
-        if row['close'] > predicted_upper_range or row['close'] < predicted_lower_range:
-            result.append(-1)
-            in_range_slots.append(in_range_slot)
-            has_opened_pos = False
-        else:
-            in_range_slot += 1
-            result.append(1)
-
+    simulation = simulate_ranges(df['close'], df['vol_5'], multipliers)
+    in_range_slots = simulation["in_range_slots"][0].tolist()
+    result = simulation["results"][0]
+    row = df.iloc[-1]
     df['result'] = result
     predicted = df[df['result'] != 0]
     print(in_range_slots)
     print(predicted['result'].mean(), "range", row['vol_5'])
     print((1 - df.iloc[-1]['vol_5']) * df.iloc[-1]['close'], (1 + df.iloc[-1]['vol_5']) * df.iloc[-1]['close'], (df_2['ratio_5v30'] / df_2['ratio_5v60']).iloc[-1])
     print((1 - ratio * df.iloc[-1]['vol_5']) * df.iloc[-1]['close'], (1 + ratio * df.iloc[-1]['vol_5']) * df.iloc[-1]['close'])
+    if len(multipliers) > 1:
+        print(simulation["summary"])
     
     #     print(idx, row)
 
@@ -135,6 +166,10 @@ def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12
     # # # FN = ((gks['change_coming'] == 0) & (gks['result'] == 1)).sum() / len(gks) * 100
     # # # print(TP, FP, TN, FN)
 
+    if not plot:
+        return
+    import matplotlib.pyplot as plt
+
     df = df.join(df_2, how = "inner")
     fig, ax1 = plt.subplots(figsize=(12, 5))
 
@@ -164,20 +199,35 @@ def run(df: pd.DataFrame, window_size: int, threshold_1v6: float, threshold_1v12
     plt.tight_layout()
     plt.show()
 
-if __name__ == "__main__":
-    while True:
-        start_time, end_time = previous_hours_to_interval(1440)
-        interval = "8h"
-        output_file="./bnb_8h_klines.csv"
-        limit = 180
-
-        get_recent_24h_klines(start_time, end_time, limit, interval, output_file, "BNBUSDT")
+def fetch_closed(symbol: str, interval: str, start_time: int) -> pd.DataFrame:
+    end_time = now_ms()
+    df = get_klines_dataframe(start_time, end_time, interval, symbol)
+    df = df[df["timestamp"] + INTERVAL_MS[interval] <= end_time].rename(columns={"timestamp": "timestamp_ms"})
+    df[["high", "low"]] = df[["high", "low"]].astype(float)
+    return df.reset_index(drop=True)
 
-        df = pd.read_csv("./bnb_8h_klines.csv", parse_dates=["open_time"])
+if __name__ == "__main__":
+    import argparse
 
-        df = df.drop('volume(Volatile)', axis = 1)
-        # df = df.drop('volume(USDT)', axis = 1)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbol", default="BNBUSDT")
+    parser.add_argument("--interval", default="8h")
+    parser.add_argument("--hours", type=int, default=1440)
+    parser.add_argument("--headless", action="store_true", help="never plot")
+    args = parser.parse_args()
 
-        run(df, 10, 1.2, 1.0)
+    # fetch the history once, then only the candles that closed since
+    state = IncrementalWindows(fetch_closed(args.symbol, args.interval, now_ms() - args.hours * 60 * 60 * 1000))
+    run(state.df.copy(), 10, 1.2, 1.0, plot=not args.headless)
+    print(state.latest())
 
-        time.sleep(60)
\ No newline at end of file
+    while True:
+        # nothing changes until the next candle closes
+        time.sleep(max(next_candle_close(args.interval) - now_ms(), 0) / 1000 + 2)
+        try:
+            added = state.append(fetch_closed(args.symbol, args.interval, state.last_timestamp + INTERVAL_MS[args.interval]))
+        except Exception as e:
+            print(f"refresh failed: {e}")
+            continue
+        if added:
+            print(state.latest())
\ No newline at end of file
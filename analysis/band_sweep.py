@@ -0,0 +1,170 @@
+"""
+GK-EWMA band sweep over continuous conf x lambda x look_back grids.
+
+    python band_sweep.py --symbols BNBBTC BNBUSDT ETHUSDT --horizon 5m --hours 24
+
+Every config is scored on the same bars (those after the longest look-back)
+so coverage and width are comparable across the grid. z is get_z_score's:
+the served table for its levels, the normal inverse CDF for any other conf
+in (0, 1).
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from fluctuation_analysis import Z_SCORES, fetch_base_candles, gk_variance, horizon_window
+from resample import rolling_ohlc
+
+DEFAULT_CONFS = np.linspace(0.5, 0.99, 50)
+DEFAULT_LAMBDAS = np.linspace(0.80, 0.99, 20)
+DEFAULT_LOOK_BACKS = range(1, 15)
+
+def z_scores(confs) -> np.ndarray:
+    """get_z_score for each confidence level: the served table, else the two-sided normal z."""
+    from scipy.special import ndtri
+
+    confs = np.asarray(confs, dtype=np.float64)
+    z = ndtri((1 + confs) / 2)
+    for conf, table_z in Z_SCORES.items():
+        z[confs == conf] = table_z
+    return z
+
+def look_back_sigmas(gk: np.ndarray, look_back: int, lambdas) -> np.ndarray:
+    """look_back_sigma for many lambdas at once: (lambdas, rows - look_back)."""
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    powers = np.arange(look_back - 1, -1, -1, dtype=np.float64)
+    weights = (1 - lambdas) * lambdas ** powers[:, None]
+    weights[0] = lambdas ** (look_back - 1)
+
+    windows = sliding_window_view(gk[:-1], look_back)
+    return np.sqrt(windows @ weights).T
+
+def _coverage(ratios: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """Share of bars with ratio <= z, for every z: (lambdas, confs)."""
+    ordered = np.sort(ratios, axis=1)
+    return np.stack([np.searchsorted(row, z, side="right") for row in ordered]) / ratios.shape[1]
+
+def _mean_width(sigma: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    mean(exp(z * sigma) - exp(-z * sigma)) over bars for every z: (lambdas, confs).
+
+    2 sinh(x) = 2 * sum x^(2k+1) / (2k+1)!, so only the odd moments of sigma
+    are needed; the series is cut once its next term is negligible.
+    """
+    width = np.zeros((sigma.shape[0], len(z)))
+    x_max = float(np.nanmax(np.abs(z))) * float(np.nanmax(sigma, initial=0))
+    power = sigma.copy()
+    sigma_squared = sigma ** 2
+    coefficient = 2.0
+    for k in range(64):
+        width += np.outer(power.mean(axis=1), coefficient * z ** (2 * k + 1))
+        coefficient /= (2 * k + 2) * (2 * k + 3)
+        if coefficient * x_max ** (2 * k + 3) < 1e-15:
+            break
+        power *= sigma_squared
+    return width
+
+def sweep_bands(df: pd.DataFrame, confs=DEFAULT_CONFS, lambdas=DEFAULT_LAMBDAS, look_backs=DEFAULT_LOOK_BACKS) -> pd.DataFrame:
+    """
+    Coverage and mean relative band width for the full conf x lambda x
+    look_back grid on rolled bars `df`.
+
+    A bar's high is covered when log(high / open) <= z * sigma, so per
+    (lambda, look_back) the bars are reduced to one sorted ratio each and
+    every conf is a binary search rather than another pass.
+    """
+    df = df.sort_values("timestamp").reset_index(drop=True)
+    confs = np.asarray(confs, dtype=np.float64)
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    look_backs = [look_back for look_back in look_backs if look_back < len(df)]
+    if not look_backs:
+        raise ValueError(f"no look_back shorter than the {len(df)} bars available")
+
+    z = z_scores(confs)
+    gk = gk_variance(df).to_numpy()
+    start = max(look_backs)
+
+    open_ = df["open"].to_numpy(dtype=np.float64)[start:]
+    up_move = np.log(df["high"].to_numpy(dtype=np.float64)[start:] / open_)
+    down_move = np.log(open_ / df["low"].to_numpy(dtype=np.float64)[start:])
+
+    frames = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for look_back in look_backs:
+            sigma = look_back_sigmas(gk, look_back, lambdas)[:, start - look_back:]
+
+            # smallest z covering each bar; moves <= 0 are covered by any band
+            high_ratio = np.where(up_move <= 0, -np.inf, up_move / sigma)
+            low_ratio = np.where(down_move <= 0, -np.inf, down_move / sigma)
+
+            frames.append(pd.DataFrame({
+                "conf": np.tile(confs, len(lambdas)),
+                "z_score": np.tile(z, len(lambdas)),
+                "lambda": np.repeat(lambdas, len(confs)),
+                "look_back": look_back,
+                "coverage_high": _coverage(high_ratio, z).ravel(),
+                "coverage_low": _coverage(low_ratio, z).ravel(),
+                "full_coverage": _coverage(np.maximum(high_ratio, low_ratio), z).ravel(),
+                "mean_width": _mean_width(sigma, z).ravel(),
+            }))
+
+    results = pd.concat(frames, ignore_index=True)
+    results["pareto"] = pareto_frontier(results)
+    return results
+
+def pareto_frontier(results: pd.DataFrame, coverage="full_coverage", width="mean_width") -> np.ndarray:
+    """Mask of configs no other config beats on both higher coverage and narrower width."""
+    values = results[coverage].to_numpy()
+    order = np.lexsort((-values, results[width].to_numpy()))
+
+    # walking from the narrowest band, keep each config that raises the best coverage so far
+    ordered = values[order]
+    best_before = np.concatenate(([-np.inf], np.maximum.accumulate(ordered)[:-1]))
+    mask = np.zeros(len(results), dtype=bool)
+    mask[order] = ordered > best_before
+    return mask
+
+def sweep_symbol(symbol: str, horizon="5m", hours: float = 24, confs=DEFAULT_CONFS, lambdas=DEFAULT_LAMBDAS, look_backs=DEFAULT_LOOK_BACKS, base_interval="1m") -> pd.DataFrame:
+    base = fetch_base_candles(symbol, [horizon], hours, base_interval)
+    rolled = rolling_ohlc(base, horizon_window(horizon, base_interval), time_col="timestamp").reset_index(drop=True)
+    results = sweep_bands(rolled, confs, lambdas, look_backs)
+    results.insert(0, "symbol", symbol)
+    return results
+
+def sweep_symbols(symbols, horizon="5m", hours: float = 24, confs=DEFAULT_CONFS, lambdas=DEFAULT_LAMBDAS, look_backs=DEFAULT_LOOK_BACKS, base_interval="1m", max_workers=None) -> pd.DataFrame:
+    """sweep_symbol for every symbol, one process each; the frontier is per symbol."""
+    with ProcessPoolExecutor(max_workers=max_workers or len(symbols)) as pool:
+        futures = [
+            pool.submit(sweep_symbol, symbol, horizon, hours, confs, lambdas, list(look_backs), base_interval)
+            for symbol in symbols
+        ]
+        return pd.concat([future.result() for future in futures], ignore_index=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", nargs="+", default=["BNBBTC"])
+    parser.add_argument("--horizon", default="5m")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--conf", nargs=3, type=float, default=[0.5, 0.99, 50], metavar=("MIN", "MAX", "N"))
+    parser.add_argument("--lambda", dest="lambda_", nargs=3, type=float, default=[0.80, 0.99, 20], metavar=("MIN", "MAX", "N"))
+    parser.add_argument("--look-back-max", type=int, default=14)
+    parser.add_argument("--output", help="write the full grid to this CSV")
+    args = parser.parse_args()
+
+    results = sweep_symbols(
+        args.symbols,
+        horizon=args.horizon,
+        hours=args.hours,
+        confs=np.linspace(args.conf[0], args.conf[1], int(args.conf[2])),
+        lambdas=np.linspace(args.lambda_[0], args.lambda_[1], int(args.lambda_[2])),
+        look_backs=range(1, args.look_back_max + 1),
+    )
+    if args.output:
+        results.to_csv(args.output, index=False)
+
+    frontier = results[results["pareto"]].sort_values(["symbol", "mean_width"])
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(frontier.drop(columns="pareto").to_string(index=False))
@@ -0,0 +1,221 @@
+"""
+OHLCV bars from the local aggTrade tape.
+
+Time bars at any interval (sub-minute included), volume bars (a new bar once
+`size` qty has traded) and tick bars (every `size` trades), each with VWAP,
+quote volume, taker buy / sell volume and the trade count. BarBuilder
+streams over hour files and carries the unfinished last bar into the next
+file, so bars spanning a file boundary come out whole:
+
+    bars = build_bars("./data/trades/BNBBTC", "time", 60_000, start_ms, end_ms)
+    bars = build_bars("./data/trades/BNBBTC.tape", "volume", 50.0)
+    base = local_base_candles("./data/trades/BNBBTC", ["5m"], hours=3)
+    detect_horizons(base, ["5m"])
+
+Time bars carry the kline columns (timestamp, open, high, low, close,
+volume, quote_asset_volume), so they drop into code written for
+get_klines_dataframe.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from binance_price_candle import INTERVAL_MS
+from loaders import read_trades
+from tape_binary import TAPE_SUFFIX, BinaryTape
+from tape_manifest import clip_rows, files_in_range, latest_ms
+
+BAR_KINDS = ("time", "volume", "tick")
+
+# Binance quantities have at most 8 decimals
+QTY_UNITS = 10 ** 8
+
+BAR_COLUMNS = [
+    "timestamp", "open", "high", "low", "close", "volume", "quote_asset_volume",
+    "vwap", "taker_buy_volume", "taker_sell_volume", "trades", "close_time",
+]
+
+def _is_maker(values) -> np.ndarray:
+    if values.dtype == bool:
+        return values.to_numpy()
+    # hour files written by csv.writer hold "True" / "False"
+    return values.astype(str).str.lower().eq("true").to_numpy()
+
+def aggregate_bars(tape: pd.DataFrame, keys: np.ndarray, timestamps=None) -> pd.DataFrame:
+    """
+    One bar per run of equal `keys` over a time-ordered tape. Bars are
+    stamped with `timestamps` (one per bar) or their first trade's time.
+    """
+    if len(tape) == 0:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    price = tape["price"].to_numpy(dtype=np.float64)
+    qty = tape["qty"].to_numpy(dtype=np.float64)
+    times = tape["timestamp_ms"].to_numpy(dtype=np.int64)
+    maker = _is_maker(tape["is_maker"])
+
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+    ends = np.append(starts[1:], len(price))
+    volume = np.add.reduceat(qty, starts)
+    quote = np.add.reduceat(price * qty, starts)
+    # the buyer being the maker means the taker sold
+    taker_sell = np.add.reduceat(np.where(maker, qty, 0.0), starts)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap = quote / volume
+    return pd.DataFrame({
+        "timestamp": times[starts] if timestamps is None else timestamps,
+        "open": price[starts],
+        "high": np.maximum.reduceat(price, starts),
+        "low": np.minimum.reduceat(price, starts),
+        "close": price[ends - 1],
+        "volume": volume,
+        "quote_asset_volume": quote,
+        "vwap": vwap,
+        "taker_buy_volume": volume - taker_sell,
+        "taker_sell_volume": taker_sell,
+        "trades": ends - starts,
+        "close_time": times[ends - 1],
+    })
+
+class BarBuilder:
+    """
+    Incremental bars: feed() time-ordered tape chunks, get the bars they
+    complete; the trades of the still-open bar are carried into the next
+    chunk. flush() returns that last, partial bar.
+    """
+
+    def __init__(self, kind: str = "time", size=INTERVAL_MS["1m"]):
+        if kind not in BAR_KINDS:
+            raise ValueError(f"Unknown bar kind {kind}, expected one of {BAR_KINDS}")
+        if size <= 0:
+            raise ValueError(f"bar size must be positive, got {size}")
+        self.kind = kind
+        self.size = size
+        self.carry = None
+        self.offset = 0  # trades (tick) or qty units (volume) before the carried trades
+
+    def _keys(self, tape: pd.DataFrame):
+        """Bar key of every trade and the running total behind each trade."""
+        if self.kind == "time":
+            return tape["timestamp_ms"].to_numpy(dtype=np.int64) // self.size, None
+        if self.kind == "tick":
+            running = self.offset + np.arange(1, len(tape) + 1)
+            return (running - 1) // self.size, running
+        # whole qty units so the running total is exact however the tape is chunked
+        units = np.rint(tape["qty"].to_numpy(dtype=np.float64) * QTY_UNITS).astype(np.int64)
+        running = self.offset + np.cumsum(units)
+        # a trade belongs to the bar that was open when it printed
+        return (running - units) // int(round(self.size * QTY_UNITS)), running
+
+    def _bars(self, tape: pd.DataFrame, keys: np.ndarray) -> pd.DataFrame:
+        if self.kind == "time":
+            starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1)) if len(keys) else keys
+            return aggregate_bars(tape, keys, keys[starts] * self.size)
+        return aggregate_bars(tape, keys)
+
+    def feed(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        tape = chunk if self.carry is None else pd.concat([self.carry, chunk], ignore_index=True)
+        if len(tape) == 0:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        keys, running = self._keys(tape)
+
+        # everything before the last bar's first trade is final
+        done = int(np.searchsorted(keys, keys[-1], side="left"))
+        if running is not None and done > 0:
+            self.offset = running[done - 1]
+        self.carry = tape.iloc[done:].reset_index(drop=True)
+        return self._bars(tape.iloc[:done], keys[:done])
+
+    def flush(self) -> pd.DataFrame:
+        if self.carry is None or len(self.carry) == 0:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        keys, _ = self._keys(self.carry)
+        bars = self._bars(self.carry, keys)
+        self.carry = None
+        return bars
+
+def fill_time_gaps(bars: pd.DataFrame, interval_ms: int, end_ms=None) -> pd.DataFrame:
+    """
+    Adds the intervals without trades as flat bars at the previous close
+    with zero volume, like Binance klines. Intervals before the first trade
+    have no previous close and are left out.
+    """
+    if bars.empty:
+        return bars
+    first = bars["timestamp"].iloc[0]
+    last = bars["timestamp"].iloc[-1] if end_ms is None else (end_ms - 1) // interval_ms * interval_ms
+    full = pd.RangeIndex(int(first), int(last) + 1, interval_ms)
+    filled = bars.set_index("timestamp").reindex(full)
+
+    missing = filled["close"].isna()
+    close = filled["close"].ffill()
+    for column in ("open", "high", "low", "close", "vwap"):
+        filled[column] = filled[column].where(~missing, close)
+    for column in ("volume", "quote_asset_volume", "taker_buy_volume", "taker_sell_volume", "trades"):
+        filled[column] = filled[column].fillna(0)
+    filled["trades"] = filled["trades"].astype(np.int64)
+    filled["close_time"] = filled["close_time"].fillna(pd.Series(full + interval_ms - 1, index=full)).astype(np.int64)
+    return filled.rename_axis("timestamp").reset_index()
+
+def tape_chunks(source: str, start_ms=None, end_ms=None):
+    """
+    Time-ordered tape frames over [start_ms, end_ms) from a folder of hour
+    files (one per file) or a binary .tape (fixed-size slices of the map).
+    """
+    if source.endswith(TAPE_SUFFIX):
+        yield from BinaryTape(source).chunks(start_ms, end_ms)
+        return
+    for filename in files_in_range(source, start_ms, end_ms):
+        # float64 quantities keep volume bar boundaries exact, as on a .tape
+        chunk = clip_rows(read_trades(os.path.join(source, filename), dtypes={"qty": np.float64}), start_ms, end_ms)
+        yield chunk.sort_values(["timestamp_ms", "agg_id"], kind="stable")
+
+def build_bars(folder: str, kind: str = "time", size=INTERVAL_MS["1m"], start_ms=None, end_ms=None, fill_gaps: bool = True) -> pd.DataFrame:
+    """
+    Bars over [start_ms, end_ms) of a tape folder or .tape file, streaming
+    one chunk at a time. Time bars are aligned to multiples of `size` and,
+    with `fill_gaps`, include intervals without trades.
+    """
+    builder = BarBuilder(kind, size)
+    parts = [builder.feed(chunk) for chunk in tape_chunks(folder, start_ms, end_ms)]
+    parts.append(builder.flush())
+    parts = [part for part in parts if len(part)]
+    bars = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=BAR_COLUMNS)
+    if kind == "time" and fill_gaps:
+        bars = fill_time_gaps(bars, size, end_ms)
+    return bars
+
+def local_base_candles(folder: str, horizons, hours: float = 3, base_interval: str = "1m") -> pd.DataFrame:
+    """
+    fetch_base_candles from the local tape: the closed base candles of the
+    last `hours` (or the longest horizon's minimum) before the newest trade.
+    """
+    from fluctuation_analysis import MIN_EVALUATION_ROWS, horizon_window
+
+    step = INTERVAL_MS[base_interval]
+    longest = max(horizon_window(h, base_interval) for h in horizons)
+    rows = max(int(hours * 60 * 60 * 1000 / step), longest + MIN_EVALUATION_ROWS)
+
+    newest = BinaryTape(folder).end_ms if folder.endswith(TAPE_SUFFIX) else latest_ms(folder)
+    if newest is None:
+        raise ValueError(f"no trades in {folder}")
+    # the candle holding the newest trade may still be forming
+    end_ms = newest // step * step
+    return build_bars(folder, "time", step, end_ms - rows * step, end_ms)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", help="aggTrade hour files, e.g. ./data/trades/BNBBTC, or a .tape file")
+    parser.add_argument("--kind", choices=BAR_KINDS, default="time")
+    parser.add_argument("--size", type=float, default=60_000, help="interval ms, qty per bar or trades per bar")
+    parser.add_argument("--output", help="write the bars to this CSV")
+    args = parser.parse_args()
+
+    size = args.size if args.kind == "volume" else int(args.size)
+    bars = build_bars(args.folder, args.kind, size)
+    if args.output:
+        bars.to_csv(args.output, index=False)
+    print(bars.tail(20).to_string(index=False))
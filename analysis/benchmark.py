@@ -0,0 +1,216 @@
+"""
+Benchmarks for the analysis hot paths on synthetic data.
+
+    python benchmark.py                                  # 1e3..1e5 rows
+    python benchmark.py --sizes 1e3 1e4 1e5 1e6 1e7 --no-cap
+    python benchmark.py --only rolling_ohlc five_min_trend
+    python benchmark.py --compare benchmark_results/<commit>.json
+    python benchmark.py --startup                        # import time of the entry points
+
+Every run is saved as benchmark_results/<commit>[-dirty].json so timings can
+be compared across commits. Benchmarks whose cost grows badly with size
+(row loops, DBSCAN) have a default row cap; --no-cap lifts it.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import synthetic
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+
+def _quiet(fn, *args, **kwargs):
+    # several analysis functions print progress or whole frames
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+def _ohlcv(rows, workdir, time_col="timestamp_ms"):
+    return synthetic.ohlcv_1m(rows, time_col=time_col)
+
+def _tape_folder(rows, workdir):
+    folder = os.path.join(workdir, f"tape_{rows}")
+    if not os.path.isdir(folder):
+        synthetic.write_hour_files(synthetic.agg_trade_tape(rows), folder)
+    return folder
+
+def _binned_trades(rows, workdir):
+    from price_clustering import calculate_weights, data_prep
+
+    tape = synthetic.agg_trade_tape(rows)
+    trades = pd.DataFrame({
+        "timestamp_ms": tape["timestamp_ms"],
+        "price": 1 / tape["price"],
+        "volume": tape["qty"],
+    })
+    raw = trades.copy()
+    latest_time, binned = data_prep(trades)
+    return raw, calculate_weights(binned, latest_time)
+
+def bench_rolling_ohlc(df):
+    from resample import rolling_ohlc
+    rolling_ohlc(df, 5)
+
+def bench_run_detection(df):
+    from fluctuation_analysis import detect_horizons
+    detect_horizons(df, ["5m"])
+
+def bench_five_min_trend(df):
+    from trend_analysis_5m import five_min_trend
+    _quiet(five_min_trend, df.copy())
+
+def bench_aggregate_volume_by_price(folder):
+    from binance_price_volumn import aggregate_volume_by_price
+    _quiet(aggregate_volume_by_price, folder, os.path.join(folder, "..", "volume.csv.out"))
+
+def bench_calculate_price_duration(folder):
+    from binance_price_volumn import calculate_price_duration
+    _quiet(calculate_price_duration, folder, os.path.join(folder, "..", "duration.csv.out"))
+
+def bench_generate_bands(data):
+    from price_clustering import generate_liquidity_bands
+    _quiet(generate_liquidity_bands, data[1], bandwidth=1.0)
+
+def bench_gmm_bands(data):
+    from price_clustering import gmm_bands
+    np.random.seed(0)
+    _quiet(gmm_bands, data[1], 3)
+
+def bench_kde_bands(data):
+    from price_clustering import kde_bands
+    _quiet(kde_bands, data[1])
+
+def bench_dbscan_bands(data):
+    from price_clustering import dbscan_bands
+    _quiet(dbscan_bands, data[0])
+
+# name -> (setup(rows, workdir), run(setup result), default row cap)
+BENCHMARKS = {
+    "rolling_ohlc": (_ohlcv, bench_rolling_ohlc, None),
+    "run_detection": (lambda rows, workdir: _ohlcv(rows, workdir, "timestamp"), bench_run_detection, 10 ** 6),
+    "five_min_trend": (_ohlcv, bench_five_min_trend, None),
+    "aggregate_volume_by_price": (_tape_folder, bench_aggregate_volume_by_price, None),
+    "calculate_price_duration": (_tape_folder, bench_calculate_price_duration, 10 ** 6),
+    "generate_bands": (_binned_trades, bench_generate_bands, 10 ** 6),
+    "gmm_bands": (_binned_trades, bench_gmm_bands, 10 ** 6),
+    "kde_bands": (_binned_trades, bench_kde_bands, 10 ** 6),
+    "dbscan_bands": (_binned_trades, bench_dbscan_bands, 10 ** 5),
+}
+
+# entry points that are started often: the CLI, the servers and the cron jobs
+STARTUP_COMMANDS = {
+    "cli --help": ["cli.py", "--help"],
+    "import fluctuation_server": ["-c", "import fluctuation_server"],
+    "import fluctuation_asgi": ["-c", "import fluctuation_asgi"],
+    "import binance_agg_trade": ["-c", "import binance_agg_trade"],
+    "import binance_price_volumn": ["-c", "import binance_price_volumn"],
+    "import price_clustering": ["-c", "import price_clustering"],
+    "import trend_analysis_5m": ["-c", "import trend_analysis_5m"],
+    "import band_sweep": ["-c", "import band_sweep"],
+}
+
+def run_startup(names=None, repeat: int = 5) -> list:
+    """Wall time of a fresh interpreter running each entry point, best of `repeat`."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for name in names or STARTUP_COMMANDS:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *STARTUP_COMMANDS[name]], cwd=here, check=True, stdout=subprocess.DEVNULL)
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        results.append({"benchmark": f"startup:{name}", "rows": 0, "seconds": best, "rows_per_s": None})
+        print(f"{name:<34} {best * 1000:>10.1f} ms")
+    return results
+
+def git_revision() -> str:
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=here, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD", "--", "."], cwd=here).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if dirty else "")
+
+def run_benchmarks(sizes, names=None, repeat: int = 3, cap: bool = True) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names or BENCHMARKS:
+            setup, run, max_rows = BENCHMARKS[name]
+            for rows in sizes:
+                if cap and max_rows is not None and rows > max_rows:
+                    continue
+                data = setup(rows, workdir)
+
+                # fewer repeats once a single run gets expensive
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    run(data)
+                    timings.append(time.perf_counter() - start)
+                    if timings[-1] > 5:
+                        break
+
+                best = min(timings)
+                results.append({"benchmark": name, "rows": rows, "seconds": best, "rows_per_s": rows / best})
+                print(f"{name:<28} rows={rows:>10} {best * 1000:>12.2f} ms {rows / best:>14.0f} rows/s")
+    return results
+
+def save_results(results: list, path: str = None) -> str:
+    revision = git_revision()
+    path = path or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "revision": revision,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }, f, indent=2)
+    return path
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["benchmark"], r["rows"]): r["seconds"] for r in baseline["results"]}
+
+    print(f"\nvs {baseline['revision']} (ratio > 1 means slower now)")
+    for r in results:
+        old = before.get((r["benchmark"], r["rows"]))
+        if old is None:
+            continue
+        ratio = r["seconds"] / old
+        flag = "  REGRESSION" if ratio > 1.2 else ""
+        print(f"{r['benchmark']:<28} rows={r['rows']:>10} {old * 1000:>10.2f} -> {r['seconds'] * 1000:>10.2f} ms  x{ratio:.2f}{flag}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-cap", action="store_true", help="run every benchmark at every size")
+    parser.add_argument("--output", help="results file (default benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--startup", action="store_true", help="time interpreter start + imports of the entry points instead")
+    args = parser.parse_args()
+
+    if args.startup:
+        results = run_startup(repeat=max(args.repeat, 5))
+    else:
+        results = run_benchmarks([int(s) for s in args.sizes], args.only, args.repeat, cap=not args.no_cap)
+    print(f"saved {save_results(results, args.output)}")
+    if args.compare:
+        compare(results, args.compare)
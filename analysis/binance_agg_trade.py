@@ -94,9 +94,57 @@ def fetch_agg_trades_by_hour(symbol: str, folder: str, start_time: datetime, end
 
             time.sleep(0.2)
     finally:
+        from tape_manifest import update_manifest
+
         close_all_writers(writers)
+        update_manifest(folder, [f"{hour_key}.csv" for hour_key in writers])
         print("All files closed. Done.")
 
+def fetch_agg_trades_by_id(symbol: str, first_id: int, last_id: int) -> list:
+    """Raw aggTrades with first_id <= agg ID <= last_id, paging with fromId."""
+    trades = []
+    from_id = first_id
+    while from_id <= last_id:
+        params = {"symbol": symbol.upper(), "limit": MAX_LIMIT, "fromId": from_id}
+        response = requests.get(BASE_URL + "/api/v3/aggTrades", params=params)
+        response.raise_for_status()
+        page = [t for t in response.json() if t["a"] <= last_id]
+        if not page:
+            break
+        trades.extend(page)
+        from_id = page[-1]["a"] + 1
+        time.sleep(0.2)
+    return trades
+
+def merge_trades_into_hours(trades, folder: str) -> list:
+    """
+    Adds raw aggTrades to the hour files they belong to, keeping each file
+    in agg ID order without duplicates. Returns the names of the files changed.
+    """
+    import pandas as pd
+
+    from tape_manifest import update_manifest
+
+    by_hour = {}
+    for t in trades:
+        by_hour.setdefault(get_hour_key(t["T"]), []).append([t["a"], t["T"], t["p"], t["q"], t["m"]])
+
+    columns = ["agg_id", "timestamp_ms", "price", "qty", "is_maker"]
+    changed = []
+    for hour_key, rows in by_hour.items():
+        path = f"{folder}/{hour_key}.csv"
+        # keep the stored text as is, only the new rows go through str()
+        new = pd.DataFrame(rows, columns=columns).astype(str)
+        old = pd.read_csv(path, dtype=str) if os.path.exists(path) else new.iloc[:0]
+        merged = pd.concat([old, new], ignore_index=True).drop_duplicates("agg_id")
+        merged = merged.sort_values("agg_id", key=lambda ids: ids.astype("int64"))
+        tmp = f"{path}.{os.getpid()}.tmp"
+        merged.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        changed.append(f"{hour_key}.csv")
+    update_manifest(folder, changed)
+    return changed
+
 def fetch_interval_by_hour(symbol: str, folder: str, duration: timedelta):
     now = datetime.utcnow().replace(tzinfo=tz.UTC)
     start = now - duration
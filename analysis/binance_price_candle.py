@@ -4,6 +4,9 @@ import csv
 from datetime import datetime
 import pandas as pd
 
+from loaders import typed_klines
+from metrics import STAGE_SECONDS, ROWS_PROCESSED
+
 def previous_hours_to_interval(hours): 
     end_time = int(time.time() * 1000)
     start_time = end_time - hours * 60 * 60 * 1000
@@ -61,9 +64,11 @@ def get_recent_24h_klines_dataframe(start_time, end_time, limit, interval, symbo
         "limit": limit,
     }
 
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    data = response.json()
+    with STAGE_SECONDS.time(stage="fetch"):
+        response = requests.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+    ROWS_PROCESSED.inc(len(data), stage="fetch")
 
     rows = []
     for kline in data:
@@ -78,4 +83,40 @@ def get_recent_24h_klines_dataframe(start_time, end_time, limit, interval, symbo
                 "quote_asset_volume": kline[7],
             }
         )
-    return pd.DataFrame(rows)
+    return typed_klines(pd.DataFrame(rows))
+
+KLINES_MAX_LIMIT = 1000
+
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "quote_asset_volume"]
+
+INTERVAL_MS = {
+    "1m": 60 * 1000,
+    "3m": 3 * 60 * 1000,
+    "5m": 5 * 60 * 1000,
+    "15m": 15 * 60 * 1000,
+    "30m": 30 * 60 * 1000,
+    "1h": 60 * 60 * 1000,
+    "2h": 2 * 60 * 60 * 1000,
+    "4h": 4 * 60 * 60 * 1000,
+    "6h": 6 * 60 * 60 * 1000,
+    "8h": 8 * 60 * 60 * 1000,
+    "12h": 12 * 60 * 60 * 1000,
+    "1d": 24 * 60 * 60 * 1000,
+}
+
+def get_klines_dataframe(start_time, end_time, interval, symbol="BTCUSDT"):
+    """Same frame as get_recent_24h_klines_dataframe, paging past the 1000 row limit."""
+    step = INTERVAL_MS[interval]
+    frames = []
+    while start_time < end_time:
+        df = get_recent_24h_klines_dataframe(start_time, end_time, KLINES_MAX_LIMIT, interval, symbol)
+        if df.empty:
+            break
+        frames.append(df)
+        start_time = int(df["timestamp"].iloc[-1]) + step
+        if len(df) < KLINES_MAX_LIMIT:
+            break
+
+    if not frames:
+        return typed_klines(pd.DataFrame(columns=KLINE_COLUMNS))
+    return pd.concat(frames, ignore_index=True)
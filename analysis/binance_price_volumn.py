@@ -1,10 +1,14 @@
 import os
 import pandas as pd
+from profiling import profiled
+from loaders import read_trades
+from tape_integrity import missing_in_files
+from tape_manifest import clip_rows, files_in_range
 
-def process_single_file(filepath):
+@profiled
+def process_single_file(filepath, start_ms=None, end_ms=None):
     """Reads a file and returns volume summary by 1-decimal price bins."""
-    df = pd.read_csv(filepath, dtype={"price": float, "qty": float, "is_maker": str})
-    df["is_maker"] = df["is_maker"].str.lower() == "true"
+    df = clip_rows(read_trades(filepath, ["timestamp_ms", "price", "qty", "is_maker"]), start_ms, end_ms)
     price_to_price_bin(df)
 
     maker_vol = df[df["is_maker"]].groupby("price_bin")["qty"].sum().rename("maker_volume")
@@ -19,15 +23,14 @@ def price_to_price_bin(df):
     # df["price_bin"] = (df["price"].astype(float) // 0.05) * 0.05
     # df["price_bin"] = (df["price"].astype(float) // 0.0000001) * 0.0000001
 
-def aggregate_volume_by_price(folder_path: str, output_file: str):
+def aggregate_volume_by_price(folder_path: str, output_file: str, start_ms=None, end_ms=None):
     all_summaries = []
 
-    for filename in os.listdir(folder_path):
-        if not filename.endswith(".csv"):
-            continue
+    # only the files the manifest says overlap [start_ms, end_ms)
+    for filename in files_in_range(folder_path, start_ms, end_ms):
         filepath = os.path.join(folder_path, filename)
         print(f"Processing {filename}...")
-        summary = process_single_file(filepath)
+        summary = process_single_file(filepath, start_ms, end_ms)
         all_summaries.append(summary)
 
     print(f"Combining {len(all_summaries)} partial summaries...")
@@ -46,11 +49,16 @@ def aggregate_volume_by_price(folder_path: str, output_file: str):
 
 from collections import defaultdict
 
-def calculate_price_duration(folder_path, output_csv="price_duration.csv", round_to=1):
+@profiled
+def calculate_price_duration(folder_path, output_csv="price_duration.csv", round_to=1, start_ms=None, end_ms=None, check_gaps=True):
     durations = defaultdict(int)  # {rounded_price: total_duration_ms}
 
-    # Process each file in chronological order (based on filename)
-    files = sorted(f for f in os.listdir(folder_path) if f.endswith(".csv"))
+    # Process each file overlapping [start_ms, end_ms) in chronological order
+    files = files_in_range(folder_path, start_ms, end_ms)
+    # manifest only, so a narrow window still opens just its own files
+    missing = missing_in_files(folder_path, files) if check_gaps else 0
+    if missing:
+        print(f"Warning: at least {missing} trades missing, durations across them are overstated (tape_integrity.py --repair)")
 
     last_price = None
     last_time = None
@@ -58,8 +66,8 @@ def calculate_price_duration(folder_path, output_csv="price_duration.csv", round
     for file in files:
         filepath = os.path.join(folder_path, file)
         print(f"Processing {file}...")
-        df = pd.read_csv(filepath, usecols=["timestamp_ms", "price"])
-        df["timestamp_ms"] = pd.to_numeric(df["timestamp_ms"])
+        df = read_trades(filepath, ["timestamp_ms", "price"])
+        df = clip_rows(df, start_ms, end_ms)
         price_to_price_bin(df)
 
         for row in df.itertuples():
@@ -82,9 +90,9 @@ def calculate_price_duration(folder_path, output_csv="price_duration.csv", round
     result_df.to_csv(output_csv, index=False)
     return result_df
 
-import matplotlib.pyplot as plt
-
 def plot_volume_and_duration(df_vol, df_dur, title="Volume & Duration by Price"):
+    import matplotlib.pyplot as plt
+
     # Ensure price is float and sorted
     df_vol["price"] = df_vol["price"].astype(float)
     df_dur["price"] = df_dur["price"].astype(float)
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from binance_price_candle import INTERVAL_MS
+from metrics import CACHE_REQUESTS
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+def last_closed_candle(interval: str, at_ms: int = None) -> int:
+    """Open time of the most recent fully closed candle."""
+    step = INTERVAL_MS[interval]
+    at_ms = now_ms() if at_ms is None else at_ms
+    return (at_ms // step) * step - step
+
+def next_candle_close(interval: str, at_ms: int = None) -> int:
+    """Time at which the currently forming candle closes."""
+    return last_closed_candle(interval, at_ms) + 2 * INTERVAL_MS[interval]
+
+class CandleCache:
+    """
+    Bounded LRU of results keyed by (key, last closed candle). An entry
+    expires when the next candle of its interval closes.
+
+    Concurrent callers asking for the same entry while it is being computed
+    wait on the same Future instead of repeating the work (single flight).
+    A failed computation is not cached; every waiter sees the exception.
+    """
+
+    def __init__(self, interval: str = "1m", max_entries: int = 256):
+        self.interval = interval
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (key, candle) -> (value, expires_at_ms)
+        self._inflight = {}
+        self._inflight_async = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute, interval: str = None):
+        interval = interval or self.interval
+        now = now_ms()
+        candle = last_closed_candle(interval, now)
+        entry_key = (key, candle)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(result="hit")
+                return entry[0]
+
+            future = self._inflight.get(entry_key)
+            owner = future is None
+            CACHE_REQUESTS.inc(result="miss" if owner else "shared")
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._inflight[entry_key] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[entry_key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[entry_key] = (value, next_candle_close(interval, now))
+            self._entries.move_to_end(entry_key)
+            self._evict(now)
+            del self._inflight[entry_key]
+        future.set_result(value)
+        return value
+
+    async def get_or_compute_async(self, key, compute, interval: str = None):
+        """
+        Same as get_or_compute for asyncio callers: `compute` is a coroutine
+        function and waiters await the shared future instead of blocking the
+        event loop.
+        """
+        interval = interval or self.interval
+        now = now_ms()
+        candle = last_closed_candle(interval, now)
+        entry_key = (key, candle)
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(result="hit")
+                return entry[0]
+
+            future = self._inflight_async.get(entry_key)
+            owner = future is None
+            CACHE_REQUESTS.inc(result="miss" if owner else "shared")
+            if owner:
+                self.misses += 1
+                future = asyncio.get_running_loop().create_future()
+                self._inflight_async[entry_key] = future
+
+        if not owner:
+            return await asyncio.shield(future)
+
+        try:
+            value = await compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight_async[entry_key]
+            future.set_exception(e)
+            # waiters re-raise it; mark retrieved so an unawaited future does not warn
+            future.exception()
+            raise
+
+        with self._lock:
+            self._entries[entry_key] = (value, next_candle_close(interval, now))
+            self._entries.move_to_end(entry_key)
+            self._evict(now)
+            del self._inflight_async[entry_key]
+        future.set_result(value)
+        return value
+
+    def _evict(self, now: int):
+        for entry_key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+            del self._entries[entry_key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def precompute(self, key, compute, interval: str = None, delay_s: float = 2.0) -> threading.Thread:
+        """
+        Background thread that fills `key` shortly after every candle close,
+        so requests are answered from memory. `delay_s` gives the exchange
+        time to publish the closed kline.
+        """
+        def loop():
+            while True:
+                try:
+                    self.get_or_compute(key, compute, interval)
+                except Exception as e:
+                    print(f"precompute {key} failed: {e}")
+                wait_ms = next_candle_close(interval or self.interval) - now_ms()
+                time.sleep(max(wait_ms, 0) / 1000 + delay_s)
+
+        thread = threading.Thread(target=loop, name=f"precompute-{key}", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,179 @@
+"""
+One command line for the analysis tools.
+
+    python cli.py fetch BNBBTC --hours 6
+    python cli.py fetch BNBBTC --repair       # refetch the agg_id gaps only
+    python cli.py profile ./data/trades/BNBBTC --plot
+    python cli.py bands ./data/trades/BNBBTC --method kde --invert
+    python cli.py vol BNBBTC --horizons 5m 1h
+    python cli.py trend --folder ./data/trades/BNBUSDT --sweep
+    python cli.py serve --asgi --workers 2
+
+Only argparse is imported here. Every subcommand imports what it needs
+(pandas, sklearn, scipy, flask, ...) when it runs, so `--help`, cron jobs
+and the servers only pay for their own dependencies;
+`python benchmark.py --startup` times this.
+"""
+import argparse
+import os
+import sys
+
+BAND_METHODS = ("meanshift", "gmm", "kde", "dbscan")
+
+def fetch(args):
+    from datetime import timedelta
+
+    from binance_agg_trade import clear_folder, fetch_interval_by_hour
+
+    folder = args.folder or os.path.join("./data/trades", args.symbol.upper())
+    os.makedirs(folder, exist_ok=True)
+    if args.repair:
+        from tape_integrity import gap_frame, repair_folder
+
+        print(f"{len(gap_frame(repair_folder(folder, args.symbol)))} gaps left")
+        return
+    if args.clear:
+        clear_folder(folder)
+    fetch_interval_by_hour(args.symbol, folder, timedelta(hours=args.hours))
+
+def profile(args):
+    from binance_price_volumn import aggregate_volume_by_price, calculate_price_duration
+
+    name = os.path.basename(os.path.normpath(args.folder))
+    volume = aggregate_volume_by_price(args.folder, name + "_price_volumn.csv", start_ms=args.start_ms, end_ms=args.end_ms)
+    duration = calculate_price_duration(args.folder, name + "_price_duration.csv", start_ms=args.start_ms, end_ms=args.end_ms)
+    if args.plot:
+        from binance_price_volumn import plot_volume_and_duration
+
+        plot_volume_and_duration(volume, duration)
+
+def bands(args):
+    from price_clustering import (
+        calculate_duration, calculate_weights, data_prep, dbscan_bands, evaluate_coverage,
+        generate_bands, gmm_bands, kde_bands,
+    )
+    from tape_manifest import latest_ms, read_range
+
+    newest = latest_ms(args.folder)
+    if newest is None:
+        raise SystemExit(f"no trades in {args.folder}")
+    trades = read_range(args.folder, newest - int(args.hours * 60 * 60 * 1000), newest + 1, ["price", "qty"])
+    trades = trades.rename(columns={"qty": "volume"})[["timestamp_ms", "price", "volume"]]
+    if args.invert:
+        trades["price"] = 1 / trades["price"]
+
+    calculate_duration(trades)
+    raw = trades.copy()
+    latest_time, binned = data_prep(trades.drop(columns="duration"), price_bin_size=args.bin_size)
+    if args.method == "meanshift":
+        result = generate_bands(binned, latest_time)
+    elif args.method == "dbscan":
+        result = dbscan_bands(raw)
+    else:
+        weighted = calculate_weights(binned, latest_time)
+        result = gmm_bands(weighted, args.n_bands) if args.method == "gmm" else kde_bands(weighted, args.n_bands)
+    if not result:
+        raise SystemExit(f"{args.method} found no bands")
+    print(evaluate_coverage(result, raw).to_string(index=False))
+
+def vol(args):
+    import pandas as pd
+
+    from fluctuation_analysis import detect_horizons, run_multi_horizon
+
+    if args.folder:
+        from bar_builder import local_base_candles
+
+        base = local_base_candles(args.folder, args.horizons, hours=args.hours)
+        results = detect_horizons(base, args.horizons, decay=args.decay, conf=args.conf)
+    else:
+        results = run_multi_horizon(args.symbol, horizons=args.horizons, hours=args.hours, decay=args.decay, conf=args.conf)
+    for horizon, result in results.items():
+        print(horizon, pd.DataFrame([result["metrics"]]).to_string(index=False), result["duration"], result["range"])
+
+def trend(args):
+    from trend_analysis_5m import five_min_trend, sweep_five_min_trend
+
+    if args.folder:
+        from bar_builder import local_base_candles
+
+        df = local_base_candles(args.folder, ["1m"], hours=args.hours)
+    else:
+        from binance_price_candle import get_klines_dataframe, previous_hours_to_interval
+
+        start_time, end_time = previous_hours_to_interval(args.hours)
+        df = get_klines_dataframe(int(start_time), end_time, "1m", args.symbol)
+    if args.sweep:
+        print(sweep_five_min_trend(df).sort_values("hit_rate", ascending=False).head(20).to_string(index=False))
+    else:
+        print(five_min_trend(df))
+
+def serve(args):
+    if args.asgi:
+        import uvicorn
+
+        uvicorn.run("fluctuation_asgi:app", host=args.host, port=args.port, workers=args.workers)
+        return
+    from fluctuation_server import DEFAULT_PARAMS, app, cache, compute
+
+    cache.precompute(tuple(sorted(DEFAULT_PARAMS.items())), lambda: compute(DEFAULT_PARAMS))
+    app.run(host=args.host, port=args.port, threaded=True)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("fetch", help="download aggTrades into hour files")
+    p.add_argument("symbol")
+    p.add_argument("--hours", type=float, default=6)
+    p.add_argument("--folder", help="defaults to ./data/trades/<SYMBOL>")
+    p.add_argument("--clear", action="store_true", help="delete the folder's hour files first")
+    p.add_argument("--repair", action="store_true", help="only refetch the trades missing between stored agg_ids")
+    p.set_defaults(run=fetch)
+
+    p = commands.add_parser("profile", help="volume and time spent per price bin")
+    p.add_argument("folder")
+    p.add_argument("--start-ms", type=int)
+    p.add_argument("--end-ms", type=int)
+    p.add_argument("--plot", action="store_true")
+    p.set_defaults(run=profile)
+
+    p = commands.add_parser("bands", help="liquidity bands from the trade tape")
+    p.add_argument("folder")
+    p.add_argument("--method", choices=BAND_METHODS, default="meanshift")
+    p.add_argument("--n-bands", type=int, default=3)
+    p.add_argument("--hours", type=float, default=12, help="trades before the newest one to use")
+    p.add_argument("--bin-size", type=float, default=0.01)
+    p.add_argument("--invert", action="store_true", help="use 1 / price, as the BNBBTC scripts do")
+    p.set_defaults(run=bands)
+
+    p = commands.add_parser("vol", help="GK-EWMA volatility bands per horizon")
+    p.add_argument("symbol", nargs="?", default="BNBBTC")
+    p.add_argument("--horizons", nargs="+", default=["5m"])
+    p.add_argument("--hours", type=float, default=3)
+    p.add_argument("--decay", type=float, default=0.94)
+    p.add_argument("--conf", type=float, default=0.8)
+    p.add_argument("--folder", help="build the candles from the local aggTrade tape in this folder")
+    p.set_defaults(run=vol)
+
+    p = commands.add_parser("trend", help="five_min_trend direction, or its parameter sweep")
+    p.add_argument("--symbol", default="BNBUSDT")
+    p.add_argument("--hours", type=float, default=2)
+    p.add_argument("--sweep", action="store_true")
+    p.add_argument("--folder", help="build the 1m candles from the local aggTrade tape in this folder")
+    p.set_defaults(run=trend)
+
+    p = commands.add_parser("serve", help="run the fluctuation server")
+    p.add_argument("--asgi", action="store_true", help="serve fluctuation_asgi with uvicorn instead of Flask")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=5001)
+    p.add_argument("--workers", type=int, default=1, help="uvicorn workers (--asgi only)")
+    p.set_defaults(run=serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.run(args)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,289 @@
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from binance_price_candle import get_klines_dataframe, INTERVAL_MS
+from metrics import STAGE_SECONDS, LOOK_BACK_SECONDS, ROWS_PROCESSED
+from profiling import profiled
+from resample import rolling_ohlc
+from tick_math import ratio_to_ticks
+
+BASE_INTERVAL = "1m"
+
+# horizon name -> length in minutes
+HORIZONS = {
+    "5m": 5,
+    "15m": 15,
+    "30m": 30,
+    "1h": 60,
+    "6h": 360,
+}
+
+LOOK_BACKS = range(1, 15)
+
+# rolled bars each horizon needs on top of its window to score the look-back sweep
+MIN_EVALUATION_ROWS = 120
+
+def gk_variance(df):
+    h_l = np.log(df['high'] / df['low'])
+    c_o = np.log(df['close'] / df['open'])
+
+    # Calculate GK components
+    gk = 0.5 * (h_l ** 2) - (2 * np.log(2) - 1) * (c_o ** 2)
+    return np.abs(gk)  # Handle negatives
+
+def gk_ewma_volatility(df, lambda_=0.94, conf_level=0.8):
+    gk = gk_variance(df)
+
+    # Compute EWMA variance
+    ewma_var = gk.ewm(alpha=1-lambda_, adjust=False).mean()
+    vol = np.sqrt(ewma_var.iloc[-1])
+
+    z_score = get_z_score(conf_level)
+    return (np.exp(-z_score * vol), np.exp(z_score * vol))
+
+# the levels /calculate has always served; 0.95 and 0.99 are one-sided values
+Z_SCORES = {0.68: 1, 0.8: 1.28, 0.95: 1.65, 0.99: 2.33}
+
+def get_z_score(conf: float) -> float:
+    z = Z_SCORES.get(conf)
+    if z is None:
+        # two-sided band holding `conf` of a normal
+        z = NormalDist().inv_cdf((1 + conf) / 2)
+    return z
+
+def look_back_sigma(gk: np.ndarray, look_back: int, lambda_=0.94) -> np.ndarray:
+    """
+    GK-EWMA sigma seen by every row when trained on the `look_back` rows before it.
+
+    Element k equals gk_ewma_volatility on rows [k, k + look_back), i.e. the
+    prediction for row k + look_back. An adjust=False EWMA over a fixed window
+    is a dot product with fixed weights, so every window is one matmul.
+    """
+    alpha = 1 - lambda_
+    weights = alpha * lambda_ ** np.arange(look_back - 1, -1, -1, dtype=np.float64)
+    weights[0] = lambda_ ** (look_back - 1)
+
+    windows = sliding_window_view(gk[:-1], look_back)
+    return np.sqrt(windows @ weights)
+
+def evaluation(row, actual_open, actual_high, actual_low, lower_range, upper_range):
+    row['upper_band'] = actual_open * upper_range
+    row['lower_band'] = actual_open * lower_range
+
+    row['open'] = actual_open
+    row['high'] = actual_high
+    row['low'] = actual_low
+
+def evaluate_vol_model(df):
+    """Evaluates volatility model performance on rolled candle data"""
+
+    # 1. Band coverage metrics
+    metrics = {
+        'coverage_high': (df['high'] <= df['upper_band']).mean(),
+        'coverage_low': (df['low'] >= df['lower_band']).mean(),
+        'full_coverage': ((df['high'] <= df['upper_band']) &
+                         (df['low'] >= df['lower_band'])).mean()
+    }
+
+    # 2. Breach magnitude
+    df['upper_breach'] = np.where(df['high'] > df['upper_band'],
+                                 (df['high'] - df['upper_band']) / df['open'],
+                                 0)
+    df['lower_breach'] = np.where(df['low'] < df['lower_band'],
+                                 (df['lower_band'] - df['low']) / df['open'],
+                                 0)
+    upper_breach = df[df['upper_breach'] > 0]
+    lower_breach = df[df['lower_breach'] > 0]
+
+    metrics.update({
+        'num_upper_breach': len(upper_breach),
+        'avg_upper_breach': upper_breach['upper_breach'].mean(),
+        'avg_lower_breach': lower_breach['lower_breach'].mean(),
+        'max_upper_breach': df['upper_breach'].max(),
+        'max_lower_breach': df['lower_breach'].max()
+    })
+
+    # 3. Range efficiency
+    captured_range = np.minimum(df['upper_band'], df['high']) - \
+                           np.maximum(df['lower_band'], df['low'])
+    true_range = df['high'] - df['low']
+    metrics['range_efficiency'] = (captured_range / true_range).mean()
+
+    # 4. Directional bias
+    metrics['asymmetry_ratio'] = (df['high'] > df['upper_band']).mean() / \
+                                 max(0.001, (df['low'] < df['lower_band']).mean())
+
+    # 5. Economic impact
+    df['slippage_cost'] = np.where(df['upper_breach'] > 0, df['upper_breach'],
+                                  np.where(df['lower_breach'] > 0, df['lower_breach'], 0))
+    metrics['avg_slippage_cost'] = df['slippage_cost'].mean()
+
+    return metrics
+
+def evaluate_vol_models(upper_band, lower_band, open_, high, low) -> dict:
+    """
+    evaluate_vol_model for many band sets at once.
+
+    `upper_band` / `lower_band` are (configs, time) arrays; the realized
+    `open_`, `high`, `low` are (time,) or (configs, time). A NaN band marks a
+    bar the config makes no prediction for (e.g. before its look-back has
+    warmed up) and is left out of that config's metrics. Returns metric name
+    -> array of shape (configs,), same names as evaluate_vol_model.
+    """
+    upper = np.atleast_2d(np.asarray(upper_band, dtype=np.float64))
+    lower = np.atleast_2d(np.asarray(lower_band, dtype=np.float64))
+    open_ = np.asarray(open_, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+
+    valid = ~(np.isnan(upper) | np.isnan(lower))
+    rows = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        per_row = np.where(rows > 0, 1 / rows, np.nan)
+
+        # comparisons against NaN bands are False, so masked bars never count
+        covered_high = high <= upper
+        covered_low = low >= lower
+        above = valid & (high > upper)
+        below = valid & (low < lower)
+
+        upper_breach = np.where(above, (high - upper) / open_, 0)
+        lower_breach = np.where(below, (lower - low) / open_, 0)
+        num_upper = above.sum(axis=1)
+        num_lower = below.sum(axis=1)
+
+        # pandas' mean skips NaN (0 / 0 on flat bars) but keeps +-inf
+        efficiency = (np.minimum(upper, high) - np.maximum(lower, low)) / (high - low)
+        efficiency_rows = (~np.isnan(efficiency)).sum(axis=1)
+        efficiency_sum = np.where(np.isnan(efficiency), 0, efficiency).sum(axis=1)
+
+        slippage = np.where(above, upper_breach, lower_breach)
+        return {
+            'coverage_high': covered_high.sum(axis=1) * per_row,
+            'coverage_low': covered_low.sum(axis=1) * per_row,
+            'full_coverage': (covered_high & covered_low).sum(axis=1) * per_row,
+            'num_upper_breach': num_upper,
+            'avg_upper_breach': upper_breach.sum(axis=1) / num_upper,
+            'avg_lower_breach': lower_breach.sum(axis=1) / num_lower,
+            'max_upper_breach': np.where(rows > 0, upper_breach.max(axis=1, initial=0), np.nan),
+            'max_lower_breach': np.where(rows > 0, lower_breach.max(axis=1, initial=0), np.nan),
+            'range_efficiency': efficiency_sum / efficiency_rows,
+            'asymmetry_ratio': num_upper * per_row / np.maximum(0.001, num_lower * per_row),
+            'avg_slippage_cost': slippage.sum(axis=1) * per_row,
+        }
+
+def model_metrics(metrics: dict, index: int) -> dict:
+    """One config's metrics out of an evaluate_vol_models result, as plain Python numbers."""
+    return {
+        name: int(values[index]) if name == 'num_upper_breach' else float(values[index])
+        for name, values in metrics.items()
+    }
+
+def to_ticks(value):
+    return int(ratio_to_ticks(value))
+
+def detect(df: pd.DataFrame, decay=0.94, conf=0.8, look_backs=LOOK_BACKS):
+    """
+    Picks the look-back whose GK-EWMA bands best cover the next bar's high.
+
+    `df` holds the rolled bars of one horizon. Returns the winning look-back
+    ("duration"), its metrics, the mean upper band offset ("range") and the
+    mean upper band width in ticks, rounded up ("ticks").
+    """
+    df = df.sort_values("timestamp").reset_index(drop=True)
+
+    gk = gk_variance(df).to_numpy()
+    z_score = get_z_score(conf)
+
+    look_backs = [look_back for look_back in look_backs if look_back < len(df)]
+    open_ = df['open'].to_numpy(dtype=np.float64)
+
+    # one row of bands per look-back; bars before the look-back has data stay NaN
+    sweep_start = time.perf_counter()
+    higher = np.full((len(look_backs), len(df)), np.nan)
+    lower = np.full((len(look_backs), len(df)), np.nan)
+    for i, look_back in enumerate(look_backs):
+        look_back_start = time.perf_counter()
+        vol = look_back_sigma(gk, look_back, decay)
+        higher[i, look_back:] = np.exp(z_score * vol)
+        lower[i, look_back:] = np.exp(-z_score * vol)
+        LOOK_BACK_SECONDS.observe(time.perf_counter() - look_back_start, look_back=look_back)
+        ROWS_PROCESSED.inc(len(df) - look_back, stage="look_back_sweep")
+
+    with STAGE_SECONDS.time(stage="evaluate_vol_model"):
+        metrics = evaluate_vol_models(open_ * higher, open_ * lower, open_, df['high'].to_numpy(dtype=np.float64), df['low'].to_numpy(dtype=np.float64))
+    STAGE_SECONDS.observe(time.perf_counter() - sweep_start, stage="look_back_sweep")
+
+    best_look_back = 1
+    best_metrics = {'coverage_high': 0}
+    mean_tick = None
+    ticks = None
+    if look_backs:
+        # first look-back with the highest coverage, as long as it covers anything
+        best = int(np.argmax(metrics['coverage_high']))
+        if metrics['coverage_high'][best] > 0:
+            best_look_back = look_backs[best]
+            best_metrics = model_metrics(metrics, best)
+            mean_tick = float(np.nanmean(higher[best])) - 1
+            ticks = int(np.ceil(ratio_to_ticks(higher[best, best_look_back:]).mean()))
+
+    return {
+        "metrics": best_metrics, "duration": best_look_back, "range": mean_tick, "ticks": ticks
+    }
+
+HORIZON_UNITS = {"m": 1, "h": 60, "d": 24 * 60}
+
+def horizon_minutes(horizon: str) -> int:
+    """Length of a horizon such as "5m", "3h" or "1d" in minutes."""
+    if horizon in HORIZONS:
+        return HORIZONS[horizon]
+    count, unit = horizon[:-1], horizon[-1:]
+    if unit not in HORIZON_UNITS or not count.isdigit() or int(count) == 0:
+        raise ValueError(f"Unsupported horizon {horizon}")
+    return int(count) * HORIZON_UNITS[unit]
+
+def horizon_window(horizon: str, base_interval: str = BASE_INTERVAL) -> int:
+    minutes = horizon_minutes(horizon)
+    base_minutes = INTERVAL_MS[base_interval] // 60_000
+    if minutes % base_minutes != 0:
+        raise ValueError(f"Horizon {horizon} is not a multiple of {base_interval}")
+    return minutes // base_minutes
+
+@profiled
+def detect_horizons(base: pd.DataFrame, horizons, decay=0.94, conf=0.8, look_backs=LOOK_BACKS, base_interval: str = BASE_INTERVAL):
+    """Rolls one frame of base candles to every horizon and runs `detect` on each."""
+    results = {}
+    for horizon in horizons:
+        with STAGE_SECONDS.time(stage="rolling_ohlc"):
+            rolled = rolling_ohlc(base, horizon_window(horizon, base_interval), time_col="timestamp").reset_index(drop=True)
+        ROWS_PROCESSED.inc(len(base), stage="rolling_ohlc")
+        results[horizon] = detect(rolled, decay=decay, conf=conf, look_backs=look_backs)
+    return results
+
+def fetch_base_candles(symbol: str, horizons, hours: float = 3, base_interval: str = BASE_INTERVAL) -> pd.DataFrame:
+    """Fetches enough base candles for the longest horizon, once."""
+    step = INTERVAL_MS[base_interval]
+    longest = max(horizon_window(h, base_interval) for h in horizons)
+    rows = max(int(hours * 60 * 60 * 1000 / step), longest + MIN_EVALUATION_ROWS)
+
+    # one extra candle because the newest kline is still forming
+    end_time = int(time.time() * 1000)
+    start_time = end_time - (rows + 1) * step
+    df = get_klines_dataframe(start_time, end_time, base_interval, symbol)
+
+    closed = df[df["timestamp"] + step <= end_time]
+    return closed.tail(rows).reset_index(drop=True)
+
+def run_multi_horizon(symbol: str = "BNBBTC", horizons=("5m",), hours: float = 3, decay=0.94, conf=0.8, look_backs=LOOK_BACKS, base_interval: str = BASE_INTERVAL):
+    """Band metrics for every horizon from a single fetch of base candles."""
+    base = fetch_base_candles(symbol, horizons, hours, base_interval)
+    return detect_horizons(base, horizons, decay=decay, conf=conf, look_backs=look_backs, base_interval=base_interval)
+
+if __name__ == "__main__":
+    results = run_multi_horizon("BNBUSDT", horizons=("5m", "1h"))
+    for horizon, result in results.items():
+        print(horizon, pd.DataFrame([result["metrics"]]), result["duration"], result["range"])
@@ -0,0 +1,191 @@
+"""
+Async serving mode for the fluctuation server.
+
+Same routes and parameters as fluctuation_server.py, as a plain ASGI app:
+kline fetches are awaited off the event loop and the CPU-bound detection
+runs in a process pool, so one slow request no longer stalls the others.
+
+    uvicorn fluctuation_asgi:app --host 127.0.0.1 --port 5001 --workers 2
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qsl
+
+from candle_cache import CandleCache, next_candle_close, now_ms
+from fluctuation_analysis import detect_horizons, fetch_base_candles
+from fluctuation_server import DEFAULT_PARAMS, MAX_BATCH, parse_params
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS
+from trend_signal import DEFAULT_SYMBOL, trend_service
+
+PROCESS_WORKERS = int(os.environ.get("FLUCTUATION_PROCESS_WORKERS", os.cpu_count() or 1))
+
+cache = CandleCache("1m", max_entries=512)
+process_pool = None
+
+def _detect(base, params: dict, horizons):
+    # runs in a worker process: ship the metrics it recorded back with the result
+    REGISTRY.reset()
+    results = detect_horizons(
+        base,
+        horizons,
+        decay=params["decay"],
+        conf=params["conf"],
+        look_backs=range(params["look_back_min"], params["look_back_max"] + 1),
+        base_interval=params["interval"],
+    )
+    return results, REGISTRY.snapshot()
+
+async def compute(params: dict) -> dict:
+    horizons = params["horizon"].split(",")
+    base = await asyncio.to_thread(fetch_base_candles, params["symbol"], horizons, params["hours"], params["interval"])
+
+    loop = asyncio.get_running_loop()
+    if process_pool is None:
+        results = detect_horizons(
+            base,
+            horizons,
+            decay=params["decay"],
+            conf=params["conf"],
+            look_backs=range(params["look_back_min"], params["look_back_max"] + 1),
+            base_interval=params["interval"],
+        )
+    else:
+        results, worker_metrics = await loop.run_in_executor(process_pool, _detect, base, params, horizons)
+        REGISTRY.merge(worker_metrics)
+    return results[horizons[0]] if len(horizons) == 1 else results
+
+async def cached_compute(params: dict) -> dict:
+    key = tuple(sorted(params.items()))
+    return await cache.get_or_compute_async(key, lambda: compute(params), interval=params["interval"])
+
+async def calculate(query: dict, body):
+    return 200, await cached_compute(parse_params(query))
+
+async def calculate_horizons(query: dict, body):
+    query = dict(query)
+    query["horizon"] = query.pop("horizons", "5m,1h")
+    params = parse_params(query)
+
+    data = await cached_compute(params)
+    if "," not in params["horizon"]:
+        data = {params["horizon"]: data}
+    return 200, data
+
+async def calculate_batch(query: dict, body):
+    try:
+        entries = json.loads(body or b"null")
+    except ValueError:
+        entries = None
+    if not isinstance(entries, list):
+        return 400, {"error": "expected a JSON list of parameter objects"}
+    if len(entries) > MAX_BATCH:
+        return 400, {"error": f"at most {MAX_BATCH} entries per batch"}
+
+    async def run(entry):
+        try:
+            params = parse_params(entry)
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"error": str(e)}
+        try:
+            return {"params": params, "result": await cached_compute(params)}
+        except Exception as e:
+            return {"params": params, "error": str(e)}
+
+    return 200, await asyncio.gather(*(run(entry) for entry in entries))
+
+async def trend(query: dict, body):
+    # the first request for a symbol fetches its history, later ones only read state
+    service = await asyncio.to_thread(trend_service, query.get("symbol", DEFAULT_SYMBOL))
+    return 200, service.snapshot()
+
+ROUTES = {
+    ("GET", "/calculate"): calculate,
+    ("GET", "/calculate/horizons"): calculate_horizons,
+    ("POST", "/calculate/batch"): calculate_batch,
+    ("GET", "/trend"): trend,
+}
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+async def _send(send, status: int, payload: bytes, content_type: str):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(payload)).encode())],
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+async def _send_json(send, status: int, data):
+    await _send(send, status, json.dumps(data).encode(), "application/json")
+
+async def _precompute_default():
+    params = parse_params(DEFAULT_PARAMS)
+    while True:
+        try:
+            await cached_compute(params)
+        except Exception as e:
+            print(f"precompute failed: {e}")
+        # wake up two seconds after the next 1m candle closes
+        await asyncio.sleep(max(next_candle_close("1m") - now_ms(), 0) / 1000 + 2)
+
+async def _lifespan(receive, send):
+    global process_pool
+    tasks = []
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+            tasks.append(asyncio.create_task(_precompute_default()))
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for task in tasks:
+                task.cancel()
+            process_pool.shutdown(cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    if (scope["method"], scope["path"]) == ("GET", "/metrics"):
+        return await _send(send, 200, REGISTRY.render().encode(), CONTENT_TYPE)
+
+    handler = ROUTES.get((scope["method"], scope["path"]))
+    if handler is None:
+        return await _send_json(send, 404, {"error": "not found"})
+
+    start = time.perf_counter()
+    query = dict(parse_qsl(scope["query_string"].decode()))
+    body = await _read_body(receive)
+    try:
+        status, data = await handler(query, body)
+    except ValueError as e:
+        status, data = 400, {"error": str(e)}
+    except Exception as e:
+        status, data = 500, {"error": str(e)}
+    await _send_json(send, status, data)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, route=scope["path"])
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    uvicorn.run("fluctuation_asgi:app", host=args.host, port=args.port, workers=args.workers)
@@ -1,12 +1,152 @@
-from flask import Flask, request, jsonify
-from fluctuation_analysis_5m import run_detection
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, Response, g, request, jsonify
+from binance_price_candle import INTERVAL_MS
+from candle_cache import CandleCache
+from fluctuation_analysis import horizon_minutes, horizon_window, run_multi_horizon
+from metrics import CONTENT_TYPE, REGISTRY, REQUEST_SECONDS
+from trend_signal import DEFAULT_SYMBOL, trend_service
 
 app = Flask(__name__)
 
+DEFAULT_PARAMS = {
+    "symbol": "BNBBTC",
+    "interval": "1m",
+    "horizon": "5m",
+    "hours": 3.0,
+    "decay": 0.94,
+    "conf": 0.8,
+    "look_back_min": 1,
+    "look_back_max": 14,
+}
+
+MAX_BATCH = 64
+# each request refetches `hours` of candles and sweeps every look_back
+MAX_HOURS = 48.0
+MAX_LOOK_BACK = 60
+# the longest horizon sets how many base candles are fetched
+MAX_HORIZONS = 8
+
+# results only change when a candle of the request's interval closes
+cache = CandleCache("1m", max_entries=512)
+executor = ThreadPoolExecutor(max_workers=8)
+
+def parse_params(args) -> dict:
+    """Validated detection parameters from query args or a JSON object; raises ValueError."""
+    params = dict(DEFAULT_PARAMS)
+    for name, default in DEFAULT_PARAMS.items():
+        value = args.get(name)
+        if value is not None:
+            params[name] = type(default)(value)
+
+    params["symbol"] = params["symbol"].upper()
+    if params["interval"] not in INTERVAL_MS:
+        raise ValueError(f"unsupported interval {params['interval']}")
+    horizons = params["horizon"].split(",")
+    if len(horizons) > MAX_HORIZONS:
+        raise ValueError(f"at most {MAX_HORIZONS} horizons per request")
+    for horizon in horizons:
+        horizon_window(horizon, params["interval"])
+        if horizon_minutes(horizon) > MAX_HOURS * 60:
+            raise ValueError(f"horizon {horizon} is longer than {MAX_HOURS:g}h")
+    if not 0 < params["decay"] < 1:
+        raise ValueError("decay must be in (0, 1)")
+    if not 0 < params["conf"] < 1:
+        raise ValueError("conf must be in (0, 1)")
+    if not 1 <= params["look_back_min"] <= params["look_back_max"] <= MAX_LOOK_BACK:
+        raise ValueError(f"look_back range must satisfy 1 <= look_back_min <= look_back_max <= {MAX_LOOK_BACK}")
+    if not 0 < params["hours"] <= MAX_HOURS:
+        raise ValueError(f"hours must be in (0, {MAX_HOURS:g}]")
+    return params
+
+def compute(params: dict) -> dict:
+    horizons = params["horizon"].split(",")
+    results = run_multi_horizon(
+        params["symbol"],
+        horizons=horizons,
+        hours=params["hours"],
+        decay=params["decay"],
+        conf=params["conf"],
+        look_backs=range(params["look_back_min"], params["look_back_max"] + 1),
+        base_interval=params["interval"],
+    )
+    return results[horizons[0]] if len(horizons) == 1 else results
+
+def cached_compute(params: dict) -> dict:
+    key = tuple(sorted(params.items()))
+    return cache.get_or_compute(key, lambda: compute(params), interval=params["interval"])
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    if request.url_rule is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, route=request.url_rule.rule)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
 @app.route('/calculate', methods=['GET'])
 def calculate():
-    data = run_detection()
+    try:
+        params = parse_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(cached_compute(params))
+
+@app.route('/calculate/horizons', methods=['GET'])
+def calculate_horizons():
+    args = request.args.to_dict()
+    args["horizon"] = args.pop("horizons", "5m,1h")
+    try:
+        params = parse_params(args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    data = cached_compute(params)
+    if "," not in params["horizon"]:
+        data = {params["horizon"]: data}
     return jsonify(data)
 
+@app.route('/trend', methods=['GET'])
+def trend():
+    """Latest five_min_trend direction for `symbol`, updated as each 1m candle closes."""
+    try:
+        service = trend_service(request.args.get("symbol", DEFAULT_SYMBOL))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(service.snapshot())
+
+@app.route('/calculate/batch', methods=['POST'])
+def calculate_batch():
+    """
+    Body: a JSON list of parameter objects (same names as /calculate).
+    Returns one result per entry, in order; invalid or failing entries
+    carry an "error" instead of failing the whole batch.
+    """
+    entries = request.get_json(silent=True)
+    if not isinstance(entries, list):
+        return jsonify({"error": "expected a JSON list of parameter objects"}), 400
+    if len(entries) > MAX_BATCH:
+        return jsonify({"error": f"at most {MAX_BATCH} entries per batch"}), 400
+
+    def run(entry):
+        try:
+            params = parse_params(entry)
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"error": str(e)}
+        try:
+            return {"params": params, "result": cached_compute(params)}
+        except Exception as e:
+            return {"params": params, "error": str(e)}
+
+    return jsonify(list(executor.map(run, entries)))
+
 if __name__ == '__main__':
-    app.run(host='127.0.0.1', port=5001, debug=True)
+    cache.precompute(tuple(sorted(DEFAULT_PARAMS.items())), lambda: compute(DEFAULT_PARAMS))
+    app.run(host='127.0.0.1', port=5001, threaded=True)
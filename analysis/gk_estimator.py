@@ -0,0 +1,156 @@
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from fluctuation_analysis import get_z_score
+
+GK_CLOSE_WEIGHT = 2 * math.log(2) - 1
+
+def gk_bar_variance(open_, high, low, close, negative="abs"):
+    """Garman-Klass variance of a single bar; `negative` is "abs" or "clip"."""
+    h_l = math.log(high / low)
+    c_o = math.log(close / open_)
+    gk = 0.5 * h_l ** 2 - GK_CLOSE_WEIGHT * c_o ** 2
+    if gk < 0:
+        gk = abs(gk) if negative == "abs" else 0.0
+    return gk
+
+class OnlineGKEWMA:
+    """
+    Garman-Klass EWMA variance updated one closed candle at a time.
+
+    Matches `gk.ewm(alpha=1 - lambda_, adjust=False).mean()` over the same
+    candles: the first bar seeds the variance, every later bar costs O(1).
+    Bars at or before the last seen timestamp are ignored, so re-polling the
+    same kline is harmless. State round-trips through to_dict/from_dict.
+    """
+
+    def __init__(self, lambda_=0.94, negative="abs"):
+        self.lambda_ = lambda_
+        self.negative = negative
+        self.ewma_var = None
+        self.count = 0
+        self.last_bar = None
+
+    def update(self, timestamp, open_, high, low, close) -> float:
+        if self.last_bar is not None and timestamp <= self.last_bar["timestamp"]:
+            return self.sigma
+
+        gk = gk_bar_variance(float(open_), float(high), float(low), float(close), self.negative)
+        if self.ewma_var is None:
+            self.ewma_var = gk
+        else:
+            self.ewma_var = self.lambda_ * self.ewma_var + (1 - self.lambda_) * gk
+
+        self.count += 1
+        self.last_bar = {
+            "timestamp": int(timestamp),
+            "open": float(open_),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+        }
+        return self.sigma
+
+    def update_frame(self, df: pd.DataFrame, time_col="timestamp") -> float:
+        for row in df[[time_col, "open", "high", "low", "close"]].itertuples(index=False):
+            self.update(*row)
+        return self.sigma
+
+    @property
+    def sigma(self) -> float:
+        return math.sqrt(self.ewma_var) if self.ewma_var is not None else float("nan")
+
+    def bands(self, conf_level=0.8, z_score=None):
+        """(lower, upper) price multipliers, as returned by gk_ewma_volatility."""
+        if z_score is None:
+            z_score = get_z_score(conf_level)
+        vol = self.sigma
+        return (math.exp(-z_score * vol), math.exp(z_score * vol))
+
+    def price_bands(self, conf_level=0.8, z_score=None, price=None):
+        """Bands around `price`, defaulting to the last close."""
+        if price is None:
+            price = self.last_bar["close"]
+        lower, upper = self.bands(conf_level, z_score)
+        return (price * lower, price * upper)
+
+    def to_dict(self) -> dict:
+        return {
+            "lambda_": self.lambda_,
+            "negative": self.negative,
+            "ewma_var": self.ewma_var,
+            "count": self.count,
+            "last_bar": self.last_bar,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "OnlineGKEWMA":
+        estimator = cls(lambda_=state["lambda_"], negative=state.get("negative", "abs"))
+        estimator.ewma_var = state["ewma_var"]
+        estimator.count = state["count"]
+        estimator.last_bar = state["last_bar"]
+        return estimator
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> "OnlineGKEWMA":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, lambda_=0.94, negative="abs", time_col="timestamp") -> "OnlineGKEWMA":
+        """Warm start from history with one vectorized EWMA pass."""
+        estimator = cls(lambda_=lambda_, negative=negative)
+        if df.empty:
+            return estimator
+
+        high = pd.to_numeric(df["high"])
+        low = pd.to_numeric(df["low"])
+        open_ = pd.to_numeric(df["open"])
+        close = pd.to_numeric(df["close"])
+        gk = 0.5 * np.log(high / low) ** 2 - GK_CLOSE_WEIGHT * np.log(close / open_) ** 2
+        gk = np.abs(gk) if negative == "abs" else np.maximum(gk, 0)
+
+        estimator.ewma_var = float(gk.ewm(alpha=1 - lambda_, adjust=False).mean().iloc[-1])
+        estimator.count = len(df)
+        last = df.iloc[-1]
+        estimator.last_bar = {
+            "timestamp": int(last[time_col]),
+            "open": float(last["open"]),
+            "high": float(last["high"]),
+            "low": float(last["low"]),
+            "close": float(last["close"]),
+        }
+        return estimator
+
+if __name__ == "__main__":
+    import os
+    from binance_price_candle import previous_hours_to_interval, get_recent_24h_klines_dataframe
+
+    symbol = "BNBBTC"
+    snapshot = f"./{symbol}_gk_ewma.json"
+
+    if os.path.exists(snapshot):
+        estimator = OnlineGKEWMA.load(snapshot)
+    else:
+        start_time, end_time = previous_hours_to_interval(3)
+        history = get_recent_24h_klines_dataframe(start_time, end_time, 180, "1m", symbol)
+        estimator = OnlineGKEWMA.from_frame(history.iloc[:-1])
+
+    while True:
+        start_time = estimator.last_bar["timestamp"] + 60 * 1000
+        end_time = int(time.time() * 1000)
+        klines = get_recent_24h_klines_dataframe(start_time, end_time, 1000, "1m", symbol)
+        closed = klines[klines["timestamp"] + 60 * 1000 <= end_time]
+        estimator.update_frame(closed)
+        estimator.save(snapshot)
+
+        print(estimator.last_bar["timestamp"], estimator.sigma, estimator.price_bands())
+        time.sleep(60 - time.time() % 60 + 1)
@@ -0,0 +1,80 @@
+"""
+Concurrent poller load test for the fluctuation server.
+
+Each poller loops GET <url> until the duration is over; reports request
+throughput and latency percentiles. Point it at either serving mode:
+
+    python fluctuation_server.py             # Flask, threaded
+    python fluctuation_asgi.py --workers 2   # ASGI
+    python load_test.py --url http://127.0.0.1:5001/calculate --concurrency 32 --duration 20
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+# retry delay after a failed request, doubled per consecutive failure
+ERROR_BACKOFF = (0.05, 2.0)
+
+def poll(url: str, deadline: float, latencies: list, errors: list):
+    session = requests.Session()
+    backoff = ERROR_BACKOFF[0]
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.get(url, timeout=60)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            errors.append(type(e).__name__)
+            # a server that is down should not turn the pollers into a busy loop
+            time.sleep(max(min(backoff, deadline - time.perf_counter()), 0))
+            backoff = min(backoff * 2, ERROR_BACKOFF[1])
+            continue
+        backoff = ERROR_BACKOFF[0]
+        latencies.append(time.perf_counter() - start)
+
+def run_load_test(url: str, concurrency: int = 16, duration: float = 10.0) -> dict:
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [
+        threading.Thread(target=poll, args=(url, deadline, latencies, errors))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    samples = np.array(latencies) * 1000
+    kinds, counts = np.unique(errors, return_counts=True)
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_kinds": dict(zip(kinds.tolist(), counts.tolist())),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(samples, 50)) if len(samples) else None,
+        "p99_ms": float(np.percentile(samples, 99)) if len(samples) else None,
+        "max_ms": float(samples.max()) if len(samples) else None,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:5001/calculate")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        result = run_load_test(args.url, concurrency, args.duration)
+        print(
+            f"concurrency={result['concurrency']:>3} requests={result['requests']:>6} errors={result['errors']:>4} "
+            f"rps={result['throughput_rps']:8.1f} p50={result['p50_ms'] or 0:.1f}ms p99={result['p99_ms'] or 0:.1f}ms"
+        )
+        if result["errors"]:
+            print("  errors:", ", ".join(f"{kind} x{count}" for kind, count in result["error_kinds"].items()))
@@ -0,0 +1,80 @@
+"""
+Typed, column-projected loading of trade and kline frames.
+
+Every reader of the aggTrade hour files and of Binance kline frames goes
+through here, so frames come out with one explicit dtype per column instead
+of pandas' object / float64 defaults:
+
+    df = read_trades(path, columns=["timestamp_ms", "price", "qty"])
+    klines = typed_klines(raw_klines)
+    print(memory_report(df))   # {'rows': ..., 'bytes': ..., 'bytes_per_row': ...}
+
+Prices and timestamps keep full precision (float64 / int64: one BNBBTC tick
+is below float32 resolution); quantities and volumes are float32, flags
+are bool.
+"""
+import numpy as np
+import pandas as pd
+
+TRADE_DTYPES = {
+    "agg_id": np.int64,
+    "timestamp_ms": np.int64,
+    "price": np.float64,
+    "qty": np.float32,
+    "is_maker": bool,
+}
+
+KLINE_DTYPES = {
+    "timestamp": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float32,
+    "quote_asset_volume": np.float32,
+}
+
+def read_trades(path: str, columns=None, dtypes: dict = None) -> pd.DataFrame:
+    """
+    One hour file with compact dtypes, reading only `columns` (all by
+    default); `dtypes` overrides single columns, e.g. {"qty": np.float64}
+    where quantities must round-trip exactly.
+    """
+    columns = list(columns or TRADE_DTYPES)
+    dtypes = {**TRADE_DTYPES, **(dtypes or {})}
+    return pd.read_csv(path, usecols=columns, dtype={c: dtypes[c] for c in columns if c in dtypes})[columns]
+
+def typed_frame(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Casts the columns of `df` named in `dtypes`; strings are parsed as numbers."""
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in df:
+            continue
+        values = df[column]
+        if values.dtype == object and dtype is not bool:
+            values = pd.to_numeric(values)
+        elif values.dtype == object:
+            values = values.astype(str).str.lower().eq("true")
+        casts[column] = values.astype(dtype)
+    return df.assign(**casts)
+
+def typed_klines(df: pd.DataFrame) -> pd.DataFrame:
+    """Kline frame (as built from the /klines payload) with numeric columns."""
+    return typed_frame(df, KLINE_DTYPES)
+
+def typed_trades(df: pd.DataFrame) -> pd.DataFrame:
+    return typed_frame(df, TRADE_DTYPES)
+
+def memory_report(df: pd.DataFrame) -> dict:
+    """Rows, deep memory use and bytes per row of a frame."""
+    total = int(df.memory_usage(deep=True, index=True).sum())
+    return {"rows": len(df), "bytes": total, "bytes_per_row": total / len(df) if len(df) else float("nan")}
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    folder = sys.argv[1] if len(sys.argv) > 1 else "./data/trades/BNBBTC"
+    path = os.path.join(folder, sorted(f for f in os.listdir(folder) if f.endswith(".csv"))[-1])
+    print("default", memory_report(pd.read_csv(path)))
+    print("typed  ", memory_report(read_trades(path)))
@@ -0,0 +1,225 @@
+"""
+Uniswap V3 LP range backtester over the aggTrade tape or 1m candles.
+
+Each config is (width, tick_spacing, rebalance): a range of about `width`
+ticks either side of the entry tick, aligned to the spacing, that is
+re-centred on the current tick never ("none"), when the price leaves it
+("exit") or every `period_ms` ("period"). Every config is scored on the
+same steps (trades or candle closes):
+
+    fees            fee_rate * in-range quote volume * share of the pool
+    time_in_range   share of wall time the range was active
+    rebalances      number of re-centrings
+    il              position value / value of holding the first deposit - 1
+
+Positions do not compound fees and every day starts from `capital` again,
+so days are independent and run in parallel:
+
+    python lp_backtest.py --folder ./data/trades/BNBUSDT --widths 20 50 100 200
+    python lp_backtest.py --symbol BNBUSDT --hours 72
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from loaders import read_trades
+from range_simulation import BlockExtremes, near_breach, position_segments
+from tick_math import amounts_for_liquidity, position_value, price_to_tick, range_around, tick_to_sqrt_price
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+DEFAULT_WIDTHS = (10, 25, 50, 100, 200, 400, 800)
+DEFAULT_REBALANCES = ("none", "exit")
+
+def lp_configs(widths=DEFAULT_WIDTHS, tick_spacings=(10,), rebalances=DEFAULT_REBALANCES, period_ms: int = 60 * 60 * 1000) -> pd.DataFrame:
+    """Full grid of configs; `period_ms` only applies to the "period" rule."""
+    index = pd.MultiIndex.from_product([widths, tick_spacings, rebalances], names=["width", "tick_spacing", "rebalance"])
+    configs = index.to_frame(index=False)
+    configs["period_ms"] = np.where(configs["rebalance"] == "period", period_ms, 0)
+    return configs
+
+def tape_steps(tape: pd.DataFrame) -> pd.DataFrame:
+    """timestamp_ms / price / qty steps from an aggTrade tape."""
+    steps = tape[["timestamp_ms", "price", "qty"]].astype({"timestamp_ms": np.int64, "price": np.float64, "qty": np.float64})
+    return steps.sort_values("timestamp_ms", kind="stable").reset_index(drop=True)
+
+def candle_steps(df: pd.DataFrame, time_col: str = "timestamp") -> pd.DataFrame:
+    """One step per candle at its close, carrying the candle's base volume."""
+    steps = pd.DataFrame({
+        "timestamp_ms": df[time_col].astype(np.int64).to_numpy(),
+        "price": df["close"].astype(np.float64).to_numpy(),
+        "qty": df["volume"].astype(np.float64).to_numpy(),
+    })
+    return steps.sort_values("timestamp_ms", kind="stable").reset_index(drop=True)
+
+def load_tape(folder: str, files=None) -> pd.DataFrame:
+    """Concatenates the hour files of a tape folder (or just `files`) in time order."""
+    files = sorted(files if files is not None else (f for f in os.listdir(folder) if f.endswith(".csv")))
+    frames = [read_trades(os.path.join(folder, f), ["timestamp_ms", "price", "qty"]) for f in files]
+    if not frames:
+        return pd.DataFrame(columns=["timestamp_ms", "price", "qty"])
+    return tape_steps(pd.concat(frames, ignore_index=True))
+
+def rebalance_opens(ticks: np.ndarray, timestamps: np.ndarray, config, extremes: BlockExtremes, near: int = 8) -> np.ndarray:
+    """Step indices at which the config (re-)opens its range; the first is 0."""
+    n = len(ticks)
+    if config["rebalance"] == "none":
+        return np.zeros(1, dtype=np.int64)
+    if config["rebalance"] == "period":
+        boundaries = np.arange(timestamps[0], timestamps[-1] + 1, config["period_ms"])
+        return np.unique(np.searchsorted(timestamps, boundaries, side="left"))
+    if config["rebalance"] == "exit":
+        lower, upper = range_around(ticks, config["width"], config["tick_spacing"])
+        values = ticks.astype(np.float64)
+        # in range while lower <= tick < upper, i.e. tick <= upper - 1
+        lower, upper = lower.astype(np.float64), (upper - 1).astype(np.float64)
+        breach = near_breach(values, lower[None, :], upper[None, :], near)[0]
+        opens, _ = position_segments(breach, values, lower, upper, extremes, near + 1, reopen=0)
+        return opens
+    raise ValueError(f"Unknown rebalance rule {config['rebalance']}")
+
+def backtest(steps: pd.DataFrame, configs: pd.DataFrame, fee_rate: float = 0.0005, capital: float = 1000.0, pool_tvl: float = 1e7, rebalance_cost: float = 0.0005) -> pd.DataFrame:
+    """
+    Scores every config on `steps` (from tape_steps / candle_steps): one row
+    per config with fees, lp_value, hold_value, il, net_return,
+    time_in_range, in_range_volume and rebalances.
+
+    The rest of the pool is a constant full-range position worth `pool_tvl`
+    at the first price, so a range earns fee_rate * volume * L / (L + pool L)
+    on steps it is active for. Each rebalance loses `rebalance_cost` of the
+    position value to the swap.
+    """
+    steps = steps.reset_index(drop=True)
+    price = steps["price"].to_numpy(dtype=np.float64)
+    timestamps = steps["timestamp_ms"].to_numpy(dtype=np.int64)
+    n = len(price)
+    if n < 2:
+        raise ValueError(f"need at least 2 steps, got {n}")
+
+    ticks = price_to_tick(price)
+    quote_volume = steps["qty"].to_numpy(dtype=np.float64) * price
+    # wall time until the next step, at the range chosen after this one
+    duration = np.append(np.diff(timestamps), 0).astype(np.float64)
+    pool_liquidity = pool_tvl / (2 * np.sqrt(price[0]))
+    extremes = BlockExtremes(ticks.astype(np.float64))
+
+    rows = []
+    for config in configs.to_dict("records"):
+        opens = rebalance_opens(ticks, timestamps, config, extremes)
+        lower, upper = range_around(ticks[opens], config["width"], config["tick_spacing"])
+        sqrt_lower, sqrt_upper = tick_to_sqrt_price(lower), tick_to_sqrt_price(upper)
+
+        # position k lives from opens[k] until the step that re-opens it (or the last step)
+        ends = np.append(opens[1:], n - 1)
+        growth = position_value(price[ends], sqrt_lower, sqrt_upper, 1.0) / position_value(price[opens], sqrt_lower, sqrt_upper, 1.0)
+        kept = np.append(1.0, np.full(len(opens) - 1, 1 - rebalance_cost))
+        value_at_open = capital * np.cumprod(kept * np.append(1.0, growth[:-1]))
+        liquidity = value_at_open / position_value(price[opens], sqrt_lower, sqrt_upper, 1.0)
+        lp_value = value_at_open[-1] * growth[-1]
+
+        # step i trades against the range active before any re-open at i
+        active = np.repeat(np.arange(len(opens)), np.diff(np.append(opens, n)))
+        before = np.concatenate(([0], active[:-1]))
+        traded = (ticks >= lower[before]) & (ticks < upper[before])
+        traded[0] = False
+        share = liquidity / (liquidity + pool_liquidity)
+        fees = fee_rate * np.sum(quote_volume[traded] * share[before[traded]])
+
+        resting = (ticks >= lower[active]) & (ticks < upper[active])
+        amount0, amount1 = amounts_for_liquidity(np.sqrt(price[0]), sqrt_lower[0], sqrt_upper[0], liquidity[0])
+        hold_value = amount0 * price[-1] + amount1
+
+        rows.append({
+            **config,
+            "fees": fees,
+            "lp_value": lp_value,
+            "hold_value": hold_value,
+            "il": lp_value / hold_value - 1,
+            "net_return": (lp_value + fees) / capital - 1,
+            "time_in_range": np.sum(duration[resting]) / duration.sum() if duration.sum() > 0 else np.nan,
+            "in_range_volume": quote_volume[traded].sum(),
+            "rebalances": len(opens) - 1,
+        })
+    return pd.DataFrame(rows)
+
+def _backtest_day(day, steps, configs, kwargs):
+    results = backtest(steps, configs, **kwargs)
+    results.insert(0, "day", day)
+    return results
+
+def _backtest_tape_day(day, folder, files, configs, kwargs):
+    return _backtest_day(day, load_tape(folder, files), configs, kwargs)
+
+def _collect(futures) -> pd.DataFrame:
+    frames = [future.result() for future in futures]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def backtest_days(steps: pd.DataFrame, configs: pd.DataFrame, max_workers=None, **kwargs) -> pd.DataFrame:
+    """backtest for every UTC day of `steps` in its own process; one row per (day, config)."""
+    days = pd.to_datetime(steps["timestamp_ms"] // DAY_MS * DAY_MS, unit="ms").dt.strftime("%Y-%m-%d")
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_backtest_day, day, part, configs, kwargs)
+            for day, part in steps.groupby(days, sort=True) if len(part) >= 2
+        ]
+        return _collect(futures)
+
+def backtest_folder(folder: str, configs: pd.DataFrame, max_workers=None, **kwargs) -> pd.DataFrame:
+    """backtest_days over a folder of YYYY-MM-DD_HH.csv hour files; each worker reads its own day."""
+    files = sorted(f for f in os.listdir(folder) if f.endswith(".csv"))
+    days = {}
+    for f in files:
+        days.setdefault(f[:10], []).append(f)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_backtest_tape_day, day, folder, day_files, configs, kwargs)
+            for day, day_files in sorted(days.items())
+        ]
+        return _collect(futures)
+
+def summarize(results: pd.DataFrame) -> pd.DataFrame:
+    """Per-config totals over days: summed fees / rebalances, mean time in range, compounded return."""
+    keys = ["width", "tick_spacing", "rebalance", "period_ms"]
+    grouped = results.groupby(keys, sort=False)
+    summary = grouped.agg(
+        days=("day", "nunique"),
+        fees=("fees", "sum"),
+        mean_il=("il", "mean"),
+        time_in_range=("time_in_range", "mean"),
+        in_range_volume=("in_range_volume", "sum"),
+        rebalances=("rebalances", "sum"),
+    )
+    summary["net_return"] = grouped["net_return"].apply(lambda r: np.prod(1 + r) - 1)
+    return summary.reset_index().sort_values("net_return", ascending=False, ignore_index=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--folder", help="aggTrade hour files, e.g. ./data/trades/BNBUSDT")
+    parser.add_argument("--symbol", default="BNBUSDT", help="1m candles from Binance when no --folder is given")
+    parser.add_argument("--hours", type=float, default=72)
+    parser.add_argument("--widths", nargs="+", type=int, default=list(DEFAULT_WIDTHS))
+    parser.add_argument("--tick-spacing", nargs="+", type=int, default=[10])
+    parser.add_argument("--rebalance", nargs="+", default=list(DEFAULT_REBALANCES), choices=["none", "exit", "period"])
+    parser.add_argument("--period-hours", type=float, default=1)
+    parser.add_argument("--fee-rate", type=float, default=0.0005)
+    parser.add_argument("--pool-tvl", type=float, default=1e7)
+    parser.add_argument("--output", help="write the per-day results to this CSV")
+    args = parser.parse_args()
+
+    configs = lp_configs(args.widths, args.tick_spacing, args.rebalance, int(args.period_hours * 60 * 60 * 1000))
+    kwargs = {"fee_rate": args.fee_rate, "pool_tvl": args.pool_tvl}
+    if args.folder:
+        results = backtest_folder(args.folder, configs, **kwargs)
+    else:
+        from fluctuation_analysis import fetch_base_candles
+
+        candles = fetch_base_candles(args.symbol, ["1m"], args.hours)
+        results = backtest_days(candle_steps(candles), configs, **kwargs)
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(summarize(results).to_string(index=False))
@@ -0,0 +1,191 @@
+"""
+In-process counters and histograms exported in the Prometheus text format.
+
+Worker processes (the ASGI process pool) record into their own copy of the
+registry; they call REGISTRY.reset() before a task and return
+REGISTRY.snapshot() with the result so the parent can merge() it.
+"""
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f"{k}=\"{v}\"" for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labels=(), lock=None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = lock or threading.Lock()
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = []
+        # copy under the lock, format outside it
+        for key, value in sorted(self.snapshot().items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.values)
+
+    def merge(self, values):
+        with self._lock:
+            for key, value in values.items():
+                self.values[key] = self.values.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.values = {}
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS, lock=None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = lock or threading.Lock()
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = []
+        # copy under the lock, format outside it
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self.values.items()}
+
+    def merge(self, values):
+        with self._lock:
+            for key, (counts, total, count) in values.items():
+                entry = self.values.get(key)
+                if entry is None:
+                    entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+
+    def reset(self):
+        with self._lock:
+            self.values = {}
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = {}
+
+    def _register(self, cls, name, *args, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, lock=self._lock, **kwargs)
+        return metric
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self._register(Counter, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def merge(self, snapshot: dict):
+        for name, values in snapshot.items():
+            if name in self.metrics:
+                self.metrics[name].merge(values)
+
+    def reset(self):
+        for metric in self.metrics.values():
+            metric.reset()
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "fluctuation_stage_seconds",
+    "Wall time of each detection stage (fetch, rolling_ohlc, look_back_sweep, evaluate_vol_model).",
+    labels=("stage",),
+)
+LOOK_BACK_SECONDS = REGISTRY.histogram(
+    "fluctuation_look_back_seconds",
+    "Wall time to compute the bands of one look_back.",
+    labels=("look_back",),
+)
+ROWS_PROCESSED = REGISTRY.counter(
+    "fluctuation_rows_processed_total",
+    "Rows handled per stage.",
+    labels=("stage",),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "fluctuation_cache_requests_total",
+    "Result cache lookups by outcome (hit, miss, shared in-flight).",
+    labels=("result",),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "fluctuation_request_seconds",
+    "HTTP request latency by route.",
+    labels=("route",),
+)
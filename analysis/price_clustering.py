@@ -4,21 +4,20 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from dateutil import tz
+from loaders import read_trades
+from profiling import profiled
 
-from sklearn.cluster import DBSCAN
-from sklearn.neighbors import NearestNeighbors
-from sklearn.neighbors import KernelDensity
-from sklearn.mixture import GaussianMixture
-from scipy.stats import norm
-
-from sklearn.cluster import MeanShift
-from scipy.stats import gaussian_kde
+# sklearn, scipy and matplotlib take about a second to import between them;
+# each band method imports only what it uses
 
 def generate_liquidity_bands(data, bandwidth=0.5):
     """
     Generate liquidity bands using kernel density estimation
     and mean shift clustering with volume-duration weighting
     """
+    from scipy.stats import gaussian_kde
+    from sklearn.cluster import MeanShift
+
     # Calculate weighted density
     prices = data['price_bin'].values
     weights = data['weight'].values
@@ -80,7 +79,11 @@ def weighted_resample(data, n_samples=10000):
     )
     return data.iloc[indices]['price_bin'].copy()
 
+@profiled
 def gmm_bands(data, n_bands, coverage_threshold=0.9):
+    from scipy.stats import norm
+    from sklearn.mixture import GaussianMixture
+
     sampled = weighted_resample(data, n_samples = 10 * len(data)).values.reshape(-1, 1)
 
     # plt.scatter(sampled, sampled)
@@ -126,9 +129,11 @@ def gmm_bands(data, n_bands, coverage_threshold=0.9):
     # plt.show()
     return bands
 
-from scipy.integrate import simpson
-
+@profiled
 def kde_bands(data, n_bands = 3, bandwidth=0.003):
+    from scipy.integrate import simpson
+    from sklearn.neighbors import KernelDensity
+
     kde = KernelDensity(kernel='gaussian', bandwidth = bandwidth)
 
     prices = data['price_bin'].values
@@ -211,10 +216,10 @@ def kde_bands(data, n_bands = 3, bandwidth=0.003):
     # return bands
     
 
-from sklearn.preprocessing import StandardScaler
-
-
 def dbscan_bands(data, min_samples=5, eps=1):
+    from sklearn.cluster import DBSCAN
+    from sklearn.preprocessing import StandardScaler
+
     log_prices = np.log(data['price'])
     X = log_prices.values.reshape(-1, 1)
     X_scaled = StandardScaler().fit_transform(X)
@@ -333,9 +338,9 @@ def calculate_weights(data, current_time, lambda_recency=0.1):
     # return data[['price', 'duration', 'volume', 'weight']]
     return data[['price_bin', 'duration', 'volume', 'weight']]
 
-import matplotlib.pyplot as plt
-
 def plot_volume_and_duration(df_vol, df_dur, title="Volume & Duration by Price"):
+    import matplotlib.pyplot as plt
+
     # Ensure price is float and sorted
     df_vol["price"] = df_vol["price"].astype(float)
     df_dur["price"] = df_dur["price"].astype(float)
@@ -368,7 +373,7 @@ if __name__ == "__main__":
     symbol = "BNBBTC"
     filepath = "./data/trades/" + symbol + "/1.csv"
 
-    df = pd.read_csv(filepath, usecols=["timestamp_ms", "price", "qty"])
+    df = read_trades(filepath, ["timestamp_ms", "price", "qty"])
     df = df.rename(columns={'qty': 'volume'})
 
     # make sure it is ordered ascending by timestamp
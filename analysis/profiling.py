@@ -0,0 +1,160 @@
+"""
+Opt-in profiling for the analysis pipelines.
+
+Hot functions are wrapped with @profiled; while profiling is off the wrapper
+is a single flag check before calling through. Turn it on with
+
+    ANALYSIS_PROFILE=1 python trend_analysis_5m.py
+    python profiling.py [--pstats-dir DIR] trend_analysis_5m.py [args...]
+
+or profiling.enable() from code. Each profiled call records wall time, CPU
+time and peak traced memory (tracemalloc); a summary is printed at exit.
+With ANALYSIS_PROFILE_DIR / --pstats-dir set, every outermost profiled call
+also dumps a cProfile .pstats file there.
+"""
+import atexit
+import cProfile
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_enabled = False
+_pstats_dir = None
+_lock = threading.Lock()
+_local = threading.local()
+
+# name -> {"calls", "wall_s", "cpu_s", "peak_bytes"}
+_stats = {}
+
+# every function wrapped with @profiled, by name
+REGISTRY = {}
+
+def enable(pstats_dir: str = None):
+    global _enabled, _pstats_dir
+    _pstats_dir = pstats_dir
+    if pstats_dir:
+        os.makedirs(pstats_dir, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if not _enabled:
+        atexit.register(print_report)
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    atexit.unregister(print_report)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+def _record(name, wall, cpu, peak):
+    with _lock:
+        entry = _stats.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0})
+        entry["calls"] += 1
+        entry["wall_s"] += wall
+        entry["cpu_s"] += cpu
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+
+@contextmanager
+def section(name: str):
+    """Profile a block; no-op unless profiling is enabled."""
+    if not _enabled:
+        yield
+        return
+
+    # tracemalloc has a single peak counter, so nested sections hand their
+    # peak to the enclosing one before it gets reset
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    start_memory, outer_peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1] = max(stack[-1], outer_peak)
+    tracemalloc.reset_peak()
+    stack.append(0)
+
+    profiler = None
+    if _pstats_dir and len(stack) == 1:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(os.path.join(_pstats_dir, f"{name}-{int(time.time() * 1000)}.pstats"))
+
+        peak = max(tracemalloc.get_traced_memory()[1], stack.pop())
+        if stack:
+            stack[-1] = max(stack[-1], peak)
+        _record(name, wall, cpu, max(peak - start_memory, 0))
+
+def profiled(fn=None, *, name: str = None):
+    """Decorator registering `fn` as a profiling hook; usable bare or with name=."""
+    if fn is None:
+        return functools.partial(profiled, name=name)
+
+    hook_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        with section(hook_name):
+            return fn(*args, **kwargs)
+
+    REGISTRY[hook_name] = wrapper
+    return wrapper
+
+def stats() -> dict:
+    with _lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+def print_report():
+    current = stats()
+    if not current:
+        return
+    print(f"{'hook':<55} {'calls':>6} {'wall s':>10} {'cpu s':>10} {'peak MiB':>10}")
+    for name, entry in sorted(current.items(), key=lambda item: -item[1]["wall_s"]):
+        print(
+            f"{name:<55} {entry['calls']:>6} {entry['wall_s']:>10.4f} {entry['cpu_s']:>10.4f} "
+            f"{entry['peak_bytes'] / 2 ** 20:>10.2f}"
+        )
+
+if os.environ.get("ANALYSIS_PROFILE", "").lower() in ("1", "true", "yes"):
+    enable(os.environ.get("ANALYSIS_PROFILE_DIR") or None)
+
+if __name__ == "__main__":
+    import argparse
+    import runpy
+    import sys
+
+    parser = argparse.ArgumentParser(description="Run an analysis script with profiling hooks enabled")
+    parser.add_argument("--pstats-dir", default=os.environ.get("ANALYSIS_PROFILE_DIR"))
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    # scripts import this file as `profiling`, not `__main__`
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import profiling
+    profiling.enable(args.pstats_dir)
+
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    runpy.run_path(args.script, run_name="__main__")
@@ -0,0 +1,156 @@
+"""
+Vectorized open-position / out-of-range simulation (the loop in 3_windows2.run).
+
+A position opens at a bar's close with bands close * (1 -+ multiplier * vol),
+stays open while later closes remain inside the bands and is closed on the
+first close outside them; the next bar opens a new position.
+
+Breaches within a few bars are found for every bar and multiplier at once
+by comparing shifted slices. Walking the chain of opens then only looks
+up those, and resolves the rare long positions with a block sparse table.
+Per-bar results are filled in from the segment boundaries.
+"""
+import numpy as np
+import pandas as pd
+
+def _breaches(close, lower, upper):
+    # NaN closes or bands never breach, as in the row loop
+    return (close > upper) | (close < lower)
+
+def near_breach(close: np.ndarray, lower: np.ndarray, upper: np.ndarray, near: int = 8) -> np.ndarray:
+    """
+    First breach index within `near` bars after each bar, -1 if there is
+    none that close. `lower` / `upper` are (configs, bars).
+    """
+    n = len(close)
+    breach = np.full(lower.shape, -1, dtype=np.int64)
+    for offset in range(min(near, n - 1), 0, -1):
+        hit = _breaches(close[offset:], lower[:, :-offset], upper[:, :-offset])
+        breach[:, :-offset][hit] = np.nonzero(hit)[1] + offset
+    return breach
+
+class BlockExtremes:
+    """
+    Sparse table of per-block close max/min: finds the first breach after a
+    bar in O(block + log(bars / block)) with O(bars) memory.
+    """
+
+    def __init__(self, close: np.ndarray, block: int = 16):
+        self.n = len(close)
+        self.block = block
+        blocks = -(-self.n // block)
+        padded = np.full(blocks * block, np.nan)
+        padded[:self.n] = close
+        with np.errstate(invalid="ignore"):
+            self.max = [np.fmax.reduce(padded.reshape(blocks, block), axis=1)]
+            self.min = [np.fmin.reduce(padded.reshape(blocks, block), axis=1)]
+        while 2 ** len(self.max) <= blocks:
+            span = 2 ** (len(self.max) - 1)
+            self.max.append(np.fmax(self.max[-1][:-span], self.max[-1][span:]))
+            self.min.append(np.fmin(self.min[-1][:-span], self.min[-1][span:]))
+        self.close = padded.tolist()
+        self.max = [level.tolist() for level in self.max]
+        self.min = [level.tolist() for level in self.min]
+
+    def first_breach(self, after: int, lower: float, upper: float) -> int:
+        """First index >= `after` whose close is outside [lower, upper], or n."""
+        block = self.block
+        close = self.close
+
+        # finish the block `after` falls in
+        end = min((after // block + 1) * block, self.n)
+        for index in range(after, end):
+            if close[index] > upper or close[index] < lower:
+                return index
+        if end >= self.n:
+            # that was the last, partial block
+            return self.n
+
+        def clear(level, position):
+            return position < len(self.max[level]) and not (self.max[level][position] > upper or self.min[level][position] < lower)
+
+        # gallop over whole blocks with growing spans, then narrow down to
+        # the first block holding a breach; cost grows with log(distance)
+        position = end // block
+        top = len(self.max) - 1
+        level = 0
+        while clear(level, position):
+            position += 2 ** level
+            level = min(level + 1, top)
+        for level in range(level - 1, -1, -1):
+            if clear(level, position):
+                position += 2 ** level
+        if position >= len(self.max[0]):
+            return self.n
+
+        for index in range(max(position * block, after), min((position + 1) * block, self.n)):
+            if close[index] > upper or close[index] < lower:
+                return index
+        return self.n
+
+def position_segments(near: np.ndarray, close: np.ndarray, lower: np.ndarray, upper: np.ndarray, extremes: BlockExtremes, far_after: int, reopen: int = 1):
+    """
+    Walks the chain of positions for one config: returns (opens, breaches),
+    where position k opens at opens[k] and is closed at breaches[k]
+    (len(close) if it is still open at the end). The next position opens
+    `reopen` bars after a breach; 0 re-enters on the breaching bar itself.
+    """
+    n = len(close)
+    following = near.tolist()
+    opens = []
+    breaches = []
+    bar = 0
+    while bar < n:
+        breach = following[bar]
+        if breach < 0:
+            breach = extremes.first_breach(min(bar + far_after, n), lower[bar], upper[bar])
+        opens.append(bar)
+        breaches.append(breach)
+        # always move forward, even if reopen=0 re-enters on the breaching bar
+        bar = max(breach + reopen, bar + 1)
+    return np.asarray(opens, dtype=np.int64), np.asarray(breaches, dtype=np.int64)
+
+def segment_results(n: int, opens: np.ndarray, breaches: np.ndarray) -> np.ndarray:
+    """Per-bar result like 3_windows2.run: 0 at an open, 1 in range, -1 at a breach."""
+    result = np.ones(n, dtype=np.int8)
+    result[opens] = 0
+    result[breaches[breaches < n]] = -1
+    return result
+
+def simulate_ranges(close, vol, multipliers=(1.0,), near: int = 8, block: int = 16) -> dict:
+    """
+    Runs the position simulation for every band multiplier.
+
+    `vol` is the relative half-width per bar (vol_5 in 3_windows2). Returns
+    {"summary": DataFrame with one row per multiplier, "results": (configs,
+    bars) int8 per-bar results, "in_range_slots": list of per-config arrays}.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    vol = np.asarray(vol, dtype=np.float64)
+    multipliers = np.atleast_1d(np.asarray(multipliers, dtype=np.float64))
+    width = multipliers[:, None] * vol[None, :]
+    lower = close * (1 - width)
+    upper = close * (1 + width)
+
+    breach = near_breach(close, lower, upper, near)
+    extremes = BlockExtremes(close, block)
+
+    results = np.empty((len(multipliers), len(close)), dtype=np.int8)
+    slots = []
+    rows = []
+    for i, multiplier in enumerate(multipliers):
+        opens, breaches = position_segments(breach[i], close, lower[i], upper[i], extremes, near + 1)
+        results[i] = segment_results(len(close), opens, breaches)
+        closed = breaches < len(close)
+        slots.append(breaches[closed] - opens[closed] - 1)
+
+        predicted = results[i][results[i] != 0]
+        rows.append({
+            "multiplier": multiplier,
+            "positions": len(opens),
+            "breaches": int(closed.sum()),
+            "in_range_rate": predicted.mean() if len(predicted) else np.nan,
+            "mean_slots": slots[-1].mean() if len(slots[-1]) else np.nan,
+            "median_slots": np.median(slots[-1]) if len(slots[-1]) else np.nan,
+        })
+    return {"summary": pd.DataFrame(rows), "results": results, "in_range_slots": slots}
@@ -0,0 +1,99 @@
+"""
+Deterministic synthetic market data for benchmarks.
+
+ohlcv_1m: 1m OHLCV candles from a GBM whose volatility switches between
+regimes (Markov chain), laid out like get_recent_24h_klines output.
+agg_trade_tape: an aggTrade tape (agg_id, timestamp_ms, price, qty,
+is_maker) like the files written by binance_agg_trade.py.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+MINUTE_MS = 60 * 1000
+HOUR_MS = 60 * MINUTE_MS
+
+# (per-minute log-return sigma, probability of staying in the regime each minute)
+DEFAULT_REGIMES = ((3e-4, 0.995), (8e-4, 0.98), (2e-3, 0.95))
+
+START_MS = 1_750_000_000_000 // HOUR_MS * HOUR_MS
+
+def regime_sigmas(rows: int, regimes=DEFAULT_REGIMES, rng=None) -> np.ndarray:
+    """Per-step sigma of a Markov regime chain; each switch jumps to a random other regime."""
+    rng = rng or np.random.default_rng(0)
+    sigmas = np.array([sigma for sigma, _ in regimes])
+    stay = np.array([p for _, p in regimes])
+
+    # simulate regime run lengths instead of stepping row by row
+    states = []
+    total = 0
+    state = 0
+    while total < rows:
+        length = int(rng.geometric(1 - stay[state]))
+        states.append((state, length))
+        total += length
+        others = [s for s in range(len(regimes)) if s != state]
+        state = others[rng.integers(len(others))] if others else state
+
+    labels = np.repeat([s for s, _ in states], [n for _, n in states])[:rows]
+    return sigmas[labels]
+
+def ohlcv_1m(rows: int, start_price: float = 600.0, seed: int = 0, regimes=DEFAULT_REGIMES, start_ms: int = START_MS, time_col: str = "timestamp_ms") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sigma = regime_sigmas(rows, regimes, rng)
+
+    log_close = np.log(start_price) + np.cumsum(rng.standard_normal(rows) * sigma)
+    close = np.exp(log_close)
+    open_ = np.empty(rows)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+
+    # intrabar excursions beyond the body, scaled by the regime sigma
+    up = np.abs(rng.standard_normal(rows)) * sigma * 0.5
+    down = np.abs(rng.standard_normal(rows)) * sigma * 0.5
+    high = np.maximum(open_, close) * np.exp(up)
+    low = np.minimum(open_, close) * np.exp(-down)
+
+    volume = rng.lognormal(mean=3.0, sigma=0.8, size=rows) * (sigma / sigma.min())
+    return pd.DataFrame({
+        time_col: start_ms + np.arange(rows, dtype=np.int64) * MINUTE_MS,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    })
+
+def agg_trade_tape(rows: int, start_price: float = 0.0095, seed: int = 0, trades_per_second: float = 5.0, tick_size: float = 1e-7, start_ms: int = START_MS, start_id: int = 100_000_000, regimes=DEFAULT_REGIMES) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    gaps = rng.exponential(1000 / trades_per_second, size=rows)
+    timestamp_ms = start_ms + np.cumsum(gaps).astype(np.int64)
+
+    # per-trade sigma from the per-minute regime sigma
+    minutes = int((timestamp_ms[-1] - start_ms) // MINUTE_MS) + 1 if rows else 0
+    minute_sigma = regime_sigmas(max(minutes, 1), regimes, rng)
+    per_trade = minute_sigma[(timestamp_ms - start_ms) // MINUTE_MS] / np.sqrt(60 * trades_per_second)
+
+    log_price = np.log(start_price) + np.cumsum(rng.standard_normal(rows) * per_trade)
+    price = np.round(np.exp(log_price) / tick_size) * tick_size
+
+    return pd.DataFrame({
+        "agg_id": start_id + np.arange(rows, dtype=np.int64),
+        "timestamp_ms": timestamp_ms,
+        "price": price,
+        "qty": np.round(rng.lognormal(mean=-1.0, sigma=1.2, size=rows), 3),
+        "is_maker": rng.random(rows) < 0.5,
+    })
+
+def write_hour_files(tape: pd.DataFrame, folder: str) -> list:
+    """Partitions a tape into <folder>/YYYY-MM-DD_HH.csv like fetch_agg_trades_by_hour."""
+    os.makedirs(folder, exist_ok=True)
+    hours = pd.to_datetime(tape["timestamp_ms"] // HOUR_MS * HOUR_MS, unit="ms").dt.strftime("%Y-%m-%d_%H")
+    paths = []
+    for hour_key, part in tape.groupby(hours, sort=True):
+        path = os.path.join(folder, f"{hour_key}.csv")
+        part.to_csv(path, index=False, float_format="%.8f")
+        paths.append(path)
+    return paths
@@ -0,0 +1,197 @@
+"""
+Append-only binary aggTrade tape of fixed-width records.
+
+A 64 byte header (magic, version, record size, symbol) is followed by
+40 byte little-endian records (agg_id, timestamp_ms, price, qty, is_maker)
+in agg_id order. Files are opened with np.memmap, so a time slice is two
+binary searches on the timestamp column and a view into the mapping;
+nothing is parsed or copied until a column is used:
+
+    csv_to_binary("./data/trades/BNBBTC", "./data/trades/BNBBTC.tape", "BNBBTC")
+    tape = BinaryTape("./data/trades/BNBBTC.tape")
+    records = tape.slice(start_ms, end_ms)      # structured memmap view
+    prices = records["price"]
+
+A record cut short by a crash mid-append is ignored on read and dropped by
+the next append.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from loaders import read_trades
+from tape_manifest import clip_rows, files_in_range
+
+TAPE_SUFFIX = ".tape"
+MAGIC = b"AGGTAPE\x00"
+VERSION = 1
+HEADER_SIZE = 64
+
+RECORD_DTYPE = np.dtype({
+    "names": ["agg_id", "timestamp_ms", "price", "qty", "is_maker"],
+    "formats": ["<i8", "<i8", "<f8", "<f8", "?"],
+    "offsets": [0, 8, 16, 24, 32],
+    "itemsize": 40,
+})
+
+HEADER_DTYPE = np.dtype({
+    "names": ["magic", "version", "record_size", "symbol"],
+    "formats": ["S8", "<u4", "<u4", "S16"],
+    "offsets": [0, 8, 12, 16],
+    "itemsize": HEADER_SIZE,
+})
+
+CSV_COLUMNS = ["agg_id", "timestamp_ms", "price", "qty", "is_maker"]
+HOUR_MS = 60 * 60 * 1000
+
+def _read_header(path: str) -> np.void:
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    if len(header) == 0 or header[0]["magic"] != MAGIC.rstrip(b"\x00"):
+        raise ValueError(f"{path} is not a binary trade tape")
+    if header[0]["version"] != VERSION or header[0]["record_size"] != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} has version {header[0]['version']} / record size {header[0]['record_size']}, expected {VERSION} / {RECORD_DTYPE.itemsize}")
+    return header[0]
+
+def _record_count(path: str) -> int:
+    return (os.path.getsize(path) - HEADER_SIZE) // RECORD_DTYPE.itemsize
+
+def to_records(df: pd.DataFrame) -> np.ndarray:
+    """Tape frame (CSV layout) to packed records."""
+    records = np.zeros(len(df), dtype=RECORD_DTYPE)
+    records["agg_id"] = df["agg_id"].to_numpy(dtype=np.int64)
+    records["timestamp_ms"] = df["timestamp_ms"].to_numpy(dtype=np.int64)
+    records["price"] = df["price"].to_numpy(dtype=np.float64)
+    records["qty"] = df["qty"].to_numpy(dtype=np.float64)
+    maker = df["is_maker"]
+    records["is_maker"] = maker.to_numpy() if maker.dtype == bool else maker.astype(str).str.lower().eq("true").to_numpy()
+    return records
+
+def append_records(path: str, records: np.ndarray, symbol: str = "") -> int:
+    """
+    Appends records after the last one in the file (created with a header if
+    missing); records not newer than the tape's last agg_id are skipped, so
+    re-appending an overlapping batch is harmless. Returns the number written.
+    """
+    records = np.asarray(records, dtype=RECORD_DTYPE)
+    if len(records) > 1 and (np.any(np.diff(records["agg_id"]) <= 0) or np.any(np.diff(records["timestamp_ms"]) < 0)):
+        raise ValueError("records must be in increasing agg_id and time order")
+
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER_SIZE:
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["record_size"] = RECORD_DTYPE.itemsize
+        header["symbol"] = symbol.encode()
+        with open(path, "wb") as f:
+            header.tofile(f)
+    else:
+        _read_header(path)
+
+    count = _record_count(path)
+    if count:
+        last = np.fromfile(path, dtype=RECORD_DTYPE, count=1, offset=HEADER_SIZE + (count - 1) * RECORD_DTYPE.itemsize)[0]
+        records = records[records["agg_id"] > last["agg_id"]]
+        if len(records) and records["timestamp_ms"][0] < last["timestamp_ms"]:
+            raise ValueError("records start before the end of the tape")
+
+    with open(path, "r+b") as f:
+        # drop a partial record left by an interrupted append
+        f.truncate(HEADER_SIZE + count * RECORD_DTYPE.itemsize)
+        f.seek(0, os.SEEK_END)
+        records.tofile(f)
+    return len(records)
+
+class BinaryTape:
+    """Read-only memory map of a binary tape."""
+
+    def __init__(self, path: str):
+        self.path = path
+        header = _read_header(path)
+        self.symbol = header["symbol"].decode()
+        count = _record_count(path)
+        self.records = (
+            np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count,))
+            if count else np.zeros(0, dtype=RECORD_DTYPE)
+        )
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def start_ms(self):
+        return int(self.records["timestamp_ms"][0]) if len(self) else None
+
+    @property
+    def end_ms(self):
+        """Newest trade timestamp."""
+        return int(self.records["timestamp_ms"][-1]) if len(self) else None
+
+    def bounds(self, start_ms=None, end_ms=None):
+        """Record index range [lo, hi) of trades in [start_ms, end_ms), by binary search."""
+        times = self.records["timestamp_ms"]
+        lo = 0 if start_ms is None else int(np.searchsorted(times, start_ms, side="left"))
+        hi = len(self) if end_ms is None else int(np.searchsorted(times, end_ms, side="left"))
+        return lo, max(lo, hi)
+
+    def slice(self, start_ms=None, end_ms=None) -> np.ndarray:
+        """Zero-copy view of the records in [start_ms, end_ms)."""
+        lo, hi = self.bounds(start_ms, end_ms)
+        return self.records[lo:hi]
+
+    def to_frame(self, start_ms=None, end_ms=None, columns=None) -> pd.DataFrame:
+        """The slice as a DataFrame in the CSV layout (this copies the columns used)."""
+        records = self.slice(start_ms, end_ms)
+        return pd.DataFrame({name: np.asarray(records[name]) for name in (columns or CSV_COLUMNS)})
+
+    def chunks(self, start_ms=None, end_ms=None, rows: int = 1_000_000):
+        """The slice as DataFrames of at most `rows` trades, oldest first."""
+        lo, hi = self.bounds(start_ms, end_ms)
+        for start in range(lo, hi, rows):
+            part = self.records[start:min(start + rows, hi)]
+            yield pd.DataFrame({name: np.asarray(part[name]) for name in CSV_COLUMNS})
+
+def csv_to_binary(folder: str, path: str, symbol: str = "", start_ms=None, end_ms=None) -> int:
+    """Appends the hour files of a tape folder to a binary tape, one file at a time."""
+    written = 0
+    for filename in files_in_range(folder, start_ms, end_ms):
+        # float64 quantities so the binary tape holds exactly what the CSV did
+        df = clip_rows(read_trades(os.path.join(folder, filename), CSV_COLUMNS, {"qty": np.float64}), start_ms, end_ms)
+        # a repeated agg_id is damage tape_integrity reports, store the trade once
+        df = df.sort_values("agg_id", kind="stable").drop_duplicates("agg_id")
+        written += append_records(path, to_records(df), symbol)
+    return written
+
+def _runs(keys: np.ndarray):
+    starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1)) if len(keys) else np.zeros(0, dtype=np.int64)
+    return starts, np.append(starts[1:], len(keys)).astype(np.int64)
+
+def binary_to_csv(path: str, folder: str, start_ms=None, end_ms=None) -> list:
+    """Writes a binary tape back out as YYYY-MM-DD_HH.csv hour files; returns their names."""
+    os.makedirs(folder, exist_ok=True)
+    tape = BinaryTape(path)
+    records = tape.slice(start_ms, end_ms)
+    hours = np.asarray(records["timestamp_ms"]) // HOUR_MS
+    names = []
+    for start, stop in zip(*_runs(hours)):
+        part = records[start:stop]
+        hour_key = pd.Timestamp(int(hours[start]) * HOUR_MS, unit="ms").strftime("%Y-%m-%d_%H")
+        pd.DataFrame({name: np.asarray(part[name]) for name in CSV_COLUMNS}).to_csv(
+            os.path.join(folder, f"{hour_key}.csv"), index=False, float_format="%.8f"
+        )
+        names.append(f"{hour_key}.csv")
+    return names
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("source", help="hour CSV folder to convert, or a .tape file to export")
+    parser.add_argument("target", help=".tape file to append to, or a folder for the hour files")
+    parser.add_argument("--symbol", default="")
+    args = parser.parse_args()
+
+    if args.source.endswith(TAPE_SUFFIX):
+        print(f"wrote {len(binary_to_csv(args.source, args.target))} hour files to {args.target}")
+    else:
+        print(f"appended {csv_to_binary(args.source, args.target, args.symbol)} trades to {args.target}")
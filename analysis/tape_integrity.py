@@ -0,0 +1,191 @@
+"""
+agg_id gap and duplicate index over the hour-partitioned aggTrade files.
+
+Binance numbers aggTrades consecutively per symbol, so every missing id is a
+trade the tape lost (an interrupted fetch_agg_trades_by_hour, an overwritten
+hour) and every repeated id is counted twice by the profiles. One streaming
+pass over the files, oldest first, finds both and stores them in
+<folder>/integrity.json next to the manifest:
+
+    index = scan_folder("./data/trades/BNBBTC")
+    is_range_complete("./data/trades/BNBBTC", start_ms, end_ms)
+    repair_folder("./data/trades/BNBBTC", "BNBBTC")   # refetch the gaps by id
+
+The index is rebuilt when the manifest's checksums no longer match the
+ones it was built from.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from loaders import read_trades
+from tape_manifest import current_manifest, files_in_range
+
+INDEX_NAME = "integrity.json"
+INDEX_VERSION = 1
+
+GAP_COLUMNS = ["first_id", "last_id", "missing", "after_ms", "before_ms"]
+
+def index_path(folder: str) -> str:
+    return os.path.join(folder, INDEX_NAME)
+
+def _fingerprint(manifest: dict) -> dict:
+    return {filename: entry["sha256"] for filename, entry in manifest["files"].items()}
+
+def _file_ids(path: str):
+    """Sorted agg_ids of one file with their timestamps, and the ids stored more than once."""
+    df = read_trades(path, ["agg_id", "timestamp_ms"])
+    ids = df["agg_id"].to_numpy()
+    times = df["timestamp_ms"].to_numpy()
+    order = np.argsort(ids, kind="stable")
+    ids, times = ids[order], times[order]
+    repeated = ids[1:] == ids[:-1]
+    duplicates = np.unique(ids[1:][repeated])
+    keep = np.concatenate(([True], ~repeated)) if len(ids) else np.zeros(0, dtype=bool)
+    return ids[keep], times[keep], duplicates
+
+def _gaps(ids: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """(first_id, last_id, missing, after_ms, before_ms) of every hole in sorted unique ids."""
+    holes = np.flatnonzero(np.diff(ids) > 1)
+    return np.column_stack([
+        ids[holes] + 1,
+        ids[holes + 1] - 1,
+        ids[holes + 1] - ids[holes] - 1,
+        times[holes],
+        times[holes + 1],
+    ]).astype(np.int64) if len(holes) else np.zeros((0, len(GAP_COLUMNS)), dtype=np.int64)
+
+def scan_folder(folder: str) -> dict:
+    """
+    Builds and saves the gap / duplicate index of a tape folder. Files are
+    read one at a time; only the previous file's ids are kept, to find gaps
+    and repeats across an hour boundary.
+    """
+    manifest = current_manifest(folder)
+    gaps, duplicates = [], []
+    previous_ids = None  # every id of the previous file
+    tail = None  # (ids, times) of the newest trade so far
+    first_ms = last_ms = None
+
+    for filename in files_in_range(folder):
+        ids, times, repeated = _file_ids(os.path.join(folder, filename))
+        duplicates.append(repeated)
+        if previous_ids is not None:
+            # ids also stored in the previous hour
+            duplicates.append(np.intersect1d(ids, previous_ids, assume_unique=True))
+        previous_ids = ids
+        if tail is not None:
+            # hours partition the ids by time, so anything older was counted above
+            newer = ids > tail[0][-1]
+            ids = np.concatenate((tail[0], ids[newer]))
+            times = np.concatenate((tail[1], times[newer]))
+        gaps.append(_gaps(ids, times))
+        tail = (ids[-1:], times[-1:])
+        first_ms = int(times[0]) if first_ms is None else first_ms
+        last_ms = int(times[-1])
+
+    gaps = np.concatenate(gaps) if gaps else np.zeros((0, len(GAP_COLUMNS)), dtype=np.int64)
+    duplicates = np.unique(np.concatenate(duplicates)) if duplicates else np.zeros(0, dtype=np.int64)
+    index = {
+        "version": INDEX_VERSION,
+        "files": _fingerprint(manifest),
+        "first_ms": first_ms,
+        "last_ms": last_ms,
+        "gaps": gaps.tolist(),
+        "duplicates": duplicates.tolist(),
+    }
+    tmp = f"{index_path(folder)}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, index_path(folder))
+    return index
+
+def load_index(folder: str) -> dict:
+    """The saved index, rescanning first if any hour file changed since it was built."""
+    try:
+        with open(index_path(folder)) as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return scan_folder(folder)
+    if index.get("version") != INDEX_VERSION or index["files"] != _fingerprint(current_manifest(folder)):
+        return scan_folder(folder)
+    return index
+
+def gap_frame(index: dict) -> pd.DataFrame:
+    return pd.DataFrame(np.asarray(index["gaps"], dtype=np.int64).reshape(-1, len(GAP_COLUMNS)), columns=GAP_COLUMNS)
+
+def missing_ranges(folder: str, start_ms=None, end_ms=None) -> pd.DataFrame:
+    """Gaps whose missing trades may fall in [start_ms, end_ms); None leaves a side open."""
+    gaps = gap_frame(load_index(folder))
+    keep = pd.Series(True, index=gaps.index)
+    if start_ms is not None:
+        keep &= gaps["before_ms"] >= start_ms
+    if end_ms is not None:
+        keep &= gaps["after_ms"] < end_ms
+    return gaps[keep].reset_index(drop=True)
+
+def missing_in_files(folder: str, filenames) -> int:
+    """
+    Lower bound on the trades missing in and between `filenames`, from the
+    manifest's per-file agg_id span and row count alone; reads no trades.
+    """
+    entries = current_manifest(folder)["files"]
+    spans = sorted((entries[f]["min_agg_id"], entries[f]["max_agg_id"], entries[f]["rows"]) for f in filenames if entries[f]["rows"] > 0)
+    missing = sum(max(last - first + 1 - rows, 0) for first, last, rows in spans)
+    missing += sum(max(spans[i][0] - spans[i - 1][1] - 1, 0) for i in range(1, len(spans)))
+    return missing
+
+def is_range_complete(folder: str, start_ms=None, end_ms=None) -> bool:
+    """
+    True if the tape covers [start_ms, end_ms) with no missing agg_id
+    (None means the first / last stored trade). A window reaching past the
+    stored trades is not complete.
+    """
+    index = load_index(folder)
+    if index["first_ms"] is None:
+        return False
+    if (start_ms is not None and start_ms < index["first_ms"]) or (end_ms is not None and end_ms > index["last_ms"] + 1):
+        return False
+    gaps = np.asarray(index["gaps"], dtype=np.int64).reshape(-1, len(GAP_COLUMNS))
+    after, before = gaps[:, 3], gaps[:, 4]
+    overlapping = np.ones(len(gaps), dtype=bool)
+    if start_ms is not None:
+        overlapping &= before >= start_ms
+    if end_ms is not None:
+        overlapping &= after < end_ms
+    return not overlapping.any()
+
+def repair_folder(folder: str, symbol: str, start_ms=None, end_ms=None, max_missing: int = 1_000_000) -> dict:
+    """
+    Refetches the trades missing in [start_ms, end_ms) by agg_id and merges
+    them into their hour files; duplicates in the files it rewrites are
+    dropped too.
+    Gaps larger than `max_missing` ids are left alone; fetch those by time.
+    Returns the rebuilt index.
+    """
+    from binance_agg_trade import fetch_agg_trades_by_id, merge_trades_into_hours
+
+    for gap in missing_ranges(folder, start_ms, end_ms).itertuples():
+        if gap.missing > max_missing:
+            print(f"skipping {gap.missing} missing ids {gap.first_id}..{gap.last_id}")
+            continue
+        trades = fetch_agg_trades_by_id(symbol, int(gap.first_id), int(gap.last_id))
+        print(f"refetched {len(trades)} of {gap.missing} trades {gap.first_id}..{gap.last_id}")
+        merge_trades_into_hours(trades, folder)
+    return scan_folder(folder)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", help="aggTrade hour files, e.g. ./data/trades/BNBBTC")
+    parser.add_argument("--repair", metavar="SYMBOL", help="refetch the missing trades of this symbol")
+    args = parser.parse_args()
+
+    index = repair_folder(args.folder, args.repair) if args.repair else scan_folder(args.folder)
+    gaps = gap_frame(index)
+    print(f"{len(gaps)} gaps, {int(gaps['missing'].sum())} missing trades, {len(index['duplicates'])} duplicated ids")
+    if len(gaps):
+        print(gaps.to_string(index=False))
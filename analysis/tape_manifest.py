@@ -0,0 +1,162 @@
+"""
+Per-symbol manifest of the hour-partitioned aggTrade files.
+
+<folder>/manifest.json records each file's min/max timestamp_ms, min/max
+agg_id, row count and sha256, so readers only open the files overlapping
+the range they need:
+
+    files = files_in_range("./data/trades/BNBBTC", start_ms, end_ms)
+    tape = read_range("./data/trades/BNBBTC", start_ms, end_ms)
+
+fetch_agg_trades_by_hour updates the manifest after every write. Entries
+whose file size or mtime no longer match are rebuilt on the next read, so
+files written by other tools are picked up too.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from loaders import read_trades
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+def manifest_path(folder: str) -> str:
+    return os.path.join(folder, MANIFEST_NAME)
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def file_entry(path: str) -> dict:
+    """Manifest entry of one hour file."""
+    stat = os.stat(path)
+    df = read_trades(path, ["agg_id", "timestamp_ms"])
+    empty = df.empty
+    return {
+        "min_ts": None if empty else int(df["timestamp_ms"].min()),
+        "max_ts": None if empty else int(df["timestamp_ms"].max()),
+        "min_agg_id": None if empty else int(df["agg_id"].min()),
+        "max_agg_id": None if empty else int(df["agg_id"].max()),
+        "rows": len(df),
+        "sha256": _sha256(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+def load_manifest(folder: str) -> dict:
+    try:
+        with open(manifest_path(folder)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"version": MANIFEST_VERSION, "files": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+def save_manifest(folder: str, manifest: dict):
+    # write then rename so readers never see a half-written manifest
+    path = manifest_path(folder)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def _tape_files(folder: str) -> list:
+    return sorted(f for f in os.listdir(folder) if f.endswith(".csv"))
+
+def _is_stale(folder: str, filename: str, entry) -> bool:
+    if entry is None:
+        return True
+    stat = os.stat(os.path.join(folder, filename))
+    return stat.st_size != entry["size"] or stat.st_mtime_ns != entry["mtime_ns"]
+
+def update_manifest(folder: str, filenames=None) -> dict:
+    """
+    Rebuilds the entries of `filenames` (every new or changed file by
+    default), drops entries of deleted files and saves the manifest.
+    """
+    manifest = load_manifest(folder)
+    entries = manifest["files"]
+    present = set(_tape_files(folder))
+    for filename in list(entries):
+        if filename not in present:
+            del entries[filename]
+
+    if filenames is None:
+        filenames = [f for f in sorted(present) if _is_stale(folder, f, entries.get(f))]
+    for filename in filenames:
+        entries[os.path.basename(filename)] = file_entry(os.path.join(folder, os.path.basename(filename)))
+
+    save_manifest(folder, manifest)
+    return manifest
+
+def current_manifest(folder: str) -> dict:
+    """The manifest, refreshed first if any file was added, changed or removed."""
+    manifest = load_manifest(folder)
+    present = _tape_files(folder)
+    if set(present) != set(manifest["files"]) or any(_is_stale(folder, f, manifest["files"][f]) for f in present):
+        manifest = update_manifest(folder)
+    return manifest
+
+def files_in_range(folder: str, start_ms=None, end_ms=None) -> list:
+    """Files holding trades in [start_ms, end_ms), oldest first; None leaves a side open."""
+    entries = current_manifest(folder)["files"]
+    selected = [
+        (entry["min_ts"], filename) for filename, entry in entries.items()
+        if entry["rows"] > 0
+        and (start_ms is None or entry["max_ts"] >= start_ms)
+        and (end_ms is None or entry["min_ts"] < end_ms)
+    ]
+    return [filename for _, filename in sorted(selected)]
+
+def latest_ms(folder: str):
+    """Newest trade timestamp in the folder, None if it holds no trades."""
+    stamps = [entry["max_ts"] for entry in current_manifest(folder)["files"].values() if entry["rows"] > 0]
+    return max(stamps) if stamps else None
+
+def clip_rows(df: pd.DataFrame, start_ms=None, end_ms=None) -> pd.DataFrame:
+    """Rows with start_ms <= timestamp_ms < end_ms; `df` itself when there are no bounds."""
+    if start_ms is None and end_ms is None:
+        return df
+    keep = pd.Series(True, index=df.index)
+    if start_ms is not None:
+        keep &= df["timestamp_ms"] >= start_ms
+    if end_ms is not None:
+        keep &= df["timestamp_ms"] < end_ms
+    return df[keep].copy()
+
+def read_range(folder: str, start_ms=None, end_ms=None, usecols=None) -> pd.DataFrame:
+    """Trades in [start_ms, end_ms), reading only the files that overlap it."""
+    if usecols is not None and "timestamp_ms" not in usecols:
+        usecols = [*usecols, "timestamp_ms"]
+    frames = [
+        clip_rows(read_trades(os.path.join(folder, f), usecols), start_ms, end_ms)
+        for f in files_in_range(folder, start_ms, end_ms)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=usecols or ["agg_id", "timestamp_ms", "price", "qty", "is_maker"])
+    return pd.concat(frames, ignore_index=True)
+
+def verify_manifest(folder: str) -> list:
+    """Files whose contents no longer match their recorded sha256."""
+    entries = load_manifest(folder)["files"]
+    return [
+        filename for filename, entry in sorted(entries.items())
+        if not os.path.exists(os.path.join(folder, filename)) or _sha256(os.path.join(folder, filename)) != entry["sha256"]
+    ]
+
+if __name__ == "__main__":
+    import sys
+
+    folder = sys.argv[1] if len(sys.argv) > 1 else "./data/trades/BNBBTC"
+    manifest = update_manifest(folder)
+    print(f"{len(manifest['files'])} files, latest trade at {latest_ms(folder)}")
+    mismatched = verify_manifest(folder)
+    if mismatched:
+        print("checksum mismatch:", mismatched)
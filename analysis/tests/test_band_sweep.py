@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import band_sweep
+import fluctuation_analysis as fa
+import synthetic
+from resample import rolling_ohlc
+
+CONFS = [0.6, 0.8, 0.9, 0.95]
+LAMBDAS = [0.85, 0.94]
+LOOK_BACKS = [1, 3, 8]
+
+@pytest.fixture(scope="module")
+def rolled():
+    base = synthetic.ohlcv_1m(600, seed=8, time_col="timestamp")
+    return rolling_ohlc(base, 5, time_col="timestamp").reset_index(drop=True)
+
+def brute_force(df, conf, lambda_, look_back, start):
+    """Bands of one config on the bars after `start`, as detect builds them."""
+    gk = fa.gk_variance(df).to_numpy()
+    sigma = fa.look_back_sigma(gk, look_back, lambda_)[start - look_back:]
+    z = fa.get_z_score(conf)
+    open_, high, low = (df[c].to_numpy()[start:] for c in ("open", "high", "low"))
+    upper, lower = open_ * np.exp(z * sigma), open_ * np.exp(-z * sigma)
+    return {
+        "coverage_high": (high <= upper).mean(),
+        "coverage_low": (low >= lower).mean(),
+        "full_coverage": ((high <= upper) & (low >= lower)).mean(),
+        "mean_width": (np.exp(z * sigma) - np.exp(-z * sigma)).mean(),
+    }
+
+def test_sweep_matches_brute_force(rolled):
+    results = band_sweep.sweep_bands(rolled, CONFS, LAMBDAS, LOOK_BACKS)
+    assert len(results) == len(CONFS) * len(LAMBDAS) * len(LOOK_BACKS)
+    for row in results.to_dict("records"):
+        expected = brute_force(rolled, row["conf"], row["lambda"], row["look_back"], max(LOOK_BACKS))
+        for name, value in expected.items():
+            assert row[name] == pytest.approx(value, rel=1e-9), (name, row)
+
+def test_sweep_scores_the_served_bands(rolled):
+    # with a single look_back both score the bars after it
+    results = band_sweep.sweep_bands(rolled, [0.8], [0.94], [8])
+    served = fa.detect(rolled, conf=0.8, look_backs=[8])["metrics"]
+    assert results["coverage_high"].iloc[0] == pytest.approx(served["coverage_high"], rel=1e-12)
+
+def brute_frontier(coverage, width):
+    return np.array([
+        not ((coverage >= c) & (width <= w) & ((coverage > c) | (width < w))).any()
+        for c, w in zip(coverage, width)
+    ])
+
+def test_pareto_frontier_matches_pairwise_dominance():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        results = pd.DataFrame({"full_coverage": rng.random(200), "mean_width": rng.random(200)})
+        expected = brute_frontier(results["full_coverage"].to_numpy(), results["mean_width"].to_numpy())
+        np.testing.assert_array_equal(band_sweep.pareto_frontier(results), expected)
+
+def test_pareto_frontier_keeps_one_of_identical_configs():
+    results = pd.DataFrame({"full_coverage": [0.5, 0.5, 0.9, 0.4], "mean_width": [0.1, 0.1, 0.3, 0.05]})
+    assert band_sweep.pareto_frontier(results).tolist() == [True, False, True, True]
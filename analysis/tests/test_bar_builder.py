@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import bar_builder as bb
+import synthetic
+from tape_binary import csv_to_binary
+
+@pytest.fixture(scope="module")
+def tape():
+    return synthetic.agg_trade_tape(20_000, start_price=600, trades_per_second=3)
+
+def reference_bars(tape, keys):
+    """The bars as a plain groupby over the whole tape."""
+    qty = tape["qty"].astype(np.float64)
+    frame = tape.assign(key=keys, quote=tape["price"] * qty, sell=np.where(tape["is_maker"], qty, 0.0))
+    grouped = frame.groupby("key", sort=True)
+    return pd.DataFrame({
+        "open": grouped["price"].first(),
+        "high": grouped["price"].max(),
+        "low": grouped["price"].min(),
+        "close": grouped["price"].last(),
+        "volume": grouped["qty"].sum(),
+        "quote_asset_volume": grouped["quote"].sum(),
+        "taker_sell_volume": grouped["sell"].sum(),
+        "trades": grouped.size(),
+        "close_time": grouped["timestamp_ms"].last(),
+    }).reset_index(drop=True)
+
+def assert_bars_equal(got, expected):
+    assert len(got) == len(expected)
+    for column in expected.columns:
+        np.testing.assert_allclose(got[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64), rtol=1e-9, err_msg=column)
+
+def feed_chunks(tape, kind, size, bounds):
+    builder = bb.BarBuilder(kind, size)
+    parts = [builder.feed(tape.iloc[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+    parts.append(builder.flush())
+    return pd.concat([p for p in parts if len(p)], ignore_index=True)
+
+@pytest.mark.parametrize("kind, size", [("time", 60_000), ("time", 15_000), ("tick", 100), ("tick", 7), ("volume", 25.0), ("volume", 0.5)])
+def test_chunked_bars_match_one_shot(tape, kind, size):
+    one_shot = feed_chunks(tape, kind, size, [0, len(tape)])
+    rng = np.random.default_rng(1)
+    # chunks of every size, one trade and empty ones included
+    bounds = np.unique(np.concatenate(([0, 5, 5, 6, len(tape)], rng.integers(0, len(tape), 60))))
+    chunked = feed_chunks(tape, kind, size, list(bounds))
+    pd.testing.assert_frame_equal(chunked.astype(np.float64), one_shot.astype(np.float64), check_exact=False, rtol=1e-12)
+
+def test_time_and_tick_bars_match_groupby(tape):
+    time = feed_chunks(tape, "time", 60_000, [0, len(tape)])
+    keys = tape["timestamp_ms"] // 60_000
+    assert_bars_equal(time.drop(columns=["timestamp", "vwap", "taker_buy_volume"]), reference_bars(tape, keys))
+    np.testing.assert_array_equal(time["timestamp"], np.unique(keys) * 60_000)
+
+    tick = feed_chunks(tape, "tick", 100, [0, len(tape)])
+    assert_bars_equal(tick.drop(columns=["timestamp", "vwap", "taker_buy_volume"]), reference_bars(tape, np.arange(len(tape)) // 100))
+
+def test_volume_bars_match_loop(tape):
+    size = 25.0
+    keys, bar, filled = [], 0, 0.0
+    for qty in tape["qty"]:
+        # a trade belongs to the bar open when it printed
+        keys.append(bar)
+        filled += qty
+        while filled >= size - 1e-9:
+            filled -= size
+            bar += 1
+    bars = feed_chunks(tape, "volume", size, [0, len(tape)])
+    assert_bars_equal(bars.drop(columns=["timestamp", "vwap", "taker_buy_volume"]), reference_bars(tape, np.array(keys)))
+
+def test_fill_time_gaps_adds_flat_bars():
+    tape = synthetic.agg_trade_tape(50, start_price=600, trades_per_second=0.01)
+    bars = bb.fill_time_gaps(feed_chunks(tape, "time", 60_000, [0, len(tape)]), 60_000)
+    np.testing.assert_array_equal(np.diff(bars["timestamp"]), 60_000)
+    empty = bars["trades"] == 0
+    assert empty.any() and (bars.loc[empty, "volume"] == 0).all()
+    previous_close = bars["close"].shift()
+    assert (bars.loc[empty, ["open", "high", "low", "close"]].eq(previous_close[empty], axis=0)).all().all()
+
+def test_time_bars_start_at_the_first_trade(tape, tmp_path):
+    folder = str(tmp_path / "csv")
+    synthetic.write_hour_files(tape, folder)
+    first = int(tape["timestamp_ms"].iloc[0])
+    bars = bb.build_bars(folder, "time", 60_000, first - 10 * 60_000, first + 30 * 60_000)
+    # no bar before the first trade, whose close would come from later trades
+    assert bars["timestamp"].iloc[0] == first // 60_000 * 60_000
+    assert bars["open"].iloc[0] == tape["price"].iloc[0]
+    assert bars["timestamp"].iloc[-1] == (first + 30 * 60_000 - 1) // 60_000 * 60_000
+
+@pytest.mark.parametrize("kind, size", [("time", 60_000), ("volume", 25.0), ("tick", 100)])
+def test_folder_and_binary_tape_give_the_same_bars(tape, tmp_path, kind, size):
+    folder = str(tmp_path / "csv")
+    synthetic.write_hour_files(tape, folder)
+    path = str(tmp_path / "x.tape")
+    csv_to_binary(folder, path)
+    start, end = int(tape["timestamp_ms"].iloc[1000]), int(tape["timestamp_ms"].iloc[-1000])
+    from_folder = bb.build_bars(folder, kind, size, start, end)
+    from_binary = bb.build_bars(path, kind, size, start, end)
+    pd.testing.assert_frame_equal(from_folder.astype(np.float64), from_binary.astype(np.float64), check_exact=False, rtol=1e-9)
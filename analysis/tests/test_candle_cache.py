@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+import candle_cache
+from candle_cache import CandleCache, last_closed_candle, next_candle_close
+
+MINUTE = 60_000
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A settable now_ms for the cache module."""
+    now = {"ms": 1_700_000_000_000 // MINUTE * MINUTE + 10_000}
+    monkeypatch.setattr(candle_cache, "now_ms", lambda: now["ms"])
+    return now
+
+def test_candle_boundaries():
+    at = 1_700_000_000_000 // MINUTE * MINUTE + 10_000
+    assert last_closed_candle("1m", at) == at - 10_000 - MINUTE
+    assert next_candle_close("1m", at) == at - 10_000 + MINUTE
+    assert next_candle_close("5m", at) % (5 * MINUTE) == 0
+
+def test_single_flight():
+    cache = CandleCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    started.wait(5)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(calls) == 1 and len(results) == 8
+    assert all(result is results[0] for result in results)
+    assert cache.misses == 1
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = CandleCache()
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("binance down")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_compute("k", fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(errors) == 4 and len(cache) == 0
+    assert cache.get_or_compute("k", lambda: 1) == 1
+
+def test_entry_expires_when_the_next_candle_closes(clock):
+    cache = CandleCache("1m")
+    values = iter(range(100))
+    assert cache.get_or_compute("k", lambda: next(values)) == 0
+    close = next_candle_close("1m", clock["ms"])
+    clock["ms"] = close - 1
+    assert cache.get_or_compute("k", lambda: next(values)) == 0
+    clock["ms"] = close
+    assert cache.get_or_compute("k", lambda: next(values)) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # a 5m entry outlives the 1m closes before its own
+    assert cache.get_or_compute("h", lambda: next(values), interval="5m") == 2
+    clock["ms"] = next_candle_close("5m", clock["ms"]) - 1
+    assert cache.get_or_compute("h", lambda: next(values), interval="5m") == 2
+
+def test_lru_eviction(clock):
+    cache = CandleCache(max_entries=3)
+    for key in "abc":
+        cache.get_or_compute(key, lambda: key)
+    cache.get_or_compute("a", lambda: "recomputed")  # a is now the most recent
+    cache.get_or_compute("d", lambda: "d")
+    assert len(cache) == 3
+    assert cache.get_or_compute("a", lambda: "recomputed") == "a"
+    assert cache.get_or_compute("b", lambda: "recomputed") == "recomputed"
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+import binance_price_volumn
+import cli
+
+def test_profile_passes_the_window_by_name(monkeypatch, tmp_path):
+    calls = {}
+
+    def record(name):
+        def fn(folder, output, *args, **kwargs):
+            calls[name] = (args, kwargs)
+        return fn
+
+    monkeypatch.setattr(binance_price_volumn, "aggregate_volume_by_price", record("volume"))
+    monkeypatch.setattr(binance_price_volumn, "calculate_price_duration", record("duration"))
+    monkeypatch.chdir(tmp_path)
+    cli.main(["profile", str(tmp_path), "--start-ms", "100", "--end-ms", "200"])
+    for name in ("volume", "duration"):
+        assert calls[name] == ((), {"start_ms": 100, "end_ms": 200})
+
+def test_fetch_path_does_not_import_pandas():
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for module in ("cli", "binance_agg_trade"):
+        code = f"import sys, {module}; sys.exit('pandas' in sys.modules)"
+        assert subprocess.run([sys.executable, "-c", code], cwd=here).returncode == 0, module
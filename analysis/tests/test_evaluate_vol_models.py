@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import fluctuation_analysis as fa
+import synthetic
+
+def one_model(upper, lower, open_, high, low):
+    """evaluate_vol_model on the bars one config predicts (its non-NaN bands)."""
+    valid = ~(np.isnan(upper) | np.isnan(lower))
+    df = pd.DataFrame({"upper_band": upper, "lower_band": lower, "open": open_, "high": high, "low": low})[valid]
+    return fa.evaluate_vol_model(df.reset_index(drop=True))
+
+@pytest.fixture(scope="module")
+def bands():
+    df = synthetic.ohlcv_1m(400, seed=6)
+    rng = np.random.default_rng(6)
+    open_, high, low = (df[c].to_numpy() for c in ("open", "high", "low"))
+    width = rng.uniform(0.0002, 0.004, size=(12, 1))
+    upper = open_ * np.exp(width + rng.normal(0, 0.0005, size=(12, len(df))))
+    lower = open_ * np.exp(-width + rng.normal(0, 0.0005, size=(12, len(df))))
+    # warm-up NaNs of different lengths, as the look-back sweep has
+    for i in range(12):
+        upper[i, :i * 3] = lower[i, :i * 3] = np.nan
+    # flat bars make 0 / 0 range efficiency, bands inside the bar make it negative
+    high[10:13] = low[10:13] = open_[10:13]
+    upper[0, 20:25] = lower[0, 20:25] = open_[20:25]
+    return upper, lower, open_, high, low
+
+def test_matches_evaluate_vol_model_per_config(bands):
+    upper, lower, open_, high, low = bands
+    metrics = fa.evaluate_vol_models(upper, lower, open_, high, low)
+    for i in range(len(upper)):
+        expected = one_model(upper[i], lower[i], open_, high, low)
+        got = fa.model_metrics(metrics, i)
+        assert set(got) == set(expected)
+        for name, value in expected.items():
+            np.testing.assert_allclose(got[name], value, rtol=1e-12, err_msg=f"{name} config {i}")
+
+def test_per_config_realized_prices(bands):
+    upper, lower, open_, high, low = bands
+    tiled = [np.tile(a, (len(upper), 1)) for a in (open_, high, low)]
+    one_row = fa.evaluate_vol_models(upper, lower, open_, high, low)
+    per_config = fa.evaluate_vol_models(upper, lower, *tiled)
+    for name in one_row:
+        np.testing.assert_array_equal(per_config[name], one_row[name])
+
+def test_config_without_predictions_is_nan(bands):
+    upper, lower, open_, high, low = bands
+    empty = np.full(len(open_), np.nan)
+    metrics = fa.evaluate_vol_models(np.vstack([upper[0], empty]), np.vstack([lower[0], empty]), open_, high, low)
+    assert np.isnan(metrics["coverage_high"][1]) and metrics["num_upper_breach"][1] == 0
+    assert not np.isnan(metrics["coverage_high"][0])
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import fluctuation_analysis as fa
+import synthetic
+from resample import rolling_ohlc
+
+def rolled(rows=160, window=5, seed=0):
+    base = synthetic.ohlcv_1m(rows, seed=seed, time_col="timestamp")
+    return rolling_ohlc(base, window, time_col="timestamp").reset_index(drop=True)
+
+def loop_detect(df, decay=0.94, conf=0.8, look_backs=fa.LOOK_BACKS):
+    """run_detection's per-look-back, per-row loop, keeping the best look-back's metrics."""
+    df = df.sort_values("timestamp").reset_index(drop=True)
+    best_look_back, best_metrics, mean_tick = 1, {"coverage_high": 0}, None
+    for look_back in look_backs:
+        records = []
+        for i in range(look_back, len(df)):
+            lower, higher = fa.gk_ewma_volatility(df[i - look_back:i], lambda_=decay, conf_level=conf)
+            row = {"lower_range": lower, "higher_range": higher}
+            next_row = df.iloc[i]
+            fa.evaluation(row, next_row["open"], next_row["high"], next_row["low"], lower, higher)
+            records.append(row)
+        summary = pd.DataFrame(records)
+        metrics = fa.evaluate_vol_model(summary)
+        if metrics["coverage_high"] > best_metrics["coverage_high"]:
+            best_look_back, best_metrics = look_back, metrics
+            mean_tick = summary["higher_range"].mean() - 1
+    return {"metrics": best_metrics, "duration": best_look_back, "range": mean_tick}
+
+def assert_metrics_close(got, expected):
+    assert set(got) == set(expected)
+    for name, value in expected.items():
+        np.testing.assert_allclose(got[name], value, rtol=1e-9, err_msg=name)
+
+@pytest.mark.parametrize("look_back", [1, 2, 7, 14])
+def test_look_back_sigma_matches_windowed_ewma(look_back):
+    df = rolled()
+    gk = fa.gk_variance(df)
+    sigma = fa.look_back_sigma(gk.to_numpy(), look_back, 0.9)
+    expected = [np.sqrt(gk[k:k + look_back].ewm(alpha=0.1, adjust=False).mean().iloc[-1]) for k in range(len(df) - look_back)]
+    np.testing.assert_allclose(sigma, expected, rtol=1e-12)
+
+@pytest.mark.parametrize("seed, conf", [(0, 0.8), (1, 0.95), (2, 0.9)])
+def test_detect_matches_the_look_back_loop(seed, conf):
+    df = rolled(seed=seed)
+    got = fa.detect(df, conf=conf)
+    expected = loop_detect(df, conf=conf)
+    assert got["duration"] == expected["duration"]
+    assert got["range"] == pytest.approx(expected["range"], rel=1e-12)
+    assert_metrics_close(got["metrics"], expected["metrics"])
+
+def test_detect_horizons_rolls_each_horizon_from_one_base():
+    base = synthetic.ohlcv_1m(400, seed=4, time_col="timestamp")
+    results = fa.detect_horizons(base, ["5m", "15m"], look_backs=range(1, 6))
+    for horizon, window in (("5m", 5), ("15m", 15)):
+        df = rolling_ohlc(base, window, time_col="timestamp").reset_index(drop=True)
+        expected = fa.detect(df, look_backs=range(1, 6))
+        assert results[horizon]["duration"] == expected["duration"]
+        assert_metrics_close(results[horizon]["metrics"], expected["metrics"])
+
+def test_horizon_windows():
+    assert fa.horizon_window("1h") == 60 and fa.horizon_window("2d", "1h") == 48
+    for bad in ("0m", "5x", "m", "-5m"):
+        with pytest.raises(ValueError):
+            fa.horizon_minutes(bad)
+    with pytest.raises(ValueError):
+        fa.horizon_window("7m", "5m")
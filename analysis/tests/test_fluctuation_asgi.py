@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+import fluctuation_asgi
+import synthetic
+from candle_cache import CandleCache
+
+def request(method, path, query="", body=b""):
+    """Runs one request through the ASGI app; returns (status, headers, body)."""
+    async def run():
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "method": method, "path": path, "query_string": query.encode()}
+        await fluctuation_asgi.app(scope, receive, send)
+        return messages
+
+    start, payload = asyncio.run(run())
+    return start["status"], dict(start["headers"]), payload["body"]
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Serves synthetic base candles instead of Binance klines and records each fetch."""
+    calls = []
+
+    def fetch(symbol, horizons, hours, interval):
+        calls.append(symbol)
+        return synthetic.ohlcv_1m(300, time_col="timestamp")
+
+    monkeypatch.setattr(fluctuation_asgi, "fetch_base_candles", fetch)
+    monkeypatch.setattr(fluctuation_asgi, "cache", CandleCache("1m"))
+    return calls
+
+def test_calculate_is_cached(fetches):
+    status, headers, body = request("GET", "/calculate", "horizon=5m&look_back_max=4")
+    assert status == 200 and headers[b"content-type"] == b"application/json"
+    result = json.loads(body)
+    assert 1 <= result["duration"] <= 4 and "coverage_high" in result["metrics"]
+    assert request("GET", "/calculate", "horizon=5m&look_back_max=4")[2] == body
+    assert fetches == ["BNBBTC"]
+
+def test_horizons_route_keys_by_horizon(fetches):
+    status, _, body = request("GET", "/calculate/horizons", "horizons=5m,15m&look_back_max=3")
+    assert status == 200 and set(json.loads(body)) == {"5m", "15m"}
+    status, _, body = request("GET", "/calculate/horizons", "horizons=5m&look_back_max=3")
+    assert set(json.loads(body)) == {"5m"}
+
+def test_batch_reports_bad_entries_in_place(fetches):
+    entries = [{"look_back_max": 3}, {"conf": 2}, {"look_back_max": 3, "symbol": "bnbbtc"}]
+    status, _, body = request("POST", "/calculate/batch", body=json.dumps(entries).encode())
+    first, bad, same = json.loads(body)
+    assert status == 200 and "result" in first and "conf" in bad["error"]
+    assert same["result"] == first["result"] and fetches == ["BNBBTC"]
+    assert request("POST", "/calculate/batch", body=b"{}")[0] == 400
+
+def test_errors_and_metrics(fetches):
+    assert request("GET", "/calculate", "decay=1.5")[0] == 400
+    assert request("GET", "/calculate", "horizon=9999d")[0] == 400
+    assert request("GET", "/nowhere")[0] == 404
+    status, headers, body = request("GET", "/metrics")
+    assert status == 200 and b"fluctuation_request_seconds" in body
+    assert fetches == []
+
+def test_get_or_compute_async_single_flight():
+    cache = CandleCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return object()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute_async("k", compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1 and all(result is results[0] for result in results)
+    # a cached entry is shared with sync callers
+    assert cache.get_or_compute("k", lambda: None) is results[0]
+
+def test_get_or_compute_async_failure_is_not_cached():
+    cache = CandleCache()
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("binance down")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_compute_async("k", fail) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+    assert len(cache) == 0
+
+    async def ok():
+        return 1
+
+    assert asyncio.run(cache.get_or_compute_async("k", ok)) == 1
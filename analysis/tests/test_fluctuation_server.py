@@ -0,0 +1,46 @@
+import pytest
+
+from fluctuation_server import DEFAULT_PARAMS, MAX_HORIZONS, MAX_HOURS, MAX_LOOK_BACK, app, parse_params
+
+def test_defaults_are_valid():
+    assert parse_params({}) == DEFAULT_PARAMS
+
+def test_limits_are_inclusive():
+    params = parse_params({"hours": str(MAX_HOURS), "look_back_max": str(MAX_LOOK_BACK)})
+    assert params["hours"] == MAX_HOURS and params["look_back_max"] == MAX_LOOK_BACK
+    longest = f"{int(MAX_HOURS * 60)}m"
+    assert parse_params({"horizon": ",".join([longest] * MAX_HORIZONS)})["horizon"].startswith(longest)
+
+@pytest.mark.parametrize("args", [
+    {"hours": str(MAX_HOURS + 1)},
+    {"hours": "1e9"},
+    {"hours": "nan"},
+    {"hours": "0"},
+    {"look_back_max": str(MAX_LOOK_BACK + 1)},
+    {"look_back_min": "5", "look_back_max": "4"},
+    {"horizon": "9999d"},
+    {"horizon": f"{int(MAX_HOURS * 60) + 1}m"},
+    {"horizon": ",".join(["5m"] * (MAX_HORIZONS + 1))},
+])
+def test_out_of_range_is_rejected(args):
+    with pytest.raises(ValueError):
+        parse_params(args)
+
+def test_calculate_rejects_a_long_window_before_fetching():
+    response = app.test_client().get("/calculate", query_string={"hours": MAX_HOURS * 10})
+    assert response.status_code == 400
+    assert "hours" in response.get_json()["error"]
+
+def test_batch_rejects_a_long_horizon_per_entry(monkeypatch):
+    import fluctuation_server
+
+    monkeypatch.setattr(fluctuation_server, "compute", lambda params: {"horizon": params["horizon"]})
+    response = app.test_client().post("/calculate/batch", json=[{"horizon": "9999d"}, {"horizon": "5m"}])
+    assert response.status_code == 200
+    first, second = response.get_json()
+    assert "horizon" in first["error"] and second["result"] == {"horizon": "5m"}
+
+def test_horizons_route_rejects_too_many_horizons():
+    horizons = ",".join(f"{m}m" for m in range(1, MAX_HORIZONS + 2))
+    response = app.test_client().get("/calculate/horizons", query_string={"horizons": horizons})
+    assert response.status_code == 400
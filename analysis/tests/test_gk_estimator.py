@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+import synthetic
+from fluctuation_analysis import gk_ewma_volatility, gk_variance
+from gk_estimator import OnlineGKEWMA
+
+@pytest.fixture(scope="module")
+def candles():
+    return synthetic.ohlcv_1m(500, seed=2, time_col="timestamp")
+
+@pytest.mark.parametrize("lambda_", [0.5, 0.94, 0.99])
+def test_online_matches_pandas_ewm(candles, lambda_):
+    estimator = OnlineGKEWMA(lambda_)
+    sigmas = [estimator.update(*row) for row in candles[["timestamp", "open", "high", "low", "close"]].itertuples(index=False)]
+    expected = np.sqrt(gk_variance(candles).ewm(alpha=1 - lambda_, adjust=False).mean())
+    np.testing.assert_allclose(sigmas, expected, rtol=1e-12)
+    np.testing.assert_allclose(estimator.bands(0.8), gk_ewma_volatility(candles, lambda_, 0.8), rtol=1e-12)
+
+def test_warm_start_then_updates_match_online(candles):
+    online = OnlineGKEWMA()
+    online.update_frame(candles)
+    warm = OnlineGKEWMA.from_frame(candles.iloc[:300])
+    warm.update_frame(candles.iloc[300:])
+    assert warm.sigma == pytest.approx(online.sigma, rel=1e-12)
+    assert warm.count == online.count == len(candles)
+    assert warm.last_bar == online.last_bar
+
+def test_replayed_bars_are_ignored(candles):
+    estimator = OnlineGKEWMA()
+    estimator.update_frame(candles.iloc[:100])
+    sigma = estimator.sigma
+    estimator.update_frame(candles.iloc[50:100])
+    assert estimator.sigma == sigma and estimator.count == 100
+
+def test_negative_variance_is_clipped_or_flipped():
+    # only a bar whose body is longer than its range (bad data) gives a negative GK variance
+    args = (0, 100.0, 101.0, 100.0, 110.0)
+    assert OnlineGKEWMA(negative="clip").update(*args) == 0
+    assert OnlineGKEWMA(negative="abs").update(*args) > 0
+
+def test_snapshot_round_trip(candles, tmp_path):
+    estimator = OnlineGKEWMA(0.9, negative="clip")
+    estimator.update_frame(candles.iloc[:200])
+    path = str(tmp_path / "state.json")
+    estimator.save(path)
+    restored = OnlineGKEWMA.load(path)
+    assert restored.to_dict() == estimator.to_dict()
+
+    # both go on exactly alike after the restore
+    for est in (estimator, restored):
+        est.update_frame(candles.iloc[150:])
+    assert restored.sigma == estimator.sigma and restored.count == estimator.count
+    lower, upper = restored.price_bands(0.8)
+    assert lower < restored.last_bar["close"] < upper
+    assert math.isnan(OnlineGKEWMA().sigma)
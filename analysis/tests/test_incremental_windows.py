@@ -0,0 +1,53 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from resample import rolling_ohlc
+
+windows2 = importlib.import_module("3_windows2")
+
+def batch_latest(df):
+    """The last row of run's VAR_WINDOWS sums, ratios and vol_5, computed over the whole frame."""
+    gk = windows2.gk_variance(df)
+    values = {name: gk.shift(offset).rolling(window).sum().iloc[-1] for name, (window, offset) in windows2.VAR_WINDOWS.items()}
+    values["ratio_5v30"] = values["var_5"] / values["var_30"]
+    values["ratio_5v60"] = values["var_5"] / values["var_60"]
+    values["vol_5"] = windows2.gk_ewma_volatility(rolling_ohlc(df, 5)).iloc[-1] - 1
+    values["close"] = df["close"].iloc[-1]
+    return values
+
+def assert_latest_matches(state, df):
+    latest, expected = state.latest(), batch_latest(df)
+    assert latest["timestamp"] == df["timestamp_ms"].iloc[-1]
+    for name, value in expected.items():
+        np.testing.assert_allclose(latest[name], value, rtol=1e-9, err_msg=name)
+
+@pytest.fixture(scope="module")
+def candles():
+    return synthetic.ohlcv_1m(400, seed=12)
+
+def test_appending_matches_the_batch_windows(candles):
+    state = windows2.IncrementalWindows(candles.iloc[:150])
+    assert_latest_matches(state, candles.iloc[:150])
+    start = 150
+    for size in (1, 1, 7, 40, 1, 100, 100):
+        chunk = candles.iloc[start:start + size]
+        assert state.append(chunk) == len(chunk)
+        start += size
+        assert_latest_matches(state, candles.iloc[:start])
+    pd.testing.assert_frame_equal(state.df, candles.iloc[:start].reset_index(drop=True))
+
+def test_overlapping_fetches_only_add_new_candles(candles):
+    state = windows2.IncrementalWindows(candles.iloc[:200])
+    assert state.append(candles.iloc[150:200]) == 0
+    assert state.append(candles.iloc[190:210]) == 10
+    assert_latest_matches(state, candles.iloc[:210])
+
+def test_short_history_warms_up(candles):
+    state = windows2.IncrementalWindows(candles.iloc[:20])
+    assert np.isnan(state.latest()["var_60"])
+    state.append(candles.iloc[20:100])
+    assert_latest_matches(state, candles.iloc[:100])
@@ -0,0 +1,15 @@
+import socket
+
+import load_test
+
+def test_down_server_backs_off_and_counts_errors():
+    # a port nothing listens on
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    result = load_test.run_load_test(f"http://127.0.0.1:{port}/calculate", concurrency=2, duration=0.5)
+    assert result["requests"] == 0
+    # 0.05 + 0.1 + 0.2 s of backoff fit in half a second, so a handful of tries per poller
+    assert 2 <= result["errors"] <= 12
+    assert result["error_kinds"] == {"ConnectionError": result["errors"]}
+    assert result["p50_ms"] is None
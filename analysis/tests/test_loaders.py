@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import binance_price_candle
+import synthetic
+from loaders import KLINE_DTYPES, TRADE_DTYPES, memory_report, read_trades, typed_klines, typed_trades
+
+@pytest.fixture(scope="module")
+def hour_file(tmp_path_factory):
+    tape = synthetic.agg_trade_tape(2000, trades_per_second=1.0)
+    path = synthetic.write_hour_files(tape, str(tmp_path_factory.mktemp("trades")))[0]
+    return tape, path
+
+def test_read_trades_dtypes_and_values(hour_file):
+    tape, path = hour_file
+    df = read_trades(path)
+    assert list(df.columns) == list(TRADE_DTYPES)
+    assert dict(df.dtypes) == {c: np.dtype(d) for c, d in TRADE_DTYPES.items()}
+    expected = tape.iloc[:len(df)]
+    np.testing.assert_array_equal(df["agg_id"], expected["agg_id"])
+    np.testing.assert_array_equal(df["timestamp_ms"], expected["timestamp_ms"])
+    np.testing.assert_array_equal(df["is_maker"], expected["is_maker"])
+    # prices keep every tick; float32 would not
+    np.testing.assert_array_equal(df["price"], expected["price"].round(8))
+    assert not np.array_equal(df["price"].astype(np.float32).astype(np.float64), df["price"])
+    np.testing.assert_allclose(df["qty"], expected["qty"], rtol=1e-6)
+
+def test_read_trades_projects_columns_in_the_given_order(hour_file):
+    _, path = hour_file
+    df = read_trades(path, ["price", "timestamp_ms"])
+    assert list(df.columns) == ["price", "timestamp_ms"]
+    assert df.dtypes.tolist() == [np.float64, np.int64]
+
+def test_read_trades_dtype_override(hour_file):
+    tape, path = hour_file
+    df = read_trades(path, ["timestamp_ms", "qty"], {"qty": np.float64})
+    assert df["qty"].dtype == np.float64
+    np.testing.assert_array_equal(df["qty"], tape["qty"].iloc[:len(df)])
+
+def test_typed_trades_parses_strings():
+    raw = pd.DataFrame({
+        "agg_id": ["1", "2"], "timestamp_ms": ["1700000000000", "1700000000500"],
+        "price": ["0.00951230", "0.00951240"], "qty": ["1.5", "0.25"], "is_maker": ["True", "false"],
+    })
+    df = typed_trades(raw)
+    assert dict(df.dtypes) == {c: np.dtype(d) for c, d in TRADE_DTYPES.items()}
+    assert df["is_maker"].tolist() == [True, False]
+    assert df["price"].tolist() == [0.0095123, 0.0095124]
+
+def test_typed_frame_skips_missing_and_keeps_other_columns():
+    df = typed_klines(pd.DataFrame({"timestamp": [1, 2], "close": ["1.5", "2.5"], "note": ["a", "b"]}))
+    assert list(df.columns) == ["timestamp", "close", "note"]
+    assert df["close"].dtype == np.float64 and df["note"].dtype == object
+
+def test_memory_report():
+    assert memory_report(pd.DataFrame({"x": np.zeros(4, dtype=np.int64)}))["bytes_per_row"] >= 8
+    assert np.isnan(memory_report(pd.DataFrame({"x": []}))["bytes_per_row"])
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+def kline(open_ms):
+    # /klines row: open time, o, h, l, c, volume, close time, quote volume, trades, taker base, taker quote, ignore
+    return [open_ms, "100.5", "101.25", "99.75", "100.125", "12.5", open_ms + 59999, "1250.75", 42, "6.0", "600.0", "0"]
+
+def test_klines_payload_column_mapping(monkeypatch):
+    monkeypatch.setattr(binance_price_candle.requests, "get", lambda url, params: Response([kline(0), kline(60000)]))
+    df = binance_price_candle.get_recent_24h_klines_dataframe(0, 120000, 2, "1m")
+    assert list(df.columns) == binance_price_candle.KLINE_COLUMNS == list(KLINE_DTYPES)
+    assert dict(df.dtypes) == {c: np.dtype(d) for c, d in KLINE_DTYPES.items()}
+    assert df["timestamp"].tolist() == [0, 60000]
+    assert df.iloc[0][["open", "high", "low", "close", "volume", "quote_asset_volume"]].tolist() == [100.5, 101.25, 99.75, 100.125, 12.5, 1250.75]
+
+def test_empty_klines_frame_is_typed(monkeypatch):
+    monkeypatch.setattr(binance_price_candle.requests, "get", lambda url, params: Response([]))
+    df = binance_price_candle.get_klines_dataframe(0, 120000, "1m")
+    assert df.empty
+    assert dict(df.dtypes) == {c: np.dtype(d) for c, d in KLINE_DTYPES.items()}
@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pytest
+
+import lp_backtest as lb
+import synthetic
+
+def loop_backtest(steps, config, fee_rate=0.0005, capital=1000.0, pool_tvl=1e7, cost=0.0005):
+    """Step-by-step reference for one config."""
+    price = steps["price"].to_numpy()
+    times = steps["timestamp_ms"].to_numpy()
+    qty = steps["qty"].to_numpy()
+    base = 1.0001
+
+    def tick(x):
+        return math.floor(math.log(x) / math.log(base))
+
+    def around(t):
+        width, spacing = config["width"], config["tick_spacing"]
+        return (t - width) // spacing * spacing, -(-(t + width + 1) // spacing) * spacing
+
+    def value(x, lo, hi):
+        sa, sb = base ** (lo / 2), base ** (hi / 2)
+        sp = min(max(math.sqrt(x), sa), sb)
+        return (1 / sp - 1 / sb) * x + (sp - sa)
+
+    pool_liquidity = pool_tvl / (2 * math.sqrt(price[0]))
+    lo, hi = around(tick(price[0]))
+    liquidity = capital / value(price[0], lo, hi)
+    sa, sb = base ** (lo / 2), base ** (hi / 2)
+    sp = min(max(math.sqrt(price[0]), sa), sb)
+    amount0, amount1 = liquidity * (1 / sp - 1 / sb), liquidity * (sp - sa)
+    fees = rebalances = in_range = total = 0
+    next_period = times[0] + config["period_ms"]
+    for i in range(1, len(price)):
+        t = tick(price[i])
+        if lo <= t < hi:
+            fees += fee_rate * qty[i] * price[i] * liquidity / (liquidity + pool_liquidity)
+        step = times[i] - times[i - 1]
+        total += step
+        if lo <= tick(price[i - 1]) < hi:
+            in_range += step
+        rebalance = (config["rebalance"] == "exit" and not lo <= t < hi) or (config["rebalance"] == "period" and times[i] >= next_period)
+        if config["rebalance"] == "period":
+            while next_period <= times[i]:
+                next_period += config["period_ms"]
+        if rebalance and i < len(price) - 1:
+            worth = liquidity * value(price[i], lo, hi) * (1 - cost)
+            lo, hi = around(t)
+            liquidity = worth / value(price[i], lo, hi)
+            rebalances += 1
+    return {
+        "fees": fees,
+        "lp_value": liquidity * value(price[-1], lo, hi),
+        "hold_value": amount0 * price[-1] + amount1,
+        "rebalances": rebalances,
+        "time_in_range": in_range / total,
+    }
+
+@pytest.mark.parametrize("steps", [
+    lb.tape_steps(synthetic.agg_trade_tape(5000, start_price=600)),
+    lb.candle_steps(synthetic.ohlcv_1m(1500), "timestamp_ms"),
+], ids=["tape", "candles"])
+def test_matches_loop(steps):
+    configs = lb.lp_configs((5, 30, 100), (1, 10, 60), ("none", "exit", "period"), 600_000)
+    results = lb.backtest(steps, configs)
+    for i, config in enumerate(configs.to_dict("records")):
+        for column, expected in loop_backtest(steps, config).items():
+            assert results.loc[i, column] == pytest.approx(expected, rel=1e-9, abs=1e-12), (config, column)
+
+@pytest.mark.parametrize("n", [2, 3, 17, 33])
+def test_exit_rule_ends_on_short_tape(n):
+    steps = lb.tape_steps(synthetic.agg_trade_tape(n, start_price=600))
+    # width 1 breaches on almost every step
+    results = lb.backtest(steps, lb.lp_configs((1, 10), (1,), ("exit",)))
+    assert len(results) == 2
+    assert (results["rebalances"] <= n - 2).all()
+
+def test_exit_opens_advance():
+    ticks = np.array([0, 50, 0, 50, 0, 50, 0], dtype=np.int64)
+    config = {"rebalance": "exit", "width": 1, "tick_spacing": 1, "period_ms": 0}
+    opens = lb.rebalance_opens(ticks, np.arange(len(ticks)), config, lb.BlockExtremes(ticks.astype(np.float64)))
+    assert (np.diff(opens) > 0).all()
+    np.testing.assert_array_equal(opens, np.arange(len(ticks)))
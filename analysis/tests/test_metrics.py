@@ -0,0 +1,25 @@
+import threading
+
+from metrics import Registry
+
+def test_render_waits_for_the_lock():
+    registry = Registry()
+    registry.counter("rows_total", "rows", labels=("stage",)).inc(stage="fetch")
+    registry.histogram("stage_seconds", "seconds", labels=("stage",)).observe(0.01, stage="fetch")
+    for render in (registry.render, registry.snapshot):
+        done = threading.Event()
+        with registry._lock:
+            threading.Thread(target=lambda: (render(), done.set())).start()
+            assert not done.wait(0.1)
+        assert done.wait(5)
+
+def test_render_and_snapshot_are_copies():
+    registry = Registry()
+    histogram = registry.histogram("stage_seconds", "seconds", labels=("stage",), buckets=(0.1, 1.0))
+    histogram.observe(0.5, stage="fetch")
+    snapshot = registry.snapshot()
+    histogram.observe(0.5, stage="fetch")
+    assert snapshot["stage_seconds"][("fetch",)] == [[0, 1, 0], 0.5, 1]
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="fetch",le="1.0"} 2' in text
+    assert 'stage_seconds_count{stage="fetch"} 2' in text
@@ -0,0 +1,51 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import fluctuation_analysis
+import profiling
+
+@pytest.fixture
+def enabled(tmp_path):
+    profiling.reset()
+    profiling.enable(str(tmp_path))
+    yield str(tmp_path)
+    profiling.disable()
+    profiling.reset()
+
+@profiling.profiled
+def allocate(megabytes):
+    return np.ones(megabytes * 2 ** 20, dtype=np.uint8).sum()
+
+@profiling.profiled(name="test.outer")
+def outer():
+    time.sleep(0.02)
+    # the inner peak happens before outer's own allocations and still counts for it
+    return allocate(8) + allocate(1)
+
+def test_hooks_are_no_ops_while_disabled():
+    profiling.reset()
+    assert not profiling.is_enabled()
+    assert outer() == 9 * 2 ** 20
+    assert profiling.stats() == {}
+
+def test_records_calls_time_and_peak_memory(enabled):
+    for _ in range(2):
+        outer()
+    stats = profiling.stats()
+    inner = stats[f"{__name__}.allocate"]
+    assert stats["test.outer"]["calls"] == 2 and inner["calls"] == 4
+    assert stats["test.outer"]["wall_s"] >= 0.04
+    assert inner["peak_bytes"] >= 8 * 2 ** 20
+    assert stats["test.outer"]["peak_bytes"] >= 8 * 2 ** 20
+
+def test_pstats_only_for_the_outermost_call(enabled):
+    outer()
+    dumped = os.listdir(enabled)
+    assert len(dumped) == 1 and dumped[0].startswith("test.outer-")
+
+def test_pipelines_register_their_hooks():
+    assert profiling.REGISTRY["fluctuation_analysis.detect_horizons"] is fluctuation_analysis.detect_horizons
+    assert "test.outer" in profiling.REGISTRY
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from range_simulation import BlockExtremes, simulate_ranges
+
+def loop_results(close, vol):
+    """The iterrows loop of 3_windows2.run, over plain arrays."""
+    result, slots = [], []
+    opened = False
+    for price, width in zip(close, vol):
+        if not opened:
+            lower, upper = price * (1 - width), price * (1 + width)
+            slot = 0
+            opened = True
+            result.append(0)
+            continue
+        if price > upper or price < lower:
+            result.append(-1)
+            slots.append(slot)
+            opened = False
+        else:
+            slot += 1
+            result.append(1)
+    return np.array(result, dtype=np.int8), np.array(slots)
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    vol = rng.uniform(0.0005, 0.02, n)
+    return close, vol
+
+@pytest.mark.parametrize("n", [1, 2, 15, 16, 17, 100, 333, 1001])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_loop(n, seed):
+    close, vol = random_walk(n, seed)
+    out = simulate_ranges(close, vol, multipliers=(1.0,), near=4, block=16)
+    expected, slots = loop_results(close, vol)
+    np.testing.assert_array_equal(out["results"][0], expected)
+    np.testing.assert_array_equal(out["in_range_slots"][0], slots)
+
+def test_matches_loop_per_multiplier():
+    close, vol = random_walk(517, 7)
+    multipliers = (0.5, 1.0, 3.0, 10.0)
+    out = simulate_ranges(close, vol, multipliers=multipliers, near=2, block=8)
+    for i, multiplier in enumerate(multipliers):
+        np.testing.assert_array_equal(out["results"][i], loop_results(close, vol * multiplier)[0])
+
+def test_first_breach_in_partial_last_block():
+    # 20 closes in blocks of 16: a breach early in the partial second block
+    # must not be returned for a search that starts after it
+    close = np.full(20, 100.0)
+    close[16] = 200.0
+    extremes = BlockExtremes(close, block=16)
+    for after in range(17, 21):
+        assert extremes.first_breach(after, 99.0, 101.0) == 20
+    close[18] = 50.0
+    extremes = BlockExtremes(close, block=16)
+    assert extremes.first_breach(17, 99.0, 101.0) == 18
+
+def test_first_breach_never_before_after():
+    close, _ = random_walk(203, 3)
+    extremes = BlockExtremes(close, block=16)
+    for after in range(len(close) + 1):
+        breach = extremes.first_breach(after, close.min() + 1, close.max() - 1)
+        outside = np.flatnonzero((close[after:] > close.max() - 1) | (close[after:] < close.min() + 1))
+        assert breach == (after + outside[0] if len(outside) else len(close))
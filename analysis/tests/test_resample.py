@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from resample import _rolling_ohlc_apply, rolling_max, rolling_min, rolling_ohlc, tumbling_ohlc
+
+WINDOWS = [1, 2, 3, 5, 12, 60, 199, 200]
+
+@pytest.fixture(scope="module")
+def candles():
+    return synthetic.ohlcv_1m(200, seed=3)
+
+def shifted_apply(df, window):
+    """The shift(1) variant 3_windows.py had before."""
+    return pd.DataFrame({
+        "timestamp_ms": df["timestamp_ms"].shift(1).rolling(window).min(),
+        "open": df["open"].shift(1).rolling(window).apply(lambda x: x[0], raw=True),
+        "high": df["high"].shift(1).rolling(window).max(),
+        "low": df["low"].shift(1).rolling(window).min(),
+        "close": df["close"].shift(1).rolling(window).apply(lambda x: x[-1], raw=True),
+    }).dropna()
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_rolling_ohlc_matches_rolling_apply(candles, window):
+    pd.testing.assert_frame_equal(rolling_ohlc(candles, window), _rolling_ohlc_apply(candles, window), check_dtype=False)
+    pd.testing.assert_frame_equal(rolling_ohlc(candles, window, shift=1), shifted_apply(candles, window), check_dtype=False)
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_rolling_max_min_match_pandas(candles, window):
+    values = candles["high"].to_numpy()
+    np.testing.assert_array_equal(rolling_max(values, window), candles["high"].rolling(window).max())
+    np.testing.assert_array_equal(rolling_min(values, window), candles["high"].rolling(window).min())
+
+def test_rolling_volume_and_gaps(candles):
+    df = candles.copy()
+    df.loc[50, "volume"] = np.nan
+    # kline frames hold prices as strings
+    df["close"] = df["close"].astype(str)
+    rolled = rolling_ohlc(df, 5, volume_col="volume")
+    expected = df["volume"].rolling(5).sum().dropna()
+    pd.testing.assert_series_equal(rolled["volume"], expected, check_names=False, rtol=1e-9)
+    np.testing.assert_allclose(rolled["close"], candles["close"].loc[rolled.index], rtol=1e-12)
+
+def test_too_few_rows(candles):
+    assert rolling_ohlc(candles.head(4), 5).empty
+    assert tumbling_ohlc(candles.head(4), 5).empty
+
+@pytest.mark.parametrize("window", [1, 5, 7, 60])
+def test_tumbling_ohlc_matches_resample(candles, window):
+    got = tumbling_ohlc(candles, window, volume_col="volume")
+    # bars end on the last row, so drop the leading rows that do not fill one
+    start = len(candles) % window
+    times = pd.to_datetime(candles["timestamp_ms"], unit="ms")
+    origin = times.iloc[start]
+    expected = (
+        candles.iloc[start:].set_index(times.iloc[start:])
+        .resample(f"{window}min", origin=origin)
+        .agg({"timestamp_ms": "first", "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        .reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False, rtol=1e-12)
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+import tape_binary as tb
+
+@pytest.fixture
+def tape_folder(tmp_path):
+    tape = synthetic.agg_trade_tape(30_000, start_price=600, trades_per_second=5)
+    synthetic.write_hour_files(tape, str(tmp_path / "csv"))
+    return tape, str(tmp_path / "csv")
+
+def test_round_trip(tape_folder, tmp_path):
+    tape, folder = tape_folder
+    path = str(tmp_path / "x.tape")
+    assert tb.csv_to_binary(folder, path, "BNBUSDT") == len(tape)
+    # re-appending the same files writes nothing
+    assert tb.csv_to_binary(folder, path) == 0
+
+    binary = tb.BinaryTape(path)
+    assert binary.symbol == "BNBUSDT" and len(binary) == len(tape)
+    frame = binary.to_frame()
+    np.testing.assert_array_equal(frame["agg_id"], tape["agg_id"])
+    np.testing.assert_array_equal(frame["timestamp_ms"], tape["timestamp_ms"])
+    np.testing.assert_allclose(frame["price"], tape["price"], rtol=1e-12)
+    np.testing.assert_array_equal(frame["is_maker"], tape["is_maker"])
+
+    out = str(tmp_path / "back")
+    names = tb.binary_to_csv(path, out)
+    assert sorted(names) == sorted(f for f in os.listdir(folder) if f.endswith(".csv"))
+    for name in names:
+        pd.testing.assert_frame_equal(pd.read_csv(os.path.join(out, name)), pd.read_csv(os.path.join(folder, name)))
+
+def test_slice_is_a_view(tape_folder, tmp_path):
+    tape, folder = tape_folder
+    path = str(tmp_path / "x.tape")
+    tb.csv_to_binary(folder, path)
+    binary = tb.BinaryTape(path)
+    start, end = binary.start_ms + 600_000, binary.start_ms + 3_000_000
+    view = binary.slice(start, end)
+    expected = tape[(tape["timestamp_ms"] >= start) & (tape["timestamp_ms"] < end)]
+    np.testing.assert_array_equal(np.asarray(view["agg_id"]), expected["agg_id"])
+    assert np.shares_memory(view, binary.records)
+
+def test_partial_record_is_dropped(tape_folder, tmp_path):
+    tape, folder = tape_folder
+    path = str(tmp_path / "x.tape")
+    tb.csv_to_binary(folder, path)
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 13)
+    assert len(tb.BinaryTape(path)) == len(tape)
+    assert tb.append_records(path, tb.to_records(tape.tail(0))) == 0
+    assert os.path.getsize(path) == tb.HEADER_SIZE + tb.RECORD_DTYPE.itemsize * len(tape)
+
+def test_repeated_agg_id_is_stored_once(tape_folder, tmp_path):
+    tape, folder = tape_folder
+    name = sorted(f for f in os.listdir(folder) if f.endswith(".csv"))[1]
+    rows = pd.read_csv(os.path.join(folder, name), dtype=str)
+    pd.concat([rows, rows.iloc[[10]]]).to_csv(os.path.join(folder, name), index=False)
+
+    path = str(tmp_path / "x.tape")
+    assert tb.csv_to_binary(folder, path) == len(tape)
+    np.testing.assert_array_equal(tb.BinaryTape(path).to_frame()["agg_id"], tape["agg_id"])
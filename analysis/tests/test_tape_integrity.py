@@ -0,0 +1,121 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import binance_price_volumn
+import synthetic
+import tape_integrity as ti
+from binance_agg_trade import merge_trades_into_hours
+
+@pytest.fixture
+def folder(tmp_path):
+    tape = synthetic.agg_trade_tape(40_000, trades_per_second=2)
+    synthetic.write_hour_files(tape, str(tmp_path))
+    return tape, str(tmp_path)
+
+def hour_files(folder):
+    return sorted(f for f in os.listdir(folder) if f.endswith(".csv"))
+
+def rewrite(folder, name, change):
+    path = os.path.join(folder, name)
+    change(pd.read_csv(path, dtype=str)).to_csv(path, index=False)
+
+def damage(folder):
+    """Inner gap, gap across an hour boundary, repeats in and across files; returns the removed rows."""
+    files = hour_files(folder)
+    removed = []
+
+    def cut(rows, part):
+        removed.append(rows.iloc[part])
+        return rows.drop(rows.index[part])
+
+    rewrite(folder, files[0], lambda rows: cut(rows, slice(100, 130)))
+    rewrite(folder, files[1], lambda rows: cut(rows, slice(len(rows) - 50, len(rows))))
+    rewrite(folder, files[2], lambda rows: cut(rows, slice(0, 20)))
+    rewrite(folder, files[3], lambda rows: pd.concat([rows, rows.iloc[5:8]]))
+    last = pd.read_csv(os.path.join(folder, files[3]), dtype=str).sort_values("agg_id").iloc[-1:]
+    rewrite(folder, files[4], lambda rows: pd.concat([last, rows]))
+    return pd.concat(removed)
+
+def brute_force(folder):
+    ids = np.concatenate([pd.read_csv(os.path.join(folder, f))["agg_id"].to_numpy() for f in hour_files(folder)])
+    values, counts = np.unique(ids, return_counts=True)
+    missing = np.setdiff1d(np.arange(values[0], values[-1] + 1), values)
+    return missing, values[counts > 1]
+
+def test_clean_tape(folder):
+    tape, path = folder
+    index = ti.scan_folder(path)
+    assert index["gaps"] == [] and index["duplicates"] == []
+    assert ti.is_range_complete(path)
+    assert ti.is_range_complete(path, int(tape["timestamp_ms"].iloc[0]), int(tape["timestamp_ms"].iloc[-1]) + 1)
+    assert not ti.is_range_complete(path, int(tape["timestamp_ms"].iloc[0]) - 1)
+    assert ti.missing_in_files(path, hour_files(path)) == 0
+
+def test_gaps_and_duplicates_match_brute_force(folder):
+    tape, path = folder
+    ti.scan_folder(path)
+    damage(path)
+    # the saved index is stale now and load_index rebuilds it
+    index = ti.load_index(path)
+    missing, repeated = brute_force(path)
+    gaps = ti.gap_frame(index)
+    assert gaps["missing"].sum() == len(missing) == 100
+    assert np.array_equal(np.concatenate([np.arange(g.first_id, g.last_id + 1) for g in gaps.itertuples()]), missing)
+    assert index["duplicates"] == repeated.tolist()
+
+    first = gaps.iloc[0]
+    assert not ti.is_range_complete(path)
+    assert not ti.is_range_complete(path, int(first["after_ms"]), int(first["before_ms"]) + 1)
+    assert ti.is_range_complete(path, index["first_ms"], int(first["after_ms"]))
+    assert ti.missing_in_files(path, hour_files(path)) >= 1
+
+def test_repeat_of_an_older_id_kept_in_the_previous_file(folder):
+    _, path = folder
+    files = hour_files(path)
+    # a trade of hour 0 misfiled into hour 1 and stored again in hour 2
+    misfiled = pd.read_csv(os.path.join(path, files[0]), dtype=str).iloc[100:101]
+    rewrite(path, files[0], lambda rows: rows.drop(rows.index[100]))
+    rewrite(path, files[1], lambda rows: pd.concat([misfiled, rows]))
+    rewrite(path, files[2], lambda rows: pd.concat([misfiled, rows]))
+    index = ti.scan_folder(path)
+    assert index["duplicates"] == brute_force(path)[1].tolist() == misfiled["agg_id"].astype(int).tolist()
+
+def test_merge_fills_the_gaps(folder):
+    tape, path = folder
+    removed = damage(path)
+    trades = [
+        {"a": int(r.agg_id), "T": int(r.timestamp_ms), "p": r.price, "q": r.qty, "m": r.is_maker == "True"}
+        for r in removed.itertuples()
+    ]
+    merge_trades_into_hours(trades, path)
+    assert ti.load_index(path)["gaps"] == []
+    assert ti.is_range_complete(path)
+    first = pd.read_csv(os.path.join(path, hour_files(path)[0]))
+    expected = tape[tape["agg_id"].isin(first["agg_id"])].reset_index(drop=True)
+    np.testing.assert_array_equal(first["agg_id"], expected["agg_id"])
+    np.testing.assert_allclose(first["price"], expected["price"])
+
+def test_price_duration_checks_only_its_own_files(folder, monkeypatch):
+    tape, path = folder
+    damage(path)
+
+    def no_scan(*args, **kwargs):
+        raise AssertionError("the duration profile rescanned the folder")
+
+    monkeypatch.setattr(ti, "scan_folder", no_scan)
+    files = hour_files(path)
+    last = pd.read_csv(os.path.join(path, files[-1]))
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        binance_price_volumn.calculate_price_duration(path, os.path.join(path, "d.out"), start_ms=int(last["timestamp_ms"].min()))
+    assert "Warning" not in out.getvalue()
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        binance_price_volumn.calculate_price_duration(path, os.path.join(path, "d.out"))
+    assert "Warning" in out.getvalue()
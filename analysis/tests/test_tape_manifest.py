@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+import tape_manifest as tm
+
+@pytest.fixture
+def folder(tmp_path):
+    tape = synthetic.agg_trade_tape(20_000, trades_per_second=2)
+    synthetic.write_hour_files(tape, str(tmp_path))
+    return tape, str(tmp_path)
+
+def windows(tape, count=50, seed=0):
+    rng = np.random.default_rng(seed)
+    first, last = int(tape["timestamp_ms"].iloc[0]), int(tape["timestamp_ms"].iloc[-1])
+    for _ in range(count):
+        start, end = sorted(rng.integers(first - 60_000, last + 60_000, size=2))
+        yield int(start), int(end)
+    yield None, None
+    yield first, None
+    yield None, last
+
+def test_files_in_range_matches_a_full_scan(folder):
+    tape, path = folder
+    frames = {f: pd.read_csv(os.path.join(path, f)) for f in sorted(os.listdir(path)) if f.endswith(".csv")}
+    for start, end in windows(tape):
+        holding = [f for f, df in frames.items() if len(tm.clip_rows(df, start, end))]
+        # a file spanning the window is read even if its trades skip over it
+        spanning = [
+            f for f, df in frames.items()
+            if (start is None or df["timestamp_ms"].max() >= start) and (end is None or df["timestamp_ms"].min() < end)
+        ]
+        selected = tm.files_in_range(path, start, end)
+        assert selected == spanning and set(holding) <= set(selected)
+
+def test_read_range_matches_clipping_the_tape(folder):
+    tape, path = folder
+    for start, end in windows(tape, count=10):
+        expected = tm.clip_rows(tape, start, end)
+        got = tm.read_range(path, start, end, ["price"])
+        np.testing.assert_array_equal(got["timestamp_ms"], expected["timestamp_ms"])
+        np.testing.assert_allclose(got["price"], expected["price"], rtol=1e-9)
+    assert tm.latest_ms(path) == tape["timestamp_ms"].iloc[-1]
+
+def test_changed_added_and_removed_files_are_picked_up(folder):
+    tape, path = folder
+    files = tm.files_in_range(path)
+    tm.update_manifest(path)
+
+    first = os.path.join(path, files[0])
+    pd.read_csv(first).iloc[:10].to_csv(first, index=False)
+    os.remove(os.path.join(path, files[-1]))
+    extra = tape.iloc[:5].assign(timestamp_ms=tape["timestamp_ms"].iloc[-1] + 10 * 3_600_000)
+    extra.to_csv(os.path.join(path, "2099-01-01_00.csv"), index=False)
+
+    entries = tm.current_manifest(path)["files"]
+    assert entries[files[0]]["rows"] == 10
+    assert files[-1] not in entries
+    assert entries["2099-01-01_00.csv"]["rows"] == 5
+    assert tm.latest_ms(path) == extra["timestamp_ms"].iloc[-1]
+
+def test_verify_manifest_reports_changed_contents(folder):
+    _, path = folder
+    files = tm.files_in_range(path)
+    assert tm.verify_manifest(path) == []
+
+    target = os.path.join(path, files[1])
+    stat = os.stat(target)
+    with open(target, "r+b") as f:
+        f.seek(-2, os.SEEK_END)
+        f.write(b"9")
+    # same size and mtime, so only the checksum can tell
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert tm.verify_manifest(path) == [files[1]]
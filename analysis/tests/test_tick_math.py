@@ -0,0 +1,100 @@
+from decimal import Decimal, getcontext
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from tick_math import (
+    MAX_SQRT_RATIO, MAX_TICK, MIN_SQRT_RATIO, MIN_TICK, Q96, _SQRT_RATIO_FACTORS,
+    amounts_for_liquidity, amounts_for_liquidity_x96, liquidity_for_amounts_x96, price_to_tick,
+    sqrt_price_x96, sqrt_price_x96_to_price, sqrt_ratio_at_tick_x96, tick_at_sqrt_ratio_x96, tick_to_sqrt_price,
+)
+
+getcontext().prec = 80
+
+TICKS = [MIN_TICK, MIN_TICK + 1, -500000, -92109, -1, 0, 1, 2, 50, 69081, 500000, MAX_TICK - 1, MAX_TICK]
+
+def exact_sqrt_ratio(tick):
+    return Decimal("1.0001") ** tick * (Decimal(2) ** 192)
+
+def test_constants_match_their_definition():
+    # each factor is 2**128 / sqrt(1.0001) ** (2 ** bit), truncated like the Solidity literals
+    for bit, factor in enumerate(_SQRT_RATIO_FACTORS, start=1):
+        exact = Decimal(2) ** 128 / Decimal("1.0001").sqrt() ** (2 ** bit)
+        assert abs(factor - exact) < 2, bit
+    assert sqrt_ratio_at_tick_x96(MIN_TICK) == MIN_SQRT_RATIO
+    assert sqrt_ratio_at_tick_x96(MAX_TICK) == MAX_SQRT_RATIO
+    assert sqrt_ratio_at_tick_x96(0) == Q96
+
+@pytest.mark.parametrize("tick", TICKS)
+def test_sqrt_ratio_at_tick_close_to_exact(tick):
+    exact = exact_sqrt_ratio(tick).sqrt()
+    error = Decimal(sqrt_ratio_at_tick_x96(tick)) - exact
+    if tick <= 0:
+        # the Q128 products truncate well below the final round up to Q96
+        assert abs(error) < 1
+    else:
+        # positive ticks invert the Q128 ratio of -tick, so they keep its precision, as on chain
+        inverse = Decimal(2) ** 128 / Decimal("1.0001").sqrt() ** tick
+        assert abs(error) < 1 + exact * 32 / inverse
+
+def test_sqrt_ratio_is_increasing():
+    ticks = np.random.default_rng(3).integers(MIN_TICK, MAX_TICK, 200)
+    ratios = [sqrt_ratio_at_tick_x96(t) for t in np.sort(np.unique(ticks))]
+    assert all(a < b for a, b in zip(ratios, ratios[1:]))
+
+@pytest.mark.parametrize("tick", TICKS)
+def test_tick_at_sqrt_ratio_round_trip(tick):
+    ratio = sqrt_ratio_at_tick_x96(tick)
+    if tick < MAX_TICK:
+        assert tick_at_sqrt_ratio_x96(ratio) == tick
+    if tick > MIN_TICK:
+        assert tick_at_sqrt_ratio_x96(ratio - 1) == tick - 1
+    if tick < MAX_TICK:
+        assert tick_at_sqrt_ratio_x96(sqrt_ratio_at_tick_x96(tick + 1) - 1) == tick
+
+def test_out_of_range_inputs_raise():
+    with pytest.raises(ValueError):
+        sqrt_ratio_at_tick_x96(MAX_TICK + 1)
+    with pytest.raises(ValueError):
+        sqrt_ratio_at_tick_x96(MIN_TICK - 1)
+    with pytest.raises(ValueError):
+        tick_at_sqrt_ratio_x96(MIN_SQRT_RATIO - 1)
+    with pytest.raises(ValueError):
+        tick_at_sqrt_ratio_x96(MAX_SQRT_RATIO)
+
+def test_integer_ports_agree_with_float_helpers():
+    prices = np.random.default_rng(5).lognormal(0, 6, 300)
+    roots = sqrt_price_x96(prices)
+    assert roots.dtype == object
+    np.testing.assert_allclose(sqrt_price_x96_to_price(roots), prices, rtol=1e-12)
+    ticks = price_to_tick(prices)
+    assert [tick_at_sqrt_ratio_x96(r) for r in roots] == ticks.tolist()
+    exact = np.array([sqrt_ratio_at_tick_x96(t) / Q96 for t in ticks])
+    # 1.0001 ** (tick / 2) in floats drifts with the exponent
+    np.testing.assert_allclose(tick_to_sqrt_price(ticks), exact, rtol=1e-10)
+
+def test_amounts_for_liquidity_x96_is_floor_of_exact():
+    lower, upper = sqrt_ratio_at_tick_x96(-600), sqrt_ratio_at_tick_x96(900)
+    liquidity = 10 ** 18 + 12345
+    for current in (lower - 5, sqrt_ratio_at_tick_x96(-7), sqrt_ratio_at_tick_x96(300) + 1, upper + 5):
+        clamped = min(max(current, lower), upper)
+        amount0, amount1 = amounts_for_liquidity_x96(current, upper, lower, liquidity)
+        assert amount0 == int(Fraction(liquidity * Q96 * (upper - clamped), upper * clamped))
+        assert amount1 == int(Fraction(liquidity * (clamped - lower), Q96))
+        floats = amounts_for_liquidity(clamped / Q96, lower / Q96, upper / Q96, liquidity)
+        np.testing.assert_allclose([amount0, amount1], floats, rtol=1e-9, atol=1)
+
+def test_liquidity_for_amounts_x96_never_overspends():
+    rng = np.random.default_rng(8)
+    lower, upper = sqrt_ratio_at_tick_x96(-1200), sqrt_ratio_at_tick_x96(1200)
+    for tick in (-2000, -1200, -300, 0, 450, 1199, 1200, 5000):
+        current = sqrt_ratio_at_tick_x96(tick)
+        amount0, amount1 = (int(x) for x in rng.integers(10 ** 12, 10 ** 18, 2))
+        liquidity = liquidity_for_amounts_x96(current, lower, upper, amount0, amount1)
+        assert liquidity > 0
+        spent0, spent1 = amounts_for_liquidity_x96(current, lower, upper, liquidity)
+        assert spent0 <= amount0 and spent1 <= amount1
+        # and a little more liquidity would exceed a binding amount
+        more0, more1 = amounts_for_liquidity_x96(current, lower, upper, liquidity + liquidity // 10 ** 9 + 1)
+        assert more0 > amount0 or more1 > amount1
@@ -0,0 +1,129 @@
+import math
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+import trend_analysis_5m
+import trend_signal
+from trend_signal import RollingExtreme, TrendSignal, TrendSignalService
+
+def batch_directions(df, signal_alpha=0.06, z_win=10):
+    """Per-row direction as five_min_trend computes it, before its row shifts."""
+    sigma = trend_analysis_5m.gk_ewma_volatility(df)
+    bull, bear = trend_analysis_5m.directional_signal(df, sigma, signal_alpha)
+    intra_vol = (df["high"] / df["low"] - 1).rolling(3).mean()
+    bull, bear = bull / intra_vol, bear / intra_vol
+
+    def z(values):
+        low, high = values.rolling(z_win, min_periods=1).min(), values.rolling(z_win, min_periods=1).max()
+        return (values - low) / (high - low + 1e-8)
+
+    z_bull, z_bear = z(bull), z(bear)
+    return np.select([(z_bull > 0.8) & (z_bear < 0.2), (z_bear > 0.8) & (z_bull < 0.2)], [1, -1], 0)
+
+@pytest.mark.parametrize("window", [1, 3, 7])
+def test_rolling_extreme_matches_pandas(window):
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal(300)
+    values[rng.random(300) < 0.1] = np.nan
+    for mode in ("max", "min"):
+        rolling = RollingExtreme(window, mode)
+        got = [rolling.push(v) for v in values]
+        expected = getattr(pd.Series(values).rolling(window, min_periods=1), mode)()
+        np.testing.assert_allclose(got, expected, equal_nan=True)
+
+def test_matches_batch_direction():
+    df = synthetic.ohlcv_1m(1500, seed=5)
+    signal = TrendSignal()
+    got = [signal.update(row.timestamp_ms, row.open, row.high, row.low, row.close) for row in df.itertuples(index=False)]
+    assert got[:2] == [None, None]
+    np.testing.assert_array_equal(got[2:], batch_directions(df)[2:])
+
+def test_flat_bars():
+    signal = TrendSignal()
+    for i in range(5):
+        assert signal.update(i, 100.0, 100.0, 100.0, 100.0) is None
+    assert signal.bull_ewma is None and signal.bear_ewma is None
+
+    # the first moving bar seeds the EWMAs with finite values
+    signal.update(5, 100.0, 101.0, 99.5, 100.8)
+    assert math.isfinite(signal.bull_ewma) and math.isfinite(signal.bear_ewma)
+    for i in range(6, 20):
+        signal.update(i, 100.0, 100.5, 99.5, 100.2 if i % 2 else 99.8)
+    assert signal.direction in (-1, 0, 1)
+    assert math.isfinite(signal.bull_ewma)
+    # flat bars in the middle keep the state usable
+    for i in range(20, 24):
+        signal.update(i, 100.0, 100.0, 100.0, 100.0)
+    assert math.isfinite(signal.bull_ewma)
+    signal.snapshot()
+
+def test_trend_service_rejects_unknown_symbols():
+    with pytest.raises(ValueError):
+        trend_signal.trend_service("NOTASYMBOL")
+
+def test_slow_warm_up_does_not_block_other_symbols(monkeypatch):
+    release = threading.Event()
+
+    def refresh(self):
+        if self.symbol == "SLOWUSDT":
+            release.wait(5)
+        return {}
+
+    monkeypatch.setattr(TrendSignalService, "refresh", refresh)
+    monkeypatch.setattr(TrendSignalService, "start", lambda self: self)
+    monkeypatch.setattr(trend_signal, "TREND_SYMBOLS", ("SLOWUSDT", "FASTUSDT"))
+    monkeypatch.setattr(trend_signal, "_services", {})
+
+    slow = threading.Thread(target=trend_signal.trend_service, args=("SLOWUSDT",))
+    slow.start()
+    time.sleep(0.05)
+    start = time.perf_counter()
+    trend_signal.trend_service("FASTUSDT")
+    assert time.perf_counter() - start < 1
+    assert slow.is_alive()
+    release.set()
+    slow.join(5)
+    assert set(trend_signal._services) == {"SLOWUSDT", "FASTUSDT"}
+
+def test_failed_warm_up_reaches_the_waiters(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def refresh(self):
+        calls.append(self)
+        if len(calls) == 1:
+            release.wait(5)
+            raise ConnectionError("binance down")
+        return {}
+
+    monkeypatch.setattr(TrendSignalService, "refresh", refresh)
+    monkeypatch.setattr(TrendSignalService, "start", lambda self: self)
+    monkeypatch.setattr(trend_signal, "TREND_SYMBOLS", ("DOWNUSDT",))
+    monkeypatch.setattr(trend_signal, "_services", {})
+
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(trend_signal.trend_service("DOWNUSDT"))
+        except ConnectionError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.02)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(outcomes) == 3 and all(isinstance(o, ConnectionError) for o in outcomes)
+    assert trend_signal._services == {}
+
+    # the next call warms up a new service
+    service = trend_signal.trend_service("DOWNUSDT")
+    assert service is calls[-1] and service.error is None
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import synthetic
+from trend_analysis_5m import five_min_trend, sweep_five_min_trend
+
+ALPHAS = [0.02, 0.06, 0.3]
+Z_WINS = [3, 10, 17]
+
+def check_against_five_min_trend(df, results):
+    for row in results.to_dict("records"):
+        hit_rate, direction = five_min_trend(
+            df.copy(), gk_lambda=row["gk_lambda"], signal_alpha=row["signal_alpha"], z_win=row["z_win"], conf_level=row["conf_level"]
+        )
+        assert row["hit_rate"] == pytest.approx(hit_rate, rel=1e-12), row
+        np.testing.assert_equal(row["last_direction"], direction, err_msg=str(row))
+
+def test_sweep_matches_five_min_trend(capsys):
+    df = synthetic.ohlcv_1m(300, seed=9)
+    results = sweep_five_min_trend(df, ALPHAS, Z_WINS, gk_lambdas=(0.9, 0.94), conf_levels=(0.8, 0.95))
+    assert len(results) == len(ALPHAS) * len(Z_WINS) * 4
+    check_against_five_min_trend(df, results)
+
+def test_sweep_matches_with_flat_bars(capsys):
+    # flat bars give zero sigma and NaN signals, the pandas fallback path
+    df = synthetic.ohlcv_1m(120, seed=10)
+    df.loc[:4, ["open", "high", "low", "close"]] = 600.0
+    for column in ("high", "low", "close"):
+        df.loc[60:62, column] = df.loc[60:62, "open"]
+    check_against_five_min_trend(df, sweep_five_min_trend(df, ALPHAS, Z_WINS))
+
+def test_sweep_matches_when_bull_and_bear_drop_different_rows(capsys):
+    # only up bars before a flat stretch: there bull / intra_vol is inf but bear is 0 / 0
+    df = synthetic.ohlcv_1m(150, seed=11)
+    price = 600.0
+    for i in range(30):
+        if 5 <= i < 25:
+            df.loc[i, ["open", "low", "close", "high"]] = [price, price * 0.9999, price * 1.001, price * 1.0015]
+            price *= 1.001
+        else:
+            df.loc[i, ["open", "high", "low", "close"]] = price
+    check_against_five_min_trend(df, sweep_five_min_trend(df, ALPHAS, Z_WINS))
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import synthetic
+from variance_ratio import variance_ratios, window_sums, z_score
+
+SPECS = {"var_5": (5, 0), "var_30": (30, 5), "var_60": (60, 35), "var_1": (1, 0), "var_3_2": (3, 2)}
+
+@pytest.fixture(scope="module")
+def gk():
+    df = synthetic.ohlcv_1m(500, seed=13)
+    return (0.5 * np.log(df["high"] / df["low"]) ** 2 - (2 * np.log(2) - 1) * np.log(df["close"] / df["open"]) ** 2)
+
+def expected_sum(series, window, offset):
+    return series.shift(offset).rolling(window).sum()
+
+@pytest.mark.parametrize("with_gaps", [False, True])
+def test_window_sums_match_shift_rolling(gk, with_gaps):
+    series = gk.copy()
+    if with_gaps:
+        series.iloc[[0, 77, 78, 300]] = np.nan
+    sums = window_sums(series, SPECS)
+    for name, (window, offset) in SPECS.items():
+        np.testing.assert_allclose(sums[name], expected_sum(series, window, offset), rtol=1e-9, atol=1e-18, err_msg=name)
+
+def test_spec_list_names_and_short_input(gk):
+    sums = window_sums(gk.iloc[:40], [(5, 0), (30, 5), (60, 35)])
+    assert list(sums) == ["var_5", "var_30_5", "var_60_35"]
+    assert np.isnan(sums["var_60_35"]).all() and np.isfinite(sums["var_30_5"][34:]).all()
+
+def test_variance_ratios_frame(gk):
+    specs = {name: SPECS[name] for name in ("var_5", "var_30", "var_60")}
+    frame = variance_ratios(gk, specs, z_window=10)
+    assert list(frame.columns) == [
+        "var_5", "var_30", "var_60", "ratio_5v30", "ratio_5v60", "ratio_30v60", "z_5v30", "z_5v60", "z_30v60",
+    ]
+    pd.testing.assert_index_equal(frame.index, gk.index)
+    var_5, var_30 = expected_sum(gk, 5, 0), expected_sum(gk, 30, 5)
+    ratio = var_5 / var_30
+    pd.testing.assert_series_equal(frame["ratio_5v30"], ratio, check_names=False, rtol=1e-9)
+    pd.testing.assert_series_equal(frame["z_5v30"], z_score(ratio, 10), check_names=False, rtol=1e-6)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import synthetic
+from tick_math import price_to_tick
+from volume_index import MINUTE_MS, VolumeIndex
+
+@pytest.fixture(scope="module")
+def tape():
+    return synthetic.agg_trade_tape(20_000, start_price=600, trades_per_second=3)
+
+def brute_volume(tape, tick_lower, tick_upper, start_ms, end_ms, spacing, bucket_ms):
+    """Quote volume of the trades whose bucketed tick and time fall in the query, row by row."""
+    ticks = np.floor_divide(price_to_tick(tape["price"].to_numpy()), spacing) * spacing
+    times = tape["timestamp_ms"].to_numpy() // bucket_ms * bucket_ms
+    inside = (ticks >= tick_lower) & (ticks < tick_upper) & (times >= start_ms) & (times < end_ms)
+    return float((tape["price"] * tape["qty"])[inside].sum())
+
+def test_volume_matches_brute_force(tape):
+    index = VolumeIndex.from_tape(tape, tick_spacing=10)
+    low, high = index.tick_range
+    rng = np.random.default_rng(0)
+    lowers = rng.integers(low - 50, high + 50, 200) // 10 * 10
+    uppers = lowers + rng.integers(0, 400, 200) // 10 * 10
+    starts = rng.integers(index.start_ms - MINUTE_MS, index.end_ms, 200) // MINUTE_MS * MINUTE_MS
+    ends = starts + rng.integers(0, 120, 200) * MINUTE_MS
+
+    got = index.volume(lowers, uppers, starts, ends)
+    expected = [brute_volume(tape, *query, 10, MINUTE_MS) for query in zip(lowers, uppers, starts, ends)]
+    np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-6)
+    total = (tape["price"] * tape["qty"]).sum()
+    assert index.volume(low, high) == pytest.approx(total, rel=1e-12)
+    assert index.profile()["quote"].sum() == pytest.approx(total, rel=1e-12)
+
+def test_from_folder_matches_from_tape(tape, tmp_path):
+    synthetic.write_hour_files(tape, str(tmp_path))
+    start, end = int(tape["timestamp_ms"].iloc[2000]), int(tape["timestamp_ms"].iloc[-2000])
+    window = tape[(tape["timestamp_ms"] >= start) & (tape["timestamp_ms"] < end)]
+    from_folder = VolumeIndex.from_folder(str(tmp_path), start_ms=start, end_ms=end)
+    from_tape = VolumeIndex.from_tape(window)
+    assert (from_folder.start_bucket, from_folder.first_tick_bucket) == (from_tape.start_bucket, from_tape.first_tick_bucket)
+    for column in ("qty", "quote"):
+        # the hour files hold 8 decimals
+        np.testing.assert_allclose(from_folder.tables[column], from_tape.tables[column], rtol=1e-6, atol=1e-6)
+
+def test_save_and_load(tape, tmp_path):
+    index = VolumeIndex.from_tape(tape, tick_spacing=60, bucket_ms=5 * MINUTE_MS, invert=True)
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = VolumeIndex.load(path)
+    assert (loaded.tick_spacing, loaded.bucket_ms, loaded.start_ms, loaded.end_ms, loaded.tick_range) == (
+        index.tick_spacing, index.bucket_ms, index.start_ms, index.end_ms, index.tick_range)
+    for column in ("qty", "quote"):
+        np.testing.assert_array_equal(loaded.tables[column], index.tables[column])
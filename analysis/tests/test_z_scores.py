@@ -0,0 +1,24 @@
+from statistics import NormalDist
+
+import numpy as np
+
+import band_sweep
+import fluctuation_analysis
+import trend_analysis_5m
+
+CONFS = np.concatenate((np.linspace(0.5, 0.99, 50), [0.68, 0.8, 0.95, 0.99]))
+
+def test_served_levels_keep_their_table_values():
+    assert [fluctuation_analysis.get_z_score(c) for c in (0.68, 0.8, 0.95, 0.99)] == [1, 1.28, 1.65, 2.33]
+
+def test_other_levels_are_two_sided():
+    for conf in (0.5, 0.6, 0.9, 0.94, 0.975):
+        assert fluctuation_analysis.get_z_score(conf) == NormalDist().inv_cdf((1 + conf) / 2)
+
+def test_sweep_uses_the_served_z():
+    served = [fluctuation_analysis.get_z_score(conf) for conf in CONFS]
+    np.testing.assert_allclose(band_sweep.z_scores(CONFS), served, rtol=1e-12)
+
+def test_trend_table_is_two_sided():
+    for conf, z in trend_analysis_5m.Z_SCORES.items():
+        assert abs(z - NormalDist().inv_cdf((1 + conf) / 2)) < 0.01
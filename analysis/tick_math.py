@@ -0,0 +1,177 @@
+"""
+Uniswap V3 tick math on NumPy arrays.
+
+Mirrors the helpers the contracts and scripts use (TickMath,
+LiquidityAmounts, nearestUsableTick) so band outputs can be turned into
+tick ranges and position amounts for whole columns at once:
+
+    ticks = price_to_tick(df["close"])
+    lower, upper = range_around(ticks, width=50, tick_spacing=10)
+    amount0, amount1 = amounts_for_liquidity(sqrt_price(df["close"]), tick_to_sqrt_price(lower), tick_to_sqrt_price(upper), 1.0)
+
+Float functions work in price units of token1 per token0 (pass the token
+decimals for human prices). The *_x96 functions are exact integer ports of
+the Solidity libraries for checking values against the chain.
+"""
+import numpy as np
+
+TICK_BASE = 1.0001
+LOG_TICK_BASE = np.log(TICK_BASE)
+
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 1 << 96
+
+# TickMath.getSqrtRatioAtTick: 1 / sqrt(1.0001) ** (2 ** i) as Q128 numbers
+_SQRT_RATIO_FACTORS = (
+    0xfff97272373d413259a46990580e213a, 0xfff2e50f5f656932ef12357cf3c7fdcc, 0xffe5caca7e10e4e61c3624eaa0941cd0,
+    0xffcb9843d60f6159c9db58835c926644, 0xff973b41fa98c081472e6896dfb254c0, 0xff2ea16466c96a3843ec78b326b52861,
+    0xfe5dee046a99a2a811c461f1969c3053, 0xfcbe86c7900a88aedcffc83b479aa3a4, 0xf987a7253ac413176f2b074cf7815e54,
+    0xf3392b0822b70005940c7a398e4b70f3, 0xe7159475a2c29b7443b29c7fa6e889d9, 0xd097f3bdfd2022b8845ad8f792aa5825,
+    0xa9f746462d870fdf8a65dc1f90e061e5, 0x70d869a156d2a1b890bb3df62baf32f7, 0x31be135f97d08fd981231505542fcfa6,
+    0x9aa508b5b7a84e1c677de54f3e99bc9, 0x5d6af8dedb81196699c329225ee604, 0x2216e584f5fa1ea926041bedfe98,
+    0x48a170391f7dc42444e8fa2,
+)
+
+def _scale(decimals0: int, decimals1: int) -> float:
+    return 10.0 ** (decimals1 - decimals0)
+
+def price_to_tick(price, decimals0: int = 0, decimals1: int = 0) -> np.ndarray:
+    """Greatest tick whose price is <= `price`, like TickMath.getTickAtSqrtRatio."""
+    raw = np.asarray(price, dtype=np.float64) * _scale(decimals0, decimals1)
+    tick = np.floor(np.log(raw) / LOG_TICK_BASE)
+    # the log ratio can land a hair on the wrong side of an exact tick price
+    tick += TICK_BASE ** (tick + 1) <= raw
+    tick -= TICK_BASE ** tick > raw
+    return tick.astype(np.int64)
+
+def tick_to_price(tick, decimals0: int = 0, decimals1: int = 0) -> np.ndarray:
+    return TICK_BASE ** np.asarray(tick, dtype=np.float64) / _scale(decimals0, decimals1)
+
+def sqrt_price(price, decimals0: int = 0, decimals1: int = 0) -> np.ndarray:
+    return np.sqrt(np.asarray(price, dtype=np.float64) * _scale(decimals0, decimals1))
+
+def tick_to_sqrt_price(tick) -> np.ndarray:
+    return TICK_BASE ** (np.asarray(tick, dtype=np.float64) / 2)
+
+def ratio_to_ticks(ratio) -> np.ndarray:
+    """Tick distance of a price ratio (a band's high / open), rounded; symmetric around 1."""
+    return np.rint(np.abs(np.log(np.asarray(ratio, dtype=np.float64))) / LOG_TICK_BASE).astype(np.int64)
+
+def usable_tick(tick, tick_spacing: int, rounding: str = "nearest") -> np.ndarray:
+    """
+    Aligns ticks to the spacing grid, kept within MIN_TICK / MAX_TICK.
+
+    rounding is "nearest" (nearestUsableTick in the SDK), "down", "up" or
+    "zero" (Solidity's tick / spacing * spacing in RebalanceMath).
+    """
+    tick = np.asarray(tick, dtype=np.int64)
+    if rounding == "nearest":
+        aligned = np.floor_divide(2 * tick + tick_spacing, 2 * tick_spacing) * tick_spacing
+    elif rounding == "down":
+        aligned = np.floor_divide(tick, tick_spacing) * tick_spacing
+    elif rounding == "up":
+        aligned = -np.floor_divide(-tick, tick_spacing) * tick_spacing
+    elif rounding == "zero":
+        aligned = np.fix(tick / tick_spacing).astype(np.int64) * tick_spacing
+    else:
+        raise ValueError(f"Unknown rounding {rounding}")
+    aligned = np.where(aligned < MIN_TICK, aligned + tick_spacing, aligned)
+    return np.where(aligned > MAX_TICK, aligned - tick_spacing, aligned)
+
+def range_around(tick, width: int, tick_spacing: int):
+    """
+    (tick_lower, tick_upper) on the spacing grid with tick_lower <= tick < tick_upper,
+    reaching at least `width` ticks either side.
+    """
+    tick = np.asarray(tick, dtype=np.int64)
+    return usable_tick(tick - width, tick_spacing, "down"), usable_tick(tick + width + 1, tick_spacing, "up")
+
+def liquidity_for_amounts(sqrt_price, sqrt_lower, sqrt_upper, amount0, amount1) -> np.ndarray:
+    """LiquidityAmounts.getLiquidityForAmounts on float sqrt prices."""
+    sqrt_price, sqrt_lower, sqrt_upper = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (sqrt_price, sqrt_lower, sqrt_upper)))
+    current = np.clip(sqrt_price, sqrt_lower, sqrt_upper)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        from_amount0 = np.asarray(amount0, dtype=np.float64) * current * sqrt_upper / (sqrt_upper - current)
+        from_amount1 = np.asarray(amount1, dtype=np.float64) / (current - sqrt_lower)
+    return np.where(
+        sqrt_price <= sqrt_lower, from_amount0,
+        np.where(sqrt_price < sqrt_upper, np.minimum(from_amount0, from_amount1), from_amount1),
+    )
+
+def amounts_for_liquidity(sqrt_price, sqrt_lower, sqrt_upper, liquidity):
+    """(amount0, amount1) of a position, LiquidityAmounts.getAmountsForLiquidity on float sqrt prices."""
+    sqrt_price = np.asarray(sqrt_price, dtype=np.float64)
+    current = np.clip(sqrt_price, sqrt_lower, sqrt_upper)
+    liquidity = np.asarray(liquidity, dtype=np.float64)
+    return liquidity * (1 / current - 1 / sqrt_upper), liquidity * (current - sqrt_lower)
+
+def position_value(price, sqrt_lower, sqrt_upper, liquidity) -> np.ndarray:
+    """Value of a position in token1 at `price` (raw units)."""
+    price = np.asarray(price, dtype=np.float64)
+    amount0, amount1 = amounts_for_liquidity(np.sqrt(price), sqrt_lower, sqrt_upper, liquidity)
+    return amount0 * price + amount1
+
+def sqrt_ratio_at_tick_x96(tick: int) -> int:
+    """TickMath.getSqrtRatioAtTick, exact."""
+    tick = int(tick)
+    if not MIN_TICK <= tick <= MAX_TICK:
+        raise ValueError(f"tick {tick} out of range")
+    absolute = abs(tick)
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if absolute & 1 else 1 << 128
+    for bit, factor in enumerate(_SQRT_RATIO_FACTORS, start=1):
+        if absolute & (1 << bit):
+            ratio = ratio * factor >> 128
+    if tick > 0:
+        ratio = ((1 << 256) - 1) // ratio
+    # Q128.128 to Q64.96, rounding up
+    return (ratio >> 32) + (ratio % (1 << 32) != 0)
+
+def tick_at_sqrt_ratio_x96(sqrt_price_x96: int) -> int:
+    """TickMath.getTickAtSqrtRatio, exact: the greatest tick whose sqrt ratio is <= the input."""
+    sqrt_price_x96 = int(sqrt_price_x96)
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"sqrtPriceX96 {sqrt_price_x96} out of range")
+    estimate = int(np.floor(2 * (np.log2(float(sqrt_price_x96)) - 96) / np.log2(TICK_BASE)))
+    tick = min(max(estimate, MIN_TICK), MAX_TICK)
+    while tick < MAX_TICK and sqrt_ratio_at_tick_x96(tick + 1) <= sqrt_price_x96:
+        tick += 1
+    while sqrt_ratio_at_tick_x96(tick) > sqrt_price_x96:
+        tick -= 1
+    return tick
+
+def sqrt_price_x96(price, decimals0: int = 0, decimals1: int = 0) -> np.ndarray:
+    """sqrtPriceX96 of each price as Python ints (object array), precise to float resolution."""
+    roots = sqrt_price(price, decimals0, decimals1)
+    # scaling a float by a power of two is exact, so int() keeps every bit of the root
+    return np.array([int(root * 2.0 ** 96) for root in np.atleast_1d(roots).tolist()], dtype=object).reshape(np.shape(roots))
+
+def sqrt_price_x96_to_price(sqrt_price_x96, decimals0: int = 0, decimals1: int = 0) -> np.ndarray:
+    roots = np.array([int(x) / Q96 for x in np.atleast_1d(np.asarray(sqrt_price_x96, dtype=object)).tolist()])
+    return (roots ** 2 / _scale(decimals0, decimals1)).reshape(np.shape(sqrt_price_x96))
+
+def liquidity_for_amounts_x96(sqrt_price_x96: int, sqrt_lower_x96: int, sqrt_upper_x96: int, amount0: int, amount1: int) -> int:
+    """LiquidityAmounts.getLiquidityForAmounts, exact."""
+    lower, upper = sorted((int(sqrt_lower_x96), int(sqrt_upper_x96)))
+
+    def for_amount0(a, b):
+        return int(amount0) * (a * b // Q96) // (b - a)
+
+    def for_amount1(a, b):
+        return int(amount1) * Q96 // (b - a)
+
+    if sqrt_price_x96 <= lower:
+        return for_amount0(lower, upper)
+    if sqrt_price_x96 < upper:
+        return min(for_amount0(int(sqrt_price_x96), upper), for_amount1(lower, int(sqrt_price_x96)))
+    return for_amount1(lower, upper)
+
+def amounts_for_liquidity_x96(sqrt_price_x96: int, sqrt_lower_x96: int, sqrt_upper_x96: int, liquidity: int):
+    """LiquidityAmounts.getAmountsForLiquidity, exact: (amount0, amount1)."""
+    lower, upper = sorted((int(sqrt_lower_x96), int(sqrt_upper_x96)))
+    current = min(max(int(sqrt_price_x96), lower), upper)
+    amount0 = (int(liquidity) << 96) * (upper - current) // upper // current
+    amount1 = int(liquidity) * (current - lower) // Q96
+    return amount0, amount1
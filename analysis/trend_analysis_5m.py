@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
 import math
+from statistics import NormalDist
 # from datetime import datetime, timedelta
-from binance_price_candle import previous_hours_to_interval, get_recent_24h_klines
+from binance_price_candle import previous_hours_to_interval, get_recent_24h_klines, get_klines_dataframe
+from profiling import profiled
+from resample import _window_extreme
 
 Z_SCORES = {
     0.65: 0.93,
@@ -17,7 +20,7 @@ Z_SCORES = {
 def get_z_score(conf: float) -> float:
     z = Z_SCORES.get(conf)
     if z is None:
-        raise KeyError(f"Missing z-score for confidence level {conf}")
+        z = NormalDist().inv_cdf((1 + conf) / 2)
     return z
 
 def gk_ewma_volatility(df: pd.DataFrame, lambda_=0.94):
@@ -40,6 +43,7 @@ def directional_signal(df: pd.DataFrame, sigma: pd.Series, signal_alpha: float =
     bear = (body_down / sigma).ewm(alpha=signal_alpha, adjust=False).mean()
     return bull, bear
 
+@profiled
 def five_min_trend(
     df: pd.DataFrame,
     gk_lambda: float = 0.94,
@@ -122,8 +126,152 @@ def five_min_trend(
     print(df['direction_pred'])
     return df['result'].mean(), df["direction_pred"].iloc[-1]
 
+def _ewm_columns(values: np.ndarray, alphas) -> np.ndarray:
+    """adjust=False EWM of one series for every alpha: (rows, alphas)."""
+    out = np.empty((len(values), len(alphas)))
+    if np.isfinite(values).all():
+        # scipy is only needed by the sweep, keep it off the import path of the servers
+        from scipy.signal import lfilter
+
+        for i, alpha in enumerate(alphas):
+            # y[0] = x[0], y[t] = alpha * x[t] + (1 - alpha) * y[t - 1]
+            out[:, i] = lfilter([alpha], [1, alpha - 1], values, zi=[(1 - alpha) * values[0]])[0]
+    else:
+        # pandas' NaN / inf handling is hard to replicate, defer to it
+        series = pd.Series(values)
+        for i, alpha in enumerate(alphas):
+            out[:, i] = series.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+def _rolling_extreme(values: np.ndarray, window: int, combine) -> np.ndarray:
+    """Trailing rolling extreme along axis 0 with min_periods=1, skipping NaN and +-inf like pandas."""
+    window = min(window, len(values))
+    values = np.where(np.isinf(values), np.nan, values)
+    # pad the front so the first rows see a partial window
+    padded = np.concatenate([np.full((window - 1,) + values.shape[1:], np.nan), values])
+    return _window_extreme(padded, window, combine)
+
+def _directions(z_bull: np.ndarray, z_bear: np.ndarray) -> np.ndarray:
+    """
+    five_min_trend's direction for every column of z-scores: (rows, columns).
+
+    five_min_trend drops the NaN z_bull and z_bear rows separately and lines
+    up what is left from the top, so a column's directions are compacted and
+    the rows past its end are NaN.
+    """
+    nan_bull, nan_bear = np.isnan(z_bull), np.isnan(z_bear)
+    if (nan_bull == nan_bull[:, :1]).all() and (nan_bear == nan_bull[:, :1]).all():
+        # the same rows are NaN everywhere, so one mask drops them for every column
+        keep = ~nan_bull[:, 0]
+        z_bull, z_bear = z_bull[keep], z_bear[keep]
+        return np.where((z_bull > 0.8) & (z_bear < 0.2), 1.0, np.where((z_bear > 0.8) & (z_bull < 0.2), -1.0, 0.0))
+
+    direction = np.full(z_bull.shape, np.nan)
+    for column in range(z_bull.shape[1]):
+        bull = z_bull[~nan_bull[:, column], column]
+        bear = z_bear[~nan_bear[:, column], column]
+        rows = max(len(bull), len(bear))
+        # the shorter side is missing there, which compares False
+        bull = np.pad(bull, (0, rows - len(bull)), constant_values=np.nan)
+        bear = np.pad(bear, (0, rows - len(bear)), constant_values=np.nan)
+        with np.errstate(invalid="ignore"):
+            direction[:rows, column] = np.where((bull > 0.8) & (bear < 0.2), 1, np.where((bear > 0.8) & (bull < 0.2), -1, 0))
+    return direction
+
+def sweep_five_min_trend(
+    df: pd.DataFrame,
+    signal_alphas=np.linspace(0.02, 0.5, 25),
+    z_wins=range(3, 31),
+    gk_lambdas=(0.94,),
+    conf_levels=(0.80,),
+) -> pd.DataFrame:
+    """
+    five_min_trend hit-rate for every (gk_lambda, conf_level, signal_alpha,
+    z_win) combination.
+
+    The bull/bear EWMs run for all signal_alphas as columns of one 2D array
+    and each z_win is one rolling min/max pass over it, so a grid costs
+    about as much as a handful of five_min_trend calls. Rows are aligned
+    exactly as five_min_trend aligns them, so hit_rate and last_direction
+    match what it returns for the same parameters.
+    """
+    alphas = np.asarray(signal_alphas, dtype=np.float64)
+    open_ = df['open'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+    rows = len(df)
+
+    log_ret = np.log(close / open_)
+    intra_vol = pd.Series(high / low - 1).rolling(3).mean().to_numpy()[:, None]
+
+    results = []
+    for gk_lambda in gk_lambdas:
+        sigma = gk_ewma_volatility(df, lambda_=gk_lambda).to_numpy()
+        previous_sigma = np.concatenate([[np.nan], sigma[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bull = _ewm_columns(np.maximum(log_ret, 0) / sigma, alphas) / intra_vol
+            bear = _ewm_columns(np.maximum(-log_ret, 0) / sigma, alphas) / intra_vol
+
+        for conf_level in conf_levels:
+            signal_z = get_z_score(conf_level)
+            with np.errstate(invalid="ignore"):
+                outcome = np.select(
+                    [log_ret > signal_z * previous_sigma, log_ret < -signal_z * previous_sigma], [1, -1], default=0
+                )
+
+            for z_win in z_wins:
+                bull_min = _rolling_extreme(bull, z_win, np.fmin)
+                bull_max = _rolling_extreme(bull, z_win, np.fmax)
+                bear_min = _rolling_extreme(bear, z_win, np.fmin)
+                bear_max = _rolling_extreme(bear, z_win, np.fmax)
+                with np.errstate(invalid="ignore"):
+                    z_bull = (bull - bull_min) / (bull_max - bull_min + 1e-8)
+                    z_bear = (bear - bear_min) / (bear_max - bear_min + 1e-8)
+                # five_min_trend drops NaN z-scores, which shifts predictions up against the outcomes
+                direction = _directions(z_bull, z_bear)
+
+                # kept row j is original row j + z_win - 1 and is scored on the next row's outcome
+                kept = max(rows - (z_win - 1), 0)
+                scored = min(len(direction), rows - z_win)
+                hits = (direction[:scored] == outcome[z_win:z_win + scored, None]).sum(axis=0) if scored > 0 else np.zeros(len(alphas))
+                last = direction[kept - 1] if 0 < kept <= len(direction) else np.full(len(alphas), np.nan)
+
+                results.append(pd.DataFrame({
+                    "gk_lambda": gk_lambda,
+                    "conf_level": conf_level,
+                    "signal_alpha": alphas,
+                    "z_win": z_win,
+                    "hit_rate": hits / kept if kept else np.nan,
+                    "last_direction": last,
+                }))
+    return pd.concat(results, ignore_index=True)
+
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sweep", action="store_true", help="hit-rate for a grid of signal_alpha x z_win instead of one run")
+    parser.add_argument("--hours", type=float, default=72, help="history to sweep over")
+    parser.add_argument("--folder", help="build the 1m candles from the local aggTrade tape in this folder")
+    args = parser.parse_args()
+
+    if args.folder:
+        from bar_builder import local_base_candles
+
+        df = local_base_candles(args.folder, ["1m"], hours=args.hours if args.sweep else 2)
+        print(sweep_five_min_trend(df).sort_values("hit_rate", ascending=False).head(20).to_string(index=False) if args.sweep else five_min_trend(df))
+        raise SystemExit
+
+    if args.sweep:
+        start_time, end_time = previous_hours_to_interval(args.hours)
+        df = get_klines_dataframe(int(start_time), end_time, "1m", "BNBUSDT")
+        df[["open", "high", "low", "close"]] = df[["open", "high", "low", "close"]].astype(float)
+        results = sweep_five_min_trend(df)
+        print(results.sort_values("hit_rate", ascending=False).head(20).to_string(index=False))
+        raise SystemExit
+
     start_time, end_time = previous_hours_to_interval(2)
     interval = "1m"
     output_file="./bnb_1m_klines.csv"
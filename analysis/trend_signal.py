@@ -0,0 +1,241 @@
+"""
+Live five_min_trend direction, updated one closed candle at a time.
+
+TrendSignal keeps the GK-EWMA sigma (OnlineGKEWMA), the bull/bear EWMAs, the
+3-bar intrabar range and monotonic-deque rolling min/max, so every candle
+costs O(1) amortized. TrendSignalService polls Binance for closed candles
+in a background thread; the servers expose its latest state on /trend.
+
+    python trend_signal.py BNBUSDT
+
+The servers only start services for the symbols in TREND_SYMBOLS (comma
+separated environment variable).
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from binance_price_candle import INTERVAL_MS, get_klines_dataframe
+from candle_cache import next_candle_close, now_ms
+from gk_estimator import OnlineGKEWMA
+from trend_analysis_5m import get_z_score
+
+DEFAULT_SYMBOL = "BNBUSDT"
+
+class RollingExtreme:
+    """
+    Trailing max (or min) of the last `window` values with a monotonic deque.
+
+    NaN values take a slot in the window but never become the extreme, like
+    pandas' rolling(window, min_periods=1).
+    """
+
+    def __init__(self, window: int, mode: str = "max"):
+        self.window = window
+        self.better = (lambda a, b: a >= b) if mode == "max" else (lambda a, b: a <= b)
+        self.count = 0
+        self._deque = deque()  # (index, value), values monotonic from the front
+
+    def push(self, value: float) -> float:
+        if not math.isnan(value):
+            while self._deque and self.better(value, self._deque[-1][1]):
+                self._deque.pop()
+            self._deque.append((self.count, value))
+        self.count += 1
+        while self._deque and self._deque[0][0] <= self.count - 1 - self.window:
+            self._deque.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._deque[0][1] if self._deque else float("nan")
+
+class TrendSignal:
+    """
+    The direction five_min_trend computes for the newest bar: 1 (long),
+    -1 (short) or 0, from the same bull/bear z-scores.
+
+    Also scores each direction against the next bar's outcome so the live
+    hit-rate is available without re-running the batch version.
+    """
+
+    def __init__(self, gk_lambda=0.94, signal_alpha=0.06, z_win=10, conf_level=0.80):
+        self.signal_alpha = signal_alpha
+        self.z_win = z_win
+        self.signal_z = get_z_score(conf_level)
+        self.gk = OnlineGKEWMA(lambda_=gk_lambda, negative="clip")
+        self.bull_ewma = None
+        self.bear_ewma = None
+        self.ranges = deque(maxlen=3)
+        self.bull_min = RollingExtreme(z_win, "min")
+        self.bull_max = RollingExtreme(z_win, "max")
+        self.bear_min = RollingExtreme(z_win, "min")
+        self.bear_max = RollingExtreme(z_win, "max")
+        self.previous_sigma = None
+        self.direction = None
+        self.z_bull = float("nan")
+        self.z_bear = float("nan")
+        self.hits = 0
+        self.scored = 0
+
+    def _ewma(self, previous, value):
+        return value if previous is None else self.signal_alpha * value + (1 - self.signal_alpha) * previous
+
+    def update(self, timestamp, open_, high, low, close):
+        """Feeds one closed candle; returns the new direction (None while warming up)."""
+        if self.gk.last_bar is not None and timestamp <= self.gk.last_bar["timestamp"]:
+            return self.direction
+
+        open_, high, low, close = float(open_), float(high), float(low), float(close)
+        sigma = self.gk.update(timestamp, open_, high, low, close)
+        log_ret = math.log(close / open_)
+
+        # score the previous bar's call against this bar's body
+        if self.direction is not None and self.previous_sigma is not None:
+            threshold = self.signal_z * self.previous_sigma
+            outcome = 1 if log_ret > threshold else -1 if log_ret < -threshold else 0
+            self.hits += outcome == self.direction
+            self.scored += 1
+        self.previous_sigma = sigma
+
+        # a flat bar has no sigma to scale by; keep the EWMAs as they were,
+        # like pandas' ewm skipping the NaN the batch version gets there
+        if sigma > 0:
+            self.bull_ewma = self._ewma(self.bull_ewma, max(log_ret, 0) / sigma)
+            self.bear_ewma = self._ewma(self.bear_ewma, max(-log_ret, 0) / sigma)
+
+        self.ranges.append(high / low - 1)
+        intra_vol = sum(self.ranges) / 3 if len(self.ranges) == 3 else float("nan")
+        # no z-score input until there is a signal and a non-zero intrabar range
+        if self.bull_ewma is None or not intra_vol > 0:
+            bull = bear = float("nan")
+        else:
+            bull = self.bull_ewma / intra_vol
+            bear = self.bear_ewma / intra_vol
+
+        bull_min, bull_max = self.bull_min.push(bull), self.bull_max.push(bull)
+        bear_min, bear_max = self.bear_min.push(bear), self.bear_max.push(bear)
+        self.z_bull = (bull - bull_min) / (bull_max - bull_min + 1e-8)
+        self.z_bear = (bear - bear_min) / (bear_max - bear_min + 1e-8)
+
+        if math.isnan(self.z_bull) or math.isnan(self.z_bear):
+            self.direction = None
+        elif self.z_bull > 0.8 and self.z_bear < 0.2:
+            self.direction = 1
+        elif self.z_bear > 0.8 and self.z_bull < 0.2:
+            self.direction = -1
+        else:
+            self.direction = 0
+        return self.direction
+
+    def update_frame(self, df, time_col="timestamp"):
+        for row in df[[time_col, "open", "high", "low", "close"]].itertuples(index=False):
+            self.update(*row)
+        return self.direction
+
+    def snapshot(self) -> dict:
+        last = self.gk.last_bar or {}
+        return {
+            "timestamp": last.get("timestamp"),
+            "close": last.get("close"),
+            "direction": self.direction,
+            "z_bull": None if math.isnan(self.z_bull) else self.z_bull,
+            "z_bear": None if math.isnan(self.z_bear) else self.z_bear,
+            "sigma": None if math.isnan(self.gk.sigma) else self.gk.sigma,
+            "hit_rate": self.hits / self.scored if self.scored else None,
+            "bars": self.gk.count,
+        }
+
+class TrendSignalService:
+    """Keeps a TrendSignal current for one symbol from closed Binance candles."""
+
+    def __init__(self, symbol: str = DEFAULT_SYMBOL, interval: str = "1m", history_hours: float = 2, **params):
+        self.symbol = symbol
+        self.interval = interval
+        self.history_hours = history_hours
+        self.signal = TrendSignal(**params)
+        self._lock = threading.RLock()
+        self._thread = None
+        self.ready = threading.Event()  # set once the first refresh is done
+        self.error = None  # what the first refresh raised, if it failed
+
+    def refresh(self) -> dict:
+        """Feeds every candle closed since the last update (history on the first call)."""
+        step = INTERVAL_MS[self.interval]
+        end_time = now_ms()
+        with self._lock:
+            last = self.signal.gk.last_bar
+            start_time = last["timestamp"] + step if last else end_time - int(self.history_hours * 60 * 60 * 1000)
+            if start_time + step <= end_time:
+                klines = get_klines_dataframe(start_time, end_time, self.interval, self.symbol)
+                self.signal.update_frame(klines[klines["timestamp"] + step <= end_time])
+            return self.snapshot()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"symbol": self.symbol, "interval": self.interval, **self.signal.snapshot()}
+
+    def run_forever(self):
+        while True:
+            # wake up two seconds after the next candle closes
+            time.sleep(max(next_candle_close(self.interval) - now_ms(), 0) / 1000 + 2)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"trend refresh for {self.symbol} failed: {e}")
+
+    def start(self) -> "TrendSignalService":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run_forever, daemon=True)
+            self._thread.start()
+        return self
+
+# symbols /trend may start a polling thread for
+TREND_SYMBOLS = tuple(s.strip().upper() for s in os.environ.get("TREND_SYMBOLS", "BNBUSDT,BNBBTC,ETHUSDT").split(",") if s.strip())
+
+_services = {}
+_services_lock = threading.Lock()
+
+def trend_service(symbol: str = DEFAULT_SYMBOL) -> TrendSignalService:
+    """
+    The running service for `symbol`, warmed up and started on first use.
+    Raises ValueError for symbols outside TREND_SYMBOLS.
+    """
+    symbol = symbol.upper()
+    if symbol not in TREND_SYMBOLS:
+        raise ValueError(f"unsupported symbol {symbol}, expected one of {', '.join(TREND_SYMBOLS)}")
+    with _services_lock:
+        service = _services.get(symbol)
+        created = service is None
+        if created:
+            service = _services[symbol] = TrendSignalService(symbol)
+
+    # warm up outside the registry lock so a slow fetch only holds up this symbol
+    if created:
+        try:
+            service.refresh()
+        except Exception as e:
+            # the next call builds a new service; callers already waiting get the error
+            service.error = e
+            with _services_lock:
+                _services.pop(symbol, None)
+            service.ready.set()
+            raise
+        service.ready.set()
+        service.start()
+    else:
+        service.ready.wait()
+        if service.error is not None:
+            raise service.error
+    return service
+
+if __name__ == "__main__":
+    import sys
+
+    service = TrendSignalService(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SYMBOL)
+    print(service.refresh())
+    while True:
+        time.sleep(max(next_candle_close(service.interval) - now_ms(), 0) / 1000 + 2)
+        print(service.refresh())
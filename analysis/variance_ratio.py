@@ -0,0 +1,80 @@
+"""
+Windowed GK variance sums and their ratios from one prefix-sum array.
+
+A spec (window, offset) is the sum of the `window` values ending `offset`
+bars before the current one, i.e. series.shift(offset).rolling(window).sum().
+Every spec is two lookups into the same cumulative sum, so any number of
+windows costs O(N) in total.
+
+    specs = {"var_5": (5, 0), "var_30": (30, 5), "var_60": (60, 35)}
+    frame = variance_ratios(gk_variance(df), specs, z_window=10)
+    # var_5, var_30, var_60, ratio_5v30, ratio_5v60, ratio_30v60, z_5v30, ...
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+def z_score(series, window):
+    mean = series.shift(1).rolling(window).mean()
+    std  = series.shift(1).rolling(window).std()
+    return (series - mean) / std
+
+def _spec_names(specs) -> dict:
+    if isinstance(specs, dict):
+        return dict(specs)
+    return {
+        (f"var_{window}" if offset == 0 else f"var_{window}_{offset}"): (window, offset)
+        for window, offset in specs
+    }
+
+def window_sums(values, specs) -> dict:
+    """
+    name -> windowed sums for every (window, offset) spec; a list of specs is
+    named var_<window>[_<offset>]. Windows that are incomplete or contain a
+    NaN are NaN, like pandas' rolling sum.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    gaps = np.isnan(values)
+    has_gaps = gaps.any()
+    cumulative = np.empty(n + 1)
+    cumulative[0] = 0.0
+    np.cumsum(np.where(gaps, 0.0, values) if has_gaps else values, out=cumulative[1:])
+    if has_gaps:
+        cumulative_gaps = np.concatenate([[0], np.cumsum(gaps)])
+
+    sums = {}
+    for name, (window, offset) in _spec_names(specs).items():
+        out = np.full(n, np.nan)
+        first = window + offset - 1
+        if first < n:
+            # row t covers values[t - offset - window + 1 : t - offset + 1]
+            end = slice(first - offset + 1, n - offset + 1)
+            start = slice(first - offset + 1 - window, n - offset + 1 - window)
+            np.subtract(cumulative[end], cumulative[start], out=out[first:])
+            if has_gaps:
+                out[first:][cumulative_gaps[end] > cumulative_gaps[start]] = np.nan
+        sums[name] = out
+    return sums
+
+def _suffix(name: str) -> str:
+    return name[4:] if name.startswith("var_") else name
+
+def variance_ratios(values, specs, z_window: int = None) -> pd.DataFrame:
+    """
+    Every windowed sum, every pairwise ratio (earlier spec / later spec,
+    ratio_<a>v<b>) and, with `z_window`, each ratio's z_score, in one frame
+    on the index of `values`.
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    sums = window_sums(values, specs)
+    frame = pd.DataFrame(sums, index=index)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for a, b in combinations(sums, 2):
+            frame[f"ratio_{_suffix(a)}v{_suffix(b)}"] = sums[a] / sums[b]
+    if z_window is not None:
+        for a, b in combinations(sums, 2):
+            frame[f"z_{_suffix(a)}v{_suffix(b)}"] = z_score(frame[f"ratio_{_suffix(a)}v{_suffix(b)}"], z_window)
+    return frame
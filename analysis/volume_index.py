@@ -0,0 +1,173 @@
+"""
+Per-tick-spacing x time volume index over the aggTrade tape.
+
+Trades are bucketed by tick // tick_spacing and by `bucket_ms` of time, and
+both axes are prefix-summed into one summed-area table, so the volume traded
+inside [tick_lower, tick_upper) during [start_ms, end_ms) is four lookups:
+
+    index = VolumeIndex.from_folder("./data/trades/BNBUSDT", tick_spacing=10)
+    index.save("BNBUSDT_volume.npz")
+    index.volume(lowers, uppers, start_ms, end_ms)   # arrays of candidate ranges
+
+Ticks are rounded down to the spacing grid and times down to whole buckets.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from loaders import read_trades
+from tape_manifest import clip_rows, files_in_range
+from tick_math import position_value, price_to_tick, tick_to_sqrt_price
+
+MINUTE_MS = 60 * 1000
+YEAR_MS = 365 * 24 * 60 * MINUTE_MS
+
+COLUMNS = ("qty", "quote")
+
+def _bucket_sums(tape: pd.DataFrame, tick_spacing: int, bucket_ms: int, invert: bool = False) -> pd.DataFrame:
+    """(time_bucket, tick_bucket) -> summed qty / quote volume of one tape chunk."""
+    price = tape["price"].to_numpy(dtype=np.float64)
+    qty = tape["qty"].to_numpy(dtype=np.float64)
+    ticks = price_to_tick(1 / price if invert else price)
+    sums = pd.DataFrame({
+        "time_bucket": tape["timestamp_ms"].to_numpy(dtype=np.int64) // bucket_ms,
+        "tick_bucket": np.floor_divide(ticks, tick_spacing),
+        "qty": qty,
+        "quote": qty * price,
+    })
+    return sums.groupby(["time_bucket", "tick_bucket"], sort=False).sum().reset_index()
+
+class VolumeIndex:
+    """
+    Summed-area tables of traded qty and quote volume; tables[c][t, k] is
+    the volume in the first t time buckets and first k tick buckets.
+    """
+
+    def __init__(self, tables: dict, tick_spacing: int, bucket_ms: int, start_bucket: int, first_tick_bucket: int):
+        self.tables = tables
+        self.tick_spacing = tick_spacing
+        self.bucket_ms = bucket_ms
+        self.start_bucket = start_bucket
+        self.first_tick_bucket = first_tick_bucket
+
+    @classmethod
+    def from_sums(cls, sums: pd.DataFrame, tick_spacing: int, bucket_ms: int) -> "VolumeIndex":
+        if sums.empty:
+            raise ValueError("no trades to index")
+        start_bucket = int(sums["time_bucket"].min())
+        first_tick_bucket = int(sums["tick_bucket"].min())
+        rows = sums["time_bucket"].to_numpy() - start_bucket
+        cols = sums["tick_bucket"].to_numpy() - first_tick_bucket
+        shape = (int(rows.max()) + 2, int(cols.max()) + 2)
+
+        tables = {}
+        for column in COLUMNS:
+            table = np.zeros(shape)
+            np.add.at(table, (rows + 1, cols + 1), sums[column].to_numpy(dtype=np.float64))
+            tables[column] = table.cumsum(axis=0).cumsum(axis=1)
+        return cls(tables, tick_spacing, bucket_ms, start_bucket, first_tick_bucket)
+
+    @classmethod
+    def from_tape(cls, tape: pd.DataFrame, tick_spacing: int = 10, bucket_ms: int = MINUTE_MS, invert: bool = False) -> "VolumeIndex":
+        return cls.from_sums(_bucket_sums(tape, tick_spacing, bucket_ms, invert), tick_spacing, bucket_ms)
+
+    @classmethod
+    def from_folder(cls, folder: str, tick_spacing: int = 10, bucket_ms: int = MINUTE_MS, invert: bool = False, start_ms=None, end_ms=None) -> "VolumeIndex":
+        """
+        Builds from the hour files overlapping [start_ms, end_ms) one at a
+        time, so only bucket sums are held in memory.
+        """
+        parts = [
+            _bucket_sums(clip_rows(read_trades(os.path.join(folder, f), ["timestamp_ms", "price", "qty"], {"qty": np.float64}), start_ms, end_ms), tick_spacing, bucket_ms, invert)
+            for f in files_in_range(folder, start_ms, end_ms)
+        ]
+        sums = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+        return cls.from_sums(sums, tick_spacing, bucket_ms)
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            meta=np.array([self.tick_spacing, self.bucket_ms, self.start_bucket, self.first_tick_bucket], dtype=np.int64),
+            **self.tables,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VolumeIndex":
+        with np.load(path) as data:
+            tick_spacing, bucket_ms, start_bucket, first_tick_bucket = (int(v) for v in data["meta"])
+            tables = {column: data[column] for column in COLUMNS}
+        return cls(tables, tick_spacing, bucket_ms, start_bucket, first_tick_bucket)
+
+    @property
+    def start_ms(self) -> int:
+        return self.start_bucket * self.bucket_ms
+
+    @property
+    def end_ms(self) -> int:
+        """End of the last indexed bucket (exclusive)."""
+        return (self.start_bucket + self.tables["qty"].shape[0] - 1) * self.bucket_ms
+
+    @property
+    def tick_range(self):
+        """(lowest, highest + 1) tick covered by the index."""
+        first = self.first_tick_bucket * self.tick_spacing
+        return first, first + (self.tables["qty"].shape[1] - 1) * self.tick_spacing
+
+    def _rows(self, timestamp_ms) -> np.ndarray:
+        rows = np.floor_divide(np.asarray(timestamp_ms, dtype=np.int64), self.bucket_ms) - self.start_bucket
+        return np.clip(rows, 0, self.tables["qty"].shape[0] - 1)
+
+    def _cols(self, tick) -> np.ndarray:
+        cols = np.floor_divide(np.asarray(tick, dtype=np.int64), self.tick_spacing) - self.first_tick_bucket
+        return np.clip(cols, 0, self.tables["qty"].shape[1] - 1)
+
+    def volume(self, tick_lower, tick_upper, start_ms=None, end_ms=None, column: str = "quote") -> np.ndarray:
+        """
+        Volume traded with tick_lower <= tick < tick_upper during
+        [start_ms, end_ms) (the whole index by default); broadcasts over
+        arrays of ranges and windows.
+        """
+        table = self.tables[column]
+        r0 = self._rows(self.start_ms if start_ms is None else start_ms)
+        r1 = self._rows(self.end_ms if end_ms is None else end_ms)
+        c0, c1 = self._cols(tick_lower), self._cols(tick_upper)
+        inside = table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+        # empty or reversed ranges / windows hold nothing
+        return np.where((r1 > r0) & (c1 > c0), inside, 0.0)
+
+    def profile(self, start_ms=None, end_ms=None, column: str = "quote") -> pd.DataFrame:
+        """Volume per tick bucket during a window, like aggregate_volume_by_price on the tick grid."""
+        table = self.tables[column]
+        r0 = self._rows(self.start_ms if start_ms is None else start_ms)
+        r1 = self._rows(self.end_ms if end_ms is None else end_ms)
+        per_bucket = np.diff(table[r1] - table[r0])
+        ticks = (self.first_tick_bucket + np.arange(len(per_bucket))) * self.tick_spacing
+        return pd.DataFrame({"tick": ticks, column: per_bucket})
+
+def fee_apr(index: VolumeIndex, tick_lower, tick_upper, start_ms, end_ms, price: float, fee_rate: float = 0.0005, capital: float = 1000.0, pool_tvl: float = 1e7) -> np.ndarray:
+    """
+    Annualized fee yield of `capital` placed in each range at `price`, from
+    the quote volume traded inside it during the window. The rest of the
+    pool is a full-range position worth `pool_tvl`, as in lp_backtest.
+    """
+    sqrt_lower, sqrt_upper = tick_to_sqrt_price(tick_lower), tick_to_sqrt_price(tick_upper)
+    liquidity = capital / position_value(price, sqrt_lower, sqrt_upper, 1.0)
+    pool_liquidity = pool_tvl / (2 * np.sqrt(price))
+    fees = fee_rate * index.volume(tick_lower, tick_upper, start_ms, end_ms) * liquidity / (liquidity + pool_liquidity)
+    return fees / capital * YEAR_MS / (np.asarray(end_ms) - np.asarray(start_ms))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", help="aggTrade hour files, e.g. ./data/trades/BNBUSDT")
+    parser.add_argument("--tick-spacing", type=int, default=10)
+    parser.add_argument("--bucket-minutes", type=int, default=1)
+    parser.add_argument("--invert", action="store_true", help="index 1 / price, as the BNBBTC scripts do")
+    parser.add_argument("--output", help="npz path, defaults to <folder>_volume_index.npz")
+    args = parser.parse_args()
+
+    index = VolumeIndex.from_folder(args.folder, args.tick_spacing, args.bucket_minutes * MINUTE_MS, args.invert)
+    output = args.output or os.path.normpath(args.folder) + "_volume_index.npz"
+    index.save(output)
+    print(f"indexed ticks {index.tick_range} over {pd.to_datetime(index.start_ms, unit='ms')} .. {pd.to_datetime(index.end_ms, unit='ms')} into {output}")
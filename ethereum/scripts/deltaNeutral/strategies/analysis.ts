@@ -1,7 +1,9 @@
 import http from 'http';
 
-export async function obtainRange(): Promise<number | undefined> {
-    const params = await fetchMetrics();
+// query: optional /calculate parameters, e.g. { symbol: "BNBUSDT", horizon: "15m" }
+export async function obtainRange(query: Record<string, string> = {}): Promise<number | undefined> {
+    const search = new URLSearchParams(query).toString();
+    const params = await fetchMetrics(search ? `/calculate?${search}` : '/calculate');
 
     if (params.metrics.coverage_high < 0.6 && params.metrics.coverage_low < 0.6) {
         console.log("coverage accuracy not high enough");
@@ -12,11 +14,34 @@ export async function obtainRange(): Promise<number | undefined> {
     return params.range * 3;
 }
 
-async function fetchMetrics(): Promise<any> {
+// Ranges for several horizons (e.g. ["5m", "1h"]) from a single server call
+export async function obtainRanges(horizons: string[]): Promise<Map<string, number | undefined>> {
+    const results = await fetchMetrics(`/calculate/horizons?horizons=${horizons.join(',')}`);
+
+    const ranges = new Map<string, number | undefined>();
+    for (const horizon of horizons) {
+        const params = results[horizon];
+        if (params.metrics.coverage_high < 0.6 && params.metrics.coverage_low < 0.6) {
+            console.log(`${horizon} coverage accuracy not high enough`);
+            ranges.set(horizon, undefined);
+            continue;
+        }
+        ranges.set(horizon, params.range * 3);
+    }
+    return ranges;
+}
+
+// Latest 1m trend direction: 1 long, -1 short, 0 flat, undefined while the signal warms up
+export async function obtainTrend(symbol: string = 'BNBUSDT'): Promise<number | undefined> {
+    const trend = await fetchMetrics(`/trend?symbol=${symbol}`);
+    return trend.direction ?? undefined;
+}
+
+async function fetchMetrics(path: string = '/calculate'): Promise<any> {
   const options: http.RequestOptions = {
     hostname: '127.0.0.1',
     port: 5001,
-    path: '/calculate', // adjust to your actual endpoint
+    path, // adjust to your actual endpoint
     method: 'GET',
     headers: {
       'Accept': 'application/json',